@@ -24,7 +24,7 @@ from dotenv import load_dotenv
 from plots import plot_refactoring
 from rich.console import Console
 
-from forge import models
+from forge import models, sendchat
 from forge.coders import Coder
 from forge.dump import dump  # noqa: F401
 from forge.io import InputOutput
@@ -158,12 +158,18 @@ def main(
     exercises_dir: str = typer.Option(
         EXERCISES_DIR_DEFAULT, "--exercises-dir", help="Directory with exercise files"
     ),
+    send_cache: bool = typer.Option(
+        False, "--send-cache", help="Reuse stored responses to identical LLM requests"
+    ),
 ):
     repo = git.Repo(search_parent_directories=True)
     commit_hash = repo.head.object.hexsha[:7]
     if repo.is_dirty():
         commit_hash += "-dirty"
 
+    if send_cache:
+        sendchat.enable_cache()
+
     if stats_only and not dirnames:
         latest_dir = find_latest_benchmark_dir()
         dirnames = [str(latest_dir)]
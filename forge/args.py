@@ -272,6 +272,30 @@ def get_parser(default_config_files, git_root):
         default=0,
         help="Number of times to ping at 5min intervals to keep prompt cache warm (default: 0)",
     )
+    group.add_argument(
+        "--send-cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Reuse stored responses to identical LLM requests (default: False)",
+    )
+    group.add_argument(
+        "--send-cache-dir",
+        metavar="SEND_CACHE_DIR",
+        default="~/.forge.send.cache.v1",
+        help="Directory for the LLM response cache (default: ~/.forge.send.cache.v1)",
+    )
+    group.add_argument(
+        "--send-cache-ttl",
+        type=int,
+        default=None,
+        help="Seconds to keep cached LLM responses (default: no expiry)",
+    )
+    group.add_argument(
+        "--send-cache-size",
+        type=int,
+        default=1024,
+        help="Maximum size of the LLM response cache in MB (default: 1024)",
+    )
 
     ##########
     group = parser.add_argument_group("Repomap Settings")
@@ -87,6 +87,7 @@ class Coder:
     message_cost = 0.0
     message_tokens_sent = 0
     message_tokens_received = 0
+    response_cache_hits = 0
     add_cache_headers = False
     cache_warming_thread = None
     num_cache_warming_pings = 0
@@ -1402,8 +1403,10 @@ class Coder:
 
     def lint_edited(self, fnames):
         res = ""
-        for fname in fnames:
-            errors = self.linter.lint(self.abs_root_path(fname))
+        abs_fnames = [self.abs_root_path(fname) for fname in fnames]
+        lint_results = self.linter.lint_many(abs_fnames)
+        for fname in abs_fnames:
+            errors = lint_results.get(fname)
 
             if errors:
                 res += "\n"
@@ -1663,6 +1666,12 @@ class Coder:
             tokens_report += f", {format_tokens(cache_hit_tokens)} cache hit"
         tokens_report += f", {format_tokens(self.message_tokens_received)} received."
 
+        # Responses replayed from the send cache weren't paid for
+        response_cache_hit = getattr(completion, "forge_cache_hit", False)
+        if response_cache_hit:
+            self.response_cache_hits += 1
+            tokens_report += f" Response cache hits: {self.response_cache_hits}."
+
         if not self.main_model.info.get("input_cost_per_token"):
             self.usage_report = tokens_report
             return
@@ -1695,6 +1704,9 @@ class Coder:
 
         cost += completion_tokens * output_cost_per_token
 
+        if response_cache_hit:
+            cost = 0
+
         self.total_cost += cost
         self.message_cost += cost
 
@@ -2046,6 +2058,11 @@ class Coder:
         # print(f"[DEBUG] Attempting auto_commit with files: {rel_edited}")
         try:
             res = self.repo.commit(fnames=rel_edited, context=context, forge_edits=True)
+            if self.verbose and self.repo.commit_timings:
+                timings = ", ".join(
+                    f"{phase} {secs:.2f}s" for phase, secs in self.repo.commit_timings.items()
+                )
+                self.io.tool_output(f"Commit timings: {timings}")
             if res:
                 # print(f"[DEBUG] Commit successful: {res}")
                 self.show_auto_commit_outcome(res)
@@ -0,0 +1,130 @@
+import os
+from dataclasses import dataclass
+
+import pathspec
+
+from forge.dump import dump  # noqa: F401
+
+DEFAULT_EXCLUDE_NAMES = {".git", "__pycache__", ".pytest_cache", ".venv", "venv", "node_modules"}
+
+
+@dataclass
+class WalkEntry:
+    path: str
+    rel_path: str
+    name: str
+    is_dir: bool
+    size: int
+    mtime: float
+
+
+class FileWalker:
+    """
+    Single pass, scandir based walk of a directory tree.
+
+    Each entry carries the stat info scandir already fetched, so callers can
+    filter on size or mtime without another syscall. Entries named in
+    `exclude_names`, hidden entries, anything matched by a .gitignore (at the
+    root or in any subdirectory) and entries for which `exclude(entry)` is true
+    are pruned during the walk.
+    """
+
+    def __init__(
+        self, root, exclude_names=None, skip_hidden=True, use_gitignore=True, exclude=None
+    ):
+        self.root = os.path.abspath(root)
+        self.exclude_names = DEFAULT_EXCLUDE_NAMES if exclude_names is None else set(exclude_names)
+        self.skip_hidden = skip_hidden
+        self.use_gitignore = use_gitignore
+        self.exclude = exclude
+
+    def load_ignore_spec(self, dirpath):
+        if not self.use_gitignore:
+            return
+        try:
+            with open(os.path.join(dirpath, ".gitignore"), encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except (OSError, UnicodeDecodeError):
+            return
+        if not lines:
+            return
+        return pathspec.PathSpec.from_lines(pathspec.patterns.GitWildMatchPattern, lines)
+
+    def ignored(self, rel_path, is_dir, specs):
+        match_path = rel_path + "/" if is_dir else rel_path
+        for prefix, spec in specs:
+            if prefix and not match_path.startswith(prefix):
+                continue
+            if spec.match_file(match_path[len(prefix) :]):
+                return True
+        return False
+
+    def walk(self):
+        """Yield a WalkEntry for every file and directory, each directory before its contents."""
+        yield from self.walk_dir(self.root, "", [])
+
+    def walk_dir(self, dirpath, rel_dir, specs):
+        spec = self.load_ignore_spec(dirpath)
+        if spec:
+            specs = specs + [(rel_dir + "/" if rel_dir else "", spec)]
+
+        try:
+            with os.scandir(dirpath) as it:
+                entries = list(it)
+        except OSError:
+            return
+
+        for entry in entries:
+            name = entry.name
+            if name in self.exclude_names or (self.skip_hidden and name.startswith(".")):
+                continue
+
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            if specs and self.ignored(rel_path, is_dir, specs):
+                continue
+
+            walk_entry = WalkEntry(
+                path=entry.path,
+                rel_path=rel_path,
+                name=name,
+                is_dir=is_dir,
+                size=0 if is_dir else stat.st_size,
+                mtime=stat.st_mtime,
+            )
+            if self.exclude and self.exclude(walk_entry):
+                continue
+
+            yield walk_entry
+
+            if is_dir:
+                yield from self.walk_dir(entry.path, rel_path, specs)
+
+
+def walk(root, **kwargs):
+    return FileWalker(root, **kwargs).walk()
+
+
+def entries_to_tree(entries, root):
+    """Nest walk entries into a {abs_path: {...} or "file"} dict, like a file tree."""
+    root = os.path.abspath(root)
+    tree = dict()
+    dirs = {"": tree}
+    for entry in entries:
+        parent_rel = entry.rel_path.rsplit("/", 1)[0] if "/" in entry.rel_path else ""
+        parent = dirs.get(parent_rel)
+        if parent is None:
+            # Its directory was filtered out
+            continue
+
+        abs_path = os.path.join(root, *entry.rel_path.split("/"))
+        if entry.is_dir:
+            parent[abs_path] = dirs[entry.rel_path] = dict()
+        else:
+            parent[abs_path] = "file"
+    return tree
@@ -0,0 +1,207 @@
+import hashlib
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import git
+
+from forge.dump import dump  # noqa: F401
+
+
+class GitMirrorError(Exception):
+    pass
+
+
+def strip_credentials(url):
+    """Drop any user:token@ from a remote url, so it can be used as a cache key or logged."""
+    parts = urlsplit(url)
+    if not parts.netloc or "@" not in parts.netloc:
+        return url
+    return urlunsplit(parts._replace(netloc=parts.netloc.rsplit("@", 1)[1]))
+
+
+class GitMirrorCache:
+    """
+    Local bare mirrors of remote repos, one per remote url.
+
+    Checkouts are cloned with `--reference --dissociate` from their mirror, so only
+    objects the mirror doesn't have yet come over the network, and updating a mirror
+    or an existing checkout only fetches the deltas. Mirrors store their url without
+    credentials; the url passed in is used for each fetch.
+    """
+
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            cache_dir = os.environ.get("FORGE_GIT_MIRROR_DIR")
+        if cache_dir is None:
+            cache_dir = Path.home() / ".forge" / "git-mirrors"
+        self.cache_dir = Path(cache_dir)
+        self.locks = dict()
+        self.locks_lock = threading.Lock()
+
+    def mirror_path(self, url):
+        url = strip_credentials(url)
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", url.rstrip("/").split("/")[-1])
+        name = name.removesuffix(".git")
+        digest = hashlib.sha1(url.encode()).hexdigest()[:12]
+        return self.cache_dir / f"{name}-{digest}.git"
+
+    def lock(self, url):
+        key = strip_credentials(url)
+        with self.locks_lock:
+            return self.locks.setdefault(key, threading.Lock())
+
+    def update(self, url):
+        """Create or refresh the mirror of url and return its path."""
+        path = self.mirror_path(url)
+        with self.lock(url):
+            if (path / "HEAD").exists():
+                # Fetch from url itself, which may carry a fresh token
+                git.Repo(path).git.fetch("--prune", url, "+refs/*:refs/*")
+                return path
+
+            if path.exists():
+                shutil.rmtree(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            mirror = git.Repo.clone_from(url, path, mirror=True)
+            mirror.git.remote("set-url", "origin", strip_credentials(url))
+            return path
+
+    def remote_branches(self, url):
+        """Return (default_branch, branches) of url, using `git ls-remote`."""
+        output = git.cmd.Git().ls_remote("--symref", url, "HEAD", "refs/heads/*")
+
+        default_branch = None
+        branches = set()
+        for line in output.splitlines():
+            if line.startswith("ref: "):
+                ref = line[len("ref: ") :].split("\t")[0]
+                default_branch = ref.removeprefix("refs/heads/")
+                continue
+            parts = line.split("\t")
+            if len(parts) == 2 and parts[1].startswith("refs/heads/"):
+                branches.add(parts[1].removeprefix("refs/heads/"))
+
+        return default_branch, branches
+
+    def resolve_branch(self, url, branch=None, fallback=False):
+        """
+        Return branch, or the remote's default branch when no branch is given.
+
+        A branch the remote doesn't have is an error, unless fallback is set
+        because the branch was only a guess.
+        """
+        default_branch, branches = self.remote_branches(url)
+        if not branch:
+            return default_branch
+        if branch in branches:
+            return branch
+        if fallback and default_branch:
+            return default_branch
+        raise GitMirrorError(f"Branch {branch} not found in {strip_credentials(url)}")
+
+    def clone(self, url, dest, branch=None, fallback=False, reset=False):
+        """
+        Clone url into dest, borrowing objects from the mirror.
+
+        An existing checkout of the same remote is fetched and fast-forwarded to
+        the branch instead. Any other non-empty dest is an error, it is never removed.
+
+        With reset, dest is a disposable working copy: an existing checkout is
+        hard reset to the remote branch, and a dest holding anything else is
+        removed and cloned afresh.
+        """
+        dest = Path(dest)
+        repo = self.existing_checkout(url, dest)
+        if not repo and dest.exists() and any(dest.iterdir()):
+            if not reset:
+                raise GitMirrorError(
+                    f"{dest} exists and is not a checkout of {strip_credentials(url)}"
+                )
+            shutil.rmtree(dest)
+
+        mirror = self.update(url)
+        branch = self.resolve_branch(url, branch, fallback)
+
+        if repo:
+            self.sync(repo, url, branch, mirror, reset=reset)
+            return repo
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+
+        # Dissociate, so the checkout survives the mirror being pruned or removed
+        kwargs = dict(reference=str(mirror), dissociate=True)
+        if branch:
+            kwargs["branch"] = branch
+        return git.Repo.clone_from(url, dest, **kwargs)
+
+    def existing_checkout(self, url, dest):
+        try:
+            repo = git.Repo(dest)
+            remote_url = repo.remotes.origin.url
+        except (git.exc.InvalidGitRepositoryError, git.exc.NoSuchPathError, AttributeError):
+            return
+        except ValueError:
+            # No origin remote
+            return
+        if strip_credentials(remote_url) != strip_credentials(url):
+            return
+        return repo
+
+    def sync(self, repo, url, branch=None, mirror=None, reset=False):
+        """
+        Fetch the deltas into an existing checkout and fast-forward it to branch.
+
+        With a freshly updated mirror the fetch is local, otherwise it goes to url.
+        Local edits and commits are never discarded: a dirty checkout, or one whose
+        branch has diverged from the remote, is an error. With reset, the branch is
+        instead hard reset to the remote, dropping local edits and commits.
+        """
+        if repo.is_dirty() and not reset:
+            raise GitMirrorError(f"{repo.working_dir} has uncommitted changes")
+
+        repo.git.remote("set-url", "origin", url)
+        if mirror:
+            repo.git.fetch(str(mirror), "+refs/heads/*:refs/remotes/origin/*")
+        else:
+            repo.git.fetch("origin")
+
+        if not branch:
+            if repo.head.is_detached:
+                return repo
+            branch = repo.active_branch.name
+
+        remote_ref = f"origin/{branch}"
+        if reset:
+            repo.git.checkout("-f", "-B", branch, "--track", remote_ref)
+            return repo
+
+        if branch not in repo.heads:
+            repo.git.checkout("-b", branch, "--track", remote_ref)
+            return repo
+
+        if not repo.is_ancestor(branch, remote_ref) and not repo.is_ancestor(remote_ref, branch):
+            raise GitMirrorError(
+                f"{branch} in {repo.working_dir} has diverged from {strip_credentials(url)}"
+            )
+        if repo.head.is_detached or repo.active_branch.name != branch:
+            repo.git.checkout(branch)
+        repo.git.merge("--ff-only", remote_ref)
+        return repo
+
+
+MIRROR_CACHE = None
+
+
+def get_mirror_cache():
+    global MIRROR_CACHE
+    if MIRROR_CACHE is None:
+        MIRROR_CACHE = GitMirrorCache()
+    return MIRROR_CACHE
+
+
+def clone(url, dest, branch=None, fallback=False, reset=False):
+    return get_mirror_cache().clone(url, dest, branch, fallback, reset)
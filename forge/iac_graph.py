@@ -0,0 +1,253 @@
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from forge import iac_tags
+from forge.dump import dump  # noqa: F401
+
+SKIP_DIRS = {".git", ".terraform", "node_modules", "__pycache__"}
+
+STOPWORDS = set(
+    """
+    a an and are as at be by can for from how i in into is it me my new of on or please
+    that the this to up use using we with add create make set update change need want
+    """.split()
+)
+
+
+class IacGraph:
+    """
+    Static dependency graph over the terraform and k8s files in a repo.
+
+    Files are linked when one references something another defines, scoped to
+    the terraform module (directory) they live in, and module calls with a local
+    `source` link the caller to every file in the module. The per-file tags are
+    stored in an on-disk index keyed by mtime and size, so rebuilding after an
+    edit only re-parses the files that changed. The index lives in forge's cache
+    dir, not in the repo, so it can't end up in a commit.
+    """
+
+    INDEX_VERSION = 1
+    INDEX_DIR = Path.home() / ".forge" / "caches" / f"iac_graph.v{INDEX_VERSION}"
+
+    def __init__(self, root, index_path=None):
+        self.root = Path(root).resolve()
+        if index_path:
+            self.index_path = Path(index_path)
+        else:
+            root_hash = hashlib.sha1(str(self.root).encode("utf-8")).hexdigest()
+            self.index_path = self.INDEX_DIR / f"{root_hash}.json"
+
+        self.files = dict()
+        self.edges = defaultdict(set)
+        self.loaded = False
+
+    def load_index(self):
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return dict()
+
+        if data.get("version") != self.INDEX_VERSION:
+            return dict()
+        return data.get("files", dict())
+
+    def save_index(self):
+        data = dict(version=self.INDEX_VERSION, files=self.files)
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            self.index_path.write_text(json.dumps(data), encoding="utf-8")
+        except OSError as err:
+            print(f"Unable to save IaC graph index to {self.index_path}: {err}")
+
+    def find_iac_files(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+            for fname in filenames:
+                if iac_tags.filename_to_iac_lang(fname):
+                    yield os.path.join(dirpath, fname)
+
+    def build(self):
+        cached = self.load_index()
+
+        files = dict()
+        changed = False
+        for fname in self.find_iac_files():
+            rel_fname = Path(os.path.relpath(fname, self.root)).as_posix()
+            try:
+                stat = os.stat(fname)
+            except OSError:
+                continue
+
+            entry = cached.get(rel_fname)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                files[rel_fname] = entry
+                continue
+
+            files[rel_fname] = self.index_file(fname, stat)
+            changed = True
+
+        self.files = files
+        if changed or set(files) != set(cached):
+            self.save_index()
+
+        self.link()
+        self.loaded = True
+        return self
+
+    def index_file(self, fname, stat):
+        entry = dict(mtime=stat.st_mtime, size=stat.st_size, defs=[], refs=[], modules=[])
+        try:
+            code = Path(fname).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return entry
+
+        try:
+            for kind, name, _line in iac_tags.get_iac_tags(fname, code):
+                entry[kind + "s"].append(name)
+            modules = iac_tags.get_module_sources(fname, code)
+            entry["modules"] = [source for _name, source in modules]
+        except Exception as err:
+            print(f"Unable to index {fname}: {err}")
+
+        entry["defs"] = sorted(set(entry["defs"]))
+        entry["refs"] = sorted(set(entry["refs"]))
+        return entry
+
+    def scoped(self, rel_fname, name):
+        # Terraform names resolve within their module's directory, k8s names repo-wide
+        if iac_tags.filename_to_iac_lang(rel_fname) == "hcl":
+            return (posix_dirname(rel_fname), name)
+        return ("", name)
+
+    def link(self):
+        definers = defaultdict(set)
+        files_by_dir = defaultdict(set)
+        for rel_fname, entry in self.files.items():
+            files_by_dir[posix_dirname(rel_fname)].add(rel_fname)
+            for name in entry["defs"]:
+                definers[self.scoped(rel_fname, name)].add(rel_fname)
+
+        self.edges = defaultdict(set)
+        for rel_fname, entry in self.files.items():
+            for name in entry["refs"]:
+                for definer in definers.get(self.scoped(rel_fname, name), ()):
+                    if definer != rel_fname:
+                        self.add_edge(rel_fname, definer)
+
+            for source in entry.get("modules", []):
+                if not source.startswith(("./", "../")):
+                    continue
+                module_dir = os.path.normpath(os.path.join(posix_dirname(rel_fname), source))
+                module_dir = Path(module_dir).as_posix()
+                if module_dir == ".":
+                    module_dir = ""
+                for module_fname in files_by_dir.get(module_dir, ()):
+                    self.add_edge(rel_fname, module_fname)
+
+    def add_edge(self, src, dst):
+        # Selection cares about neighborhoods, not direction
+        self.edges[src].add(dst)
+        self.edges[dst].add(src)
+
+    def neighbors(self, rel_fname, hops=1):
+        seen = {rel_fname}
+        frontier = {rel_fname}
+        for _ in range(hops):
+            frontier = set(
+                neighbor for node in frontier for neighbor in self.edges.get(node, ())
+            ) - seen
+            seen |= frontier
+        seen.discard(rel_fname)
+        return seen
+
+    def candidate_files(self, query, documents=None, max_files=10, hops=1):
+        """
+        Return up to max_files rel_fnames relevant to query, best first.
+
+        Files are scored by how many query words appear in their path and the
+        names they define, plus any text in `documents` (a dict of rel_fname ->
+        description, eg the system mapper's analyses). Each matching file then
+        lends half its score to its graph neighbors, so the variables, outputs
+        and modules wired to a matching resource come along with it.
+        """
+        if not self.loaded:
+            self.build()
+
+        words = query_words(query)
+        if not words:
+            return []
+
+        documents = documents or dict()
+        all_fnames = set(self.files) | set(documents)
+
+        direct = dict()
+        for rel_fname in all_fnames:
+            text = rel_fname
+            entry = self.files.get(rel_fname)
+            if entry:
+                text += " " + " ".join(entry["defs"])
+            text_words = set(split_words(text))
+            score = len(words & text_words)
+
+            doc_words = set(split_words(documents.get(rel_fname, "")))
+            score += 0.5 * len(words & doc_words)
+
+            if score:
+                direct[rel_fname] = score
+
+        scores = dict(direct)
+        for rel_fname, score in direct.items():
+            for neighbor in self.neighbors(rel_fname, hops):
+                scores[neighbor] = max(scores.get(neighbor, 0), direct.get(neighbor, 0) + score / 2)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [rel_fname for rel_fname, _score in ranked[:max_files]]
+
+
+def posix_dirname(rel_fname):
+    return rel_fname.rsplit("/", 1)[0] if "/" in rel_fname else ""
+
+
+def split_words(text):
+    return [word for word in re.split(r"[^a-z0-9]+", text.lower()) if word]
+
+
+def query_words(query):
+    return set(word for word in split_words(query) if word not in STOPWORDS)
+
+
+def select_files(root, query, documents, max_files=10):
+    """
+    Narrow `documents` (a dict of fname -> description, with absolute or
+    root-relative fnames) to the fnames most relevant to query.
+
+    Returns None when the graph has nothing to offer, so callers can fall back
+    to the full set.
+    """
+    if not root or not os.path.isdir(root) or len(documents) <= max_files:
+        return
+
+    root = Path(root).resolve()
+    by_rel_fname = dict()
+    for fname in documents:
+        path = Path(fname)
+        if path.is_absolute():
+            try:
+                path = path.resolve().relative_to(root)
+            except ValueError:
+                continue
+        by_rel_fname[path.as_posix()] = fname
+
+    rel_documents = dict()
+    for rel_fname, fname in by_rel_fname.items():
+        text = documents[fname]
+        rel_documents[rel_fname] = text if isinstance(text, str) else json.dumps(text)
+
+    graph = IacGraph(root)
+    candidates = graph.candidate_files(query, rel_documents, max_files=max_files)
+    selected = [by_rel_fname[rel_fname] for rel_fname in candidates if rel_fname in by_rel_fname]
+    return selected or None
@@ -0,0 +1,298 @@
+import os
+
+from forge import parse_cache
+from forge.dump import dump  # noqa: F401
+
+IAC_LANGS = {
+    ".tf": "hcl",
+    ".tfvars": "hcl",
+    ".hcl": "hcl",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+}
+
+# Root names in terraform expressions which never point at a resource
+TF_BUILTIN_ROOTS = {"each", "count", "self", "path", "terraform"}
+
+# Terraform block types whose labels name something other files can refer to
+TF_DEF_PREFIXES = {
+    "resource": "",
+    "data": "data.",
+    "variable": "var.",
+    "module": "module.",
+    "output": "output.",
+}
+
+# Keys in k8s manifests which hold a reference to another object, mapped to
+# the kind being referenced and the key holding its name.
+# A kind of None means the mapping names its own kind.
+K8S_REF_KEYS = {
+    "configMapRef": ("ConfigMap", "name"),
+    "configMapKeyRef": ("ConfigMap", "name"),
+    "configMap": ("ConfigMap", "name"),
+    "secretRef": ("Secret", "name"),
+    "secretKeyRef": ("Secret", "name"),
+    "secret": ("Secret", "secretName"),
+    "persistentVolumeClaim": ("PersistentVolumeClaim", "claimName"),
+    "service": ("Service", "name"),
+    "scaleTargetRef": (None, "name"),
+    "roleRef": (None, "name"),
+}
+
+K8S_SCALAR_REF_KEYS = {
+    "serviceName": "Service",
+    "serviceAccountName": "ServiceAccount",
+}
+
+
+def filename_to_iac_lang(fname):
+    ext = os.path.splitext(fname)[1].lower()
+    return IAC_LANGS.get(ext)
+
+
+def tree_context_fname(fname):
+    """
+    grep_ast only knows IaC languages by some of their extensions.
+    Return a filename it will recognize, for use with TreeContext.
+    """
+    lang = filename_to_iac_lang(fname)
+    if lang == "hcl" and not fname.endswith(".hcl"):
+        return fname + ".hcl"
+    if lang == "yaml" and not fname.endswith(".yaml"):
+        return fname + ".yaml"
+    return fname
+
+
+def get_iac_tags(fname, code):
+    """
+    Yield (kind, name, line) for the definitions and references in a terraform,
+    HCL or kubernetes YAML file.
+
+    Terraform names use the address syntax terraform itself uses, so that a
+    reference like `module.vpc.vpc_id` matches the definition `module.vpc`.
+    Kubernetes objects are named `Kind/name`.
+    """
+    lang = filename_to_iac_lang(fname)
+    if not lang or not code:
+        return
+
+    tree = parse_cache.parse(lang, code, fname)
+    if lang == "hcl":
+        yield from get_hcl_tags(tree.root_node, fname.endswith(".tfvars"))
+    else:
+        yield from get_k8s_tags(tree.root_node)
+
+
+def get_module_sources(fname, code):
+    """Yield (module_name, source) for each module block in a terraform file."""
+    if filename_to_iac_lang(fname) != "hcl" or not code:
+        return
+
+    tree = parse_cache.parse("hcl", code, fname)
+    body = next((child for child in tree.root_node.children if child.type == "body"), None)
+    if body is None:
+        return
+
+    for block in body.children:
+        if block.type != "block":
+            continue
+        defs = list(get_hcl_block_defs(block))
+        if not defs or not defs[0][1].startswith("module."):
+            continue
+
+        block_body = next((child for child in block.children if child.type == "body"), None)
+        for attr in block_body.children if block_body else []:
+            if attr.type != "attribute" or hcl_attribute_name(attr) != "source":
+                continue
+            source = node_text(attr.children[-1]).strip().strip('"')
+            yield (defs[0][1][len("module.") :], source)
+
+
+def node_text(node):
+    return node.text.decode("utf-8", errors="replace")
+
+
+def get_hcl_tags(root, is_tfvars):
+    body = next((child for child in root.children if child.type == "body"), None)
+    if body is None:
+        return
+
+    for child in body.children:
+        if child.type == "block":
+            yield from get_hcl_block_defs(child)
+        elif child.type == "attribute" and is_tfvars:
+            name = hcl_attribute_name(child)
+            if name:
+                yield ("ref", "var." + name, child.start_point[0])
+
+    yield from get_hcl_refs(root)
+
+
+def get_hcl_block_defs(block):
+    block_type = None
+    labels = []
+    for child in block.children:
+        if child.type == "identifier" and block_type is None:
+            block_type = node_text(child)
+        elif child.type == "string_lit":
+            labels.append(node_text(child).strip('"'))
+        elif child.type == "identifier":
+            labels.append(node_text(child))
+        elif child.type == "block_start":
+            break
+
+    line = block.start_point[0]
+
+    if block_type == "locals":
+        body = next((child for child in block.children if child.type == "body"), None)
+        for attr in body.children if body else []:
+            name = hcl_attribute_name(attr) if attr.type == "attribute" else None
+            if name:
+                yield ("def", "local." + name, attr.start_point[0])
+        return
+
+    prefix = TF_DEF_PREFIXES.get(block_type)
+    if prefix is None or not labels:
+        return
+
+    if block_type in ("resource", "data"):
+        if len(labels) < 2:
+            return
+        yield ("def", prefix + labels[0] + "." + labels[1], line)
+    else:
+        yield ("def", prefix + labels[0], line)
+
+
+def hcl_attribute_name(attr):
+    for child in attr.children:
+        if child.type == "identifier":
+            return node_text(child)
+
+
+def get_hcl_refs(node):
+    if node.type == "expression":
+        ref = hcl_traversal_ref(node)
+        if ref:
+            yield ("ref", ref, node.start_point[0])
+
+    for child in node.children:
+        yield from get_hcl_refs(child)
+
+
+def hcl_traversal_ref(expression):
+    children = expression.children
+    if not children or children[0].type != "variable_expr":
+        return
+
+    root = node_text(children[0])
+    attrs = []
+    for child in children[1:]:
+        if child.type != "get_attr":
+            break
+        attrs.append(node_text(child).lstrip(".").strip())
+
+    if root in TF_BUILTIN_ROOTS or not attrs:
+        return
+    if root in ("var", "local", "module"):
+        return f"{root}.{attrs[0]}"
+    if root == "data":
+        if len(attrs) < 2:
+            return
+        return f"data.{attrs[0]}.{attrs[1]}"
+
+    # Anything else is a resource address: <type>.<name>[.<attr>...]
+    return f"{root}.{attrs[0]}"
+
+
+def yaml_scalar(node):
+    """Return the string value of a YAML scalar node, or None for non-scalars."""
+    while node is not None and node.type in ("flow_node", "block_node") and node.children:
+        if len(node.children) != 1:
+            return
+        node = node.children[0]
+
+    if node is None:
+        return
+    if node.type == "plain_scalar":
+        return node_text(node)
+    if node.type in ("double_quote_scalar", "single_quote_scalar"):
+        return node_text(node)[1:-1]
+
+
+def yaml_mapping(node):
+    """Return a dict of key -> value node for a YAML mapping node, or None."""
+    while node is not None and node.type in ("flow_node", "block_node") and node.children:
+        node = node.children[-1]
+
+    if node is None or node.type not in ("block_mapping", "flow_mapping"):
+        return
+
+    res = dict()
+    for pair in node.children:
+        if pair.type not in ("block_mapping_pair", "flow_pair"):
+            continue
+        key = yaml_scalar(pair.child_by_field_name("key"))
+        if key is not None:
+            res[key] = pair.child_by_field_name("value")
+    return res
+
+
+def get_k8s_tags(root):
+    for document in root.children:
+        if document.type != "document":
+            continue
+
+        top = next((child for child in document.children if child.type == "block_node"), None)
+        mapping = yaml_mapping(top)
+        if not mapping:
+            continue
+
+        kind = yaml_scalar(mapping.get("kind"))
+        metadata = yaml_mapping(mapping.get("metadata")) or dict()
+        name = yaml_scalar(metadata.get("name"))
+        if kind and name:
+            yield ("def", f"{kind}/{name}", mapping["kind"].start_point[0])
+
+        yield from get_k8s_refs(top)
+
+
+def get_k8s_refs(node):
+    if node is None:
+        return
+
+    mapping = yaml_mapping(node)
+    if mapping is not None:
+        for key, value in mapping.items():
+            ref = k8s_ref(key, value)
+            if ref:
+                yield ("ref", ref, value.start_point[0])
+            yield from get_k8s_refs(value)
+        return
+
+    for child in node.children:
+        yield from get_k8s_refs(child)
+
+
+def k8s_ref(key, value):
+    if value is None:
+        return
+
+    if key in K8S_SCALAR_REF_KEYS:
+        name = yaml_scalar(value)
+        if name:
+            return f"{K8S_SCALAR_REF_KEYS[key]}/{name}"
+        return
+
+    if key not in K8S_REF_KEYS:
+        return
+
+    mapping = yaml_mapping(value)
+    if not mapping:
+        return
+
+    kind, name_key = K8S_REF_KEYS[key]
+    if kind is None:
+        kind = yaml_scalar(mapping.get("kind"))
+    name = yaml_scalar(mapping.get(name_key))
+    if kind and name:
+        return f"{kind}/{name}"
@@ -1,15 +1,19 @@
+import hashlib
 import os
 import re
 import subprocess
 import sys
+import threading
 import traceback
 import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
-from grep_ast import TreeContext, filename_to_lang
-from tree_sitter_languages import get_parser  # noqa: E402
+from grep_ast import filename_to_lang
 
+from forge import parse_cache
 from forge.dump import dump  # noqa: F401
 
 # tree_sitter is throwing a FutureWarning
@@ -17,6 +21,8 @@ warnings.simplefilter("ignore", category=FutureWarning)
 
 
 class Linter:
+    lint_cache_size = 256
+
     def __init__(self, encoding="utf-8", root=None):
         self.encoding = encoding
         self.root = root
@@ -25,6 +31,8 @@ class Linter:
             python=self.py_lint,
         )
         self.all_lint_cmd = None
+        self.lint_cache = OrderedDict()
+        self.lint_cache_lock = threading.Lock()
 
     def set_linter(self, lang, cmd):
         if lang:
@@ -82,6 +90,54 @@ class Linter:
         return LintResult(text=errors, lines=linenums)
 
     def lint(self, fname, cmd=None):
+        job = self.prepare_lint(fname, cmd)
+        if not job:
+            return
+
+        cached = self.get_cached_lint(job)
+        if cached is not None:
+            return cached[0]
+
+        return self.run_lint_job(job)
+
+    def lint_many(self, fnames, max_workers=None):
+        """
+        Lint several files concurrently, returning a dict of fname -> lint output.
+
+        Python files that use the default linter share a single flake8 run, and
+        files whose content hasn't changed since they were last linted are served
+        from the cache.
+        """
+        results = dict()
+        jobs = []
+        for fname in fnames:
+            job = self.prepare_lint(fname)
+            cached = self.get_cached_lint(job) if job else None
+            if not job:
+                results[fname] = None
+            elif cached is not None:
+                results[fname] = cached[0]
+            else:
+                jobs.append(job)
+
+        if not jobs:
+            return results
+
+        py_rel_fnames = [job.rel_fname for job in jobs if job.cmd == self.py_lint]
+        flake_results = None
+        if len(py_rel_fnames) > 1:
+            flake_results = self.flake8_lint_many(py_rel_fnames)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (job, executor.submit(self.run_lint_job, job, flake_results)) for job in jobs
+            ]
+            for job, future in futures:
+                results[job.fname] = future.result()
+
+        return results
+
+    def prepare_lint(self, fname, cmd=None):
         rel_fname = self.get_rel_fname(fname)
         try:
             code = Path(fname).read_text(encoding=self.encoding, errors="replace")
@@ -100,27 +156,58 @@ class Linter:
             else:
                 cmd = self.languages.get(lang)
 
-        if callable(cmd):
+        # Only the built-in linters look at nothing but the file itself. Custom
+        # commands may check other files too, so their results aren't cached.
+        cache_key = None
+        if not cmd or cmd == self.py_lint:
+            code_hash = hashlib.sha1(code.encode(self.encoding, errors="replace")).hexdigest()
+            cache_key = (rel_fname, bool(cmd), code_hash)
+
+        return LintJob(fname, rel_fname, code, cmd, cache_key)
+
+    def run_lint_job(self, job, flake_results=None):
+        fname, rel_fname, code, cmd = job.fname, job.rel_fname, job.code, job.cmd
+
+        if cmd == self.py_lint:
+            lintres = self.py_lint(fname, rel_fname, code, flake_results)
+        elif callable(cmd):
             lintres = cmd(fname, rel_fname, code)
         elif cmd:
             lintres = self.run_cmd(cmd, rel_fname, code)
         else:
             lintres = basic_lint(rel_fname, code)
 
-        if not lintres:
-            return
-
-        res = "# Fix any errors below, if possible.\n\n"
-        res += lintres.text
-        res += "\n"
-        res += tree_context(rel_fname, code, lintres.lines)
-
+        res = None
+        if lintres:
+            res = "# Fix any errors below, if possible.\n\n"
+            res += lintres.text
+            res += "\n"
+            res += tree_context(rel_fname, code, lintres.lines)
+
+        if job.cache_key is not None:
+            with self.lint_cache_lock:
+                self.lint_cache[job.cache_key] = res
+                while len(self.lint_cache) > self.lint_cache_size:
+                    self.lint_cache.popitem(last=False)
         return res
 
-    def py_lint(self, fname, rel_fname, code):
+    def get_cached_lint(self, job):
+        """Return (result,) if job's result is cached, else None."""
+        if job.cache_key is None:
+            return
+        with self.lint_cache_lock:
+            if job.cache_key not in self.lint_cache:
+                return
+            self.lint_cache.move_to_end(job.cache_key)
+            return (self.lint_cache[job.cache_key],)
+
+    def py_lint(self, fname, rel_fname, code, flake_results=None):
         basic_res = basic_lint(rel_fname, code)
         compile_res = lint_python_compile(fname, code)
-        flake_res = self.flake8_lint(rel_fname)
+        if flake_results is not None and rel_fname in flake_results:
+            flake_res = flake_results[rel_fname]
+        else:
+            flake_res = self.flake8_lint(rel_fname)
 
         text = ""
         lines = set()
@@ -135,20 +222,18 @@ class Linter:
         if text or lines:
             return LintResult(text, lines)
 
-    def flake8_lint(self, rel_fname):
+    def flake8_cmd(self, rel_fnames):
         fatal = "E9,F821,F823,F831,F406,F407,F701,F702,F704,F706"
-        flake8_cmd = [
+        return [
             sys.executable,
             "-m",
             "flake8",
             f"--select={fatal}",
             "--show-source",
             "--isolated",
-            rel_fname,
-        ]
-
-        text = f"## Running: {' '.join(flake8_cmd)}\n\n"
+        ] + list(rel_fnames)
 
+    def run_flake8(self, flake8_cmd):
         try:
             result = subprocess.run(
                 flake8_cmd,
@@ -159,16 +244,68 @@ class Linter:
                 encoding=self.encoding,
                 errors="replace",
             )
-            errors = result.stdout + result.stderr
+            return result.stdout + result.stderr
         except Exception as e:
-            errors = f"Error running flake8: {str(e)}"
+            return f"Error running flake8: {str(e)}"
+
+    def flake8_lint(self, rel_fname):
+        flake8_cmd = self.flake8_cmd([rel_fname])
 
+        text = f"## Running: {' '.join(flake8_cmd)}\n\n"
+
+        errors = self.run_flake8(flake8_cmd)
         if not errors:
             return
 
         text += errors
         return self.errors_to_lint_result(rel_fname, text)
 
+    def flake8_lint_many(self, rel_fnames):
+        """
+        Run flake8 once over all of rel_fnames and split its report back per file.
+
+        Returns a dict of rel_fname -> LintResult (or None if the file is clean).
+        Returns None if the output can't be attributed to individual files, so
+        the caller can fall back to linting each file on its own.
+        """
+        rel_fnames = list(dict.fromkeys(rel_fnames))
+        errors = self.run_flake8(self.flake8_cmd(rel_fnames))
+
+        per_file = dict((rel_fname, "") for rel_fname in rel_fnames)
+        pattern = re.compile(
+            r"^(" + "|".join(re.escape(rel_fname) for rel_fname in rel_fnames) + r"):\d+:"
+        )
+
+        current = None
+        for line in errors.splitlines(keepends=True):
+            match = pattern.match(line)
+            if match:
+                current = match.group(1)
+            elif current is None:
+                # Output before any file-specific report, eg a crash or usage error
+                return
+            per_file[current] += line
+
+        results = dict()
+        for rel_fname, file_errors in per_file.items():
+            if not file_errors:
+                results[rel_fname] = None
+                continue
+            text = f"## Running: {' '.join(self.flake8_cmd([rel_fname]))}\n\n"
+            text += file_errors
+            results[rel_fname] = self.errors_to_lint_result(rel_fname, text)
+
+        return results
+
+
+@dataclass
+class LintJob:
+    fname: str
+    rel_fname: str
+    code: str
+    cmd: object
+    cache_key: tuple
+
 
 @dataclass
 class LintResult:
@@ -214,12 +351,12 @@ def basic_lint(fname, code):
         return
 
     try:
-        parser = get_parser(lang)
+        parse_cache.PARSE_CACHE.get_parser(lang)
     except Exception as err:
         print(f"Unable to load parser: {err}")
         return
 
-    tree = parser.parse(bytes(code, "utf-8"))
+    tree = parse_cache.parse(lang, code, fname)
 
     try:
         errors = traverse_tree(tree.root_node)
@@ -234,7 +371,7 @@ def basic_lint(fname, code):
 
 
 def tree_context(fname, code, line_nums):
-    context = TreeContext(
+    context = parse_cache.CachedTreeContext(
         fname,
         code,
         color=False,
@@ -12,7 +12,7 @@ import importlib_resources
 from dotenv import load_dotenv
 from prompt_toolkit.enums import EditingMode
 
-from forge import __version__, models, urls, utils
+from forge import __version__, models, sendchat, urls, utils
 from forge.analytics import Analytics
 from forge.args import get_parser
 from forge.coders import Coder
@@ -689,6 +689,13 @@ def main(argv=None, input=None, output=None, force_git_root=None, return_coder=F
     if args.cache_prompts and args.map_refresh == "auto":
         args.map_refresh = "files"
 
+    if args.send_cache:
+        sendchat.enable_cache(
+            args.send_cache_dir,
+            size_limit=args.send_cache_size * 1024 * 1024,
+            ttl=args.send_cache_ttl,
+        )
+
     if not main_model.streaming:
         if args.stream:
             io.tool_warning(
@@ -0,0 +1,226 @@
+import hashlib
+import threading
+import warnings
+from collections import OrderedDict
+
+from grep_ast import TreeContext, filename_to_lang
+
+from forge.dump import dump  # noqa: F401
+
+# tree_sitter is throwing a FutureWarning
+warnings.simplefilter("ignore", category=FutureWarning)
+from tree_sitter_languages import get_parser as ts_get_parser  # noqa: E402
+
+
+class ParseCache:
+    """
+    Share tree-sitter parses between the linter, the repo map tags extractor and
+    grep_ast's TreeContext, so each version of a file is only parsed once.
+
+    Trees are cached by (lang, content hash). When a file that was parsed before
+    comes back with different content, a copy of its previous tree is edited and
+    handed to tree-sitter so only the changed region is re-parsed. Cached trees
+    may be shared, so they are never edited themselves.
+
+    Both the trees and the last seen content of each file are LRUs of max_trees
+    entries.
+    """
+
+    def __init__(self, max_trees=256):
+        self.max_trees = max_trees
+        self.trees = OrderedDict()
+        self.latest = OrderedDict()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+        self.hits = 0
+        self.misses = 0
+        self.incremental = 0
+
+    def get_parser(self, lang):
+        # tree-sitter parsers are not thread safe, so keep one per thread and language
+        parsers = getattr(self.local, "parsers", None)
+        if parsers is None:
+            parsers = self.local.parsers = dict()
+
+        parser = parsers.get(lang)
+        if parser is None:
+            parser = parsers[lang] = ts_get_parser(lang)
+        return parser
+
+    def parse(self, lang, code, fname=None):
+        if isinstance(code, str):
+            code = bytes(code, "utf-8")
+
+        key = (lang, hashlib.sha1(code).hexdigest())
+
+        with self.lock:
+            tree = self.trees.get(key)
+            if tree is not None:
+                self.trees.move_to_end(key)
+                self.hits += 1
+                if fname:
+                    self.remember(fname, key, code)
+                return tree
+
+            old_tree = old_code = None
+            if fname and fname in self.latest:
+                old_key, old_code = self.latest[fname]
+                if old_key[0] == lang:
+                    old_tree = self.trees.get(old_key)
+
+        parser = self.get_parser(lang)
+        if old_tree is not None:
+            old_tree = copy_tree(old_tree, old_code, parser)
+            edit_tree(old_tree, old_code, code)
+            tree = parser.parse(code, old_tree)
+        else:
+            tree = parser.parse(code)
+
+        with self.lock:
+            if old_tree is not None:
+                self.incremental += 1
+            else:
+                self.misses += 1
+
+            self.trees[key] = tree
+            while len(self.trees) > self.max_trees:
+                self.trees.popitem(last=False)
+            if fname:
+                self.remember(fname, key, code)
+
+        return tree
+
+    def remember(self, fname, key, code):
+        # Caller holds the lock
+        self.latest[fname] = (key, code)
+        self.latest.move_to_end(fname)
+        while len(self.latest) > self.max_trees:
+            self.latest.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.trees = OrderedDict()
+            self.latest = OrderedDict()
+
+
+def copy_tree(tree, code, parser):
+    """A tree that can be edited without affecting tree."""
+    if hasattr(tree, "copy"):
+        return tree.copy()
+    # Older py-tree-sitter has no Tree.copy. Re-parsing unchanged code reuses every
+    # node of the old tree, and tree-sitter copies shared nodes before editing them.
+    return parser.parse(code, tree)
+
+
+def edit_tree(tree, old_code, new_code):
+    """Describe the single changed region between old_code and new_code to tree-sitter."""
+    limit = min(len(old_code), len(new_code))
+
+    start = 0
+    while start < limit and old_code[start] == new_code[start]:
+        start += 1
+
+    old_end = len(old_code)
+    new_end = len(new_code)
+    while old_end > start and new_end > start and old_code[old_end - 1] == new_code[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+
+    tree.edit(
+        start_byte=start,
+        old_end_byte=old_end,
+        new_end_byte=new_end,
+        start_point=byte_to_point(old_code, start),
+        old_end_point=byte_to_point(old_code, old_end),
+        new_end_point=byte_to_point(new_code, new_end),
+    )
+
+
+def byte_to_point(code, offset):
+    row = code.count(b"\n", 0, offset)
+    col = offset - (code.rfind(b"\n", 0, offset) + 1)
+    return (row, col)
+
+
+class CachedTreeContext(TreeContext):
+    """
+    grep_ast TreeContext that parses through the shared cache, so the linter and
+    repo map reuse trees instead of TreeContext parsing the code again.
+
+    Same as TreeContext.__init__ (grep-ast 0.3.3) apart from where the tree comes from.
+    """
+
+    def __init__(
+        self,
+        filename,
+        code,
+        color=False,
+        verbose=False,
+        line_number=False,
+        parent_context=True,
+        child_context=True,
+        last_line=True,
+        margin=3,
+        mark_lois=True,
+        header_max=10,
+        show_top_of_file_parent_scope=True,
+        loi_pad=1,
+    ):
+        self.filename = filename
+        self.color = color
+        self.verbose = verbose
+        self.line_number = line_number
+        self.last_line = last_line
+        self.margin = margin
+        self.mark_lois = mark_lois
+        self.header_max = header_max
+        self.loi_pad = loi_pad
+        self.show_top_of_file_parent_scope = show_top_of_file_parent_scope
+
+        self.parent_context = parent_context
+        self.child_context = child_context
+
+        lang = filename_to_lang(filename)
+        if not lang:
+            raise ValueError(f"Unknown language for {filename}")
+
+        tree = parse(lang, code)
+
+        self.lines = code.splitlines()
+        self.num_lines = len(self.lines) + 1
+
+        self.output_lines = dict()
+        self.scopes = [set() for _ in range(self.num_lines)]
+        self.header = [list() for _ in range(self.num_lines)]
+        self.nodes = [list() for _ in range(self.num_lines)]
+
+        self.walk_tree(tree.root_node)
+
+        if self.verbose:
+            scope_width = max(len(str(set(self.scopes[i]))) for i in range(self.num_lines - 1))
+        for i in range(self.num_lines):
+            header = sorted(self.header[i])
+            if self.verbose and i < self.num_lines - 1:
+                scopes = str(sorted(set(self.scopes[i])))
+                print(f"{scopes.ljust(scope_width)}", i, self.lines[i])
+
+            if len(header) > 1:
+                size, head_start, head_end = header[0]
+                if size > self.header_max:
+                    head_end = head_start + self.header_max
+            else:
+                head_start = i
+                head_end = i + 1
+
+            self.header[i] = head_start, head_end
+
+        self.show_lines = set()
+        self.lines_of_interest = set()
+
+
+PARSE_CACHE = ParseCache()
+
+
+def parse(lang, code, fname=None):
+    return PARSE_CACHE.parse(lang, code, fname)
@@ -30,6 +30,7 @@ class GitRepo:
     subtree_only = False
     ignore_file_cache = {}
     git_repo_error = None
+    commit_timings = None
 
     def __init__(
         self,
@@ -97,22 +98,29 @@ class GitRepo:
             self.forge_ignore_file = Path(forge_ignore_file)
 
     def commit(self, fnames=None, context=None, message=None, forge_edits=False):
-        # print(f"[DEBUG] commit() called with fnames={fnames}, context={context}, message={message}")
+        # print(f"[DEBUG] commit() called with fnames={fnames}, context={context}, "
+        #       f"message={message}")
         if not fnames and not self.repo.is_dirty():
             print("[DEBUG] No filenames given and repo not dirty => skipping commit")
             return
 
-        diffs = self.get_diffs(fnames)
+        self.commit_timings = dict()
+
+        start = time.perf_counter()
+        diffs = self.get_diffs(fnames, has_commits=self.current_branch_has_commits())
+        self.commit_timings["diff"] = time.perf_counter() - start
         # print(f"[DEBUG] commit() => Received diff (truncated): {diffs[:500]!r}")
 
         if not diffs:
             # print("[DEBUG] commit() => diffs is empty => skip commit")
             return
 
+        start = time.perf_counter()
         if message:
             commit_message = message
         else:
             commit_message = self.get_commit_message(diffs, context)
+        self.commit_timings["message"] = time.perf_counter() - start
 
         if forge_edits and self.attribute_commit_message_author:
             commit_message = "forge: " + commit_message
@@ -129,12 +137,9 @@ class GitRepo:
         cmd = ["-m", full_commit_message, "--no-verify"]
         if fnames:
             fnames = [str(self.abs_root_path(fn)) for fn in fnames]
-            for fname in fnames:
-                # print(f"[DEBUG] Staging {fname} for commit.")
-                try:
-                    self.repo.git.add(fname)
-                except ANY_GIT_ERROR as err:
-                    self.io.tool_error(f"Unable to add {fname}: {err}")
+            start = time.perf_counter()
+            self.stage_files(fnames)
+            self.commit_timings["stage"] = time.perf_counter() - start
             cmd += ["--"] + fnames
         else:
             cmd += ["-a"]
@@ -152,7 +157,9 @@ class GitRepo:
 
         try:
             # print(f"[DEBUG] Running git commit {cmd}")
+            start = time.perf_counter()
             self.repo.git.commit(cmd)
+            self.commit_timings["commit"] = time.perf_counter() - start
             commit_hash = self.get_head_commit_sha(short=True)
             # print(f"[DEBUG] commit() => new commit hash: {commit_hash}")
             self.io.tool_output(f"Commit {commit_hash} {commit_message}", bold=True)
@@ -218,21 +225,37 @@ class GitRepo:
 
         return commit_message
 
-    def get_diffs(self, fnames=None):
-        # print(f"[DEBUG] get_diffs called with fnames={fnames}")
-        current_branch_has_commits = False
+    def stage_files(self, fnames):
+        """Stage all of fnames with a single `git add`, falling back to one file at a time."""
+        if not fnames:
+            return
+
         try:
-            active_branch = self.repo.active_branch
-            # print(f"[DEBUG] active_branch: {active_branch}")
-            try:
-                commits = self.repo.iter_commits(active_branch)
-                current_branch_has_commits = any(commits)
-                # print(f"[DEBUG] current_branch_has_commits: {current_branch_has_commits}")
-            except ANY_GIT_ERROR:
-                pass
-        except (TypeError,) + ANY_GIT_ERROR:
+            self.repo.git.add("--", *fnames)
+            return
+        except ANY_GIT_ERROR:
             pass
 
+        # Something in the batch could not be added (eg, a deleted file).
+        # Retry individually so the rest still get staged and the culprit is reported.
+        for fname in fnames:
+            try:
+                self.repo.git.add("--", fname)
+            except ANY_GIT_ERROR as err:
+                self.io.tool_error(f"Unable to add {fname}: {err}")
+
+    def current_branch_has_commits(self):
+        try:
+            return self.repo.head.is_valid()
+        except ANY_GIT_ERROR:
+            return False
+
+    def get_diffs(self, fnames=None, has_commits=None):
+        # print(f"[DEBUG] get_diffs called with fnames={fnames}")
+        if has_commits is None:
+            has_commits = self.current_branch_has_commits()
+        current_branch_has_commits = has_commits
+
         if not fnames:
             fnames = []
 
@@ -253,7 +276,8 @@ class GitRepo:
             wd_args = ["--"] + list(fnames)
             index_args = ["--cached"] + wd_args
 
-            # print(f"[DEBUG] No commits on branch, using diff on index and working dir for fnames: {fnames}")
+            # print(f"[DEBUG] No commits on branch, using diff on index and working dir "
+            #       f"for fnames: {fnames}")
             diffs += self.repo.git.diff(*index_args)
             diffs += self.repo.git.diff(*wd_args)
 
@@ -262,7 +286,6 @@ class GitRepo:
         except ANY_GIT_ERROR as err:
             self.io.tool_error(f"Unable to diff: {err}")
 
-
     def diff_commits(self, pretty, from_commit, to_commit):
         args = []
         if pretty:
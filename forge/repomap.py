@@ -12,18 +12,19 @@ from importlib import resources
 from pathlib import Path
 
 from diskcache import Cache
-from grep_ast import TreeContext, filename_to_lang
+from grep_ast import filename_to_lang
 from pygments.lexers import guess_lexer_for_filename
 from pygments.token import Token
 from tqdm import tqdm
 
+from forge import iac_tags, parse_cache
 from forge.dump import dump
 from forge.special import filter_important_files
 from forge.utils import Spinner
 
 # tree_sitter is throwing a FutureWarning
 warnings.simplefilter("ignore", category=FutureWarning)
-from tree_sitter_languages import get_language, get_parser  # noqa: E402
+from tree_sitter_languages import get_language  # noqa: E402
 
 Tag = namedtuple("Tag", "rel_fname fname line name kind".split())
 
@@ -32,7 +33,7 @@ SQLITE_ERRORS = (sqlite3.OperationalError, sqlite3.DatabaseError, OSError)
 
 
 class RepoMap:
-    CACHE_VERSION = 3
+    CACHE_VERSION = 4
     TAGS_CACHE_DIR = f".forge.tags.cache.v{CACHE_VERSION}"
 
     warned_files = set()
@@ -257,13 +258,17 @@ class RepoMap:
         return data
 
     def get_tags_raw(self, fname, rel_fname):
+        if iac_tags.filename_to_iac_lang(fname):
+            yield from self.get_iac_tags_raw(fname, rel_fname)
+            return
+
         lang = filename_to_lang(fname)
         if not lang:
             return
 
         try:
             language = get_language(lang)
-            parser = get_parser(lang)
+            parse_cache.PARSE_CACHE.get_parser(lang)
         except Exception as err:
             print(f"Skipping file {fname}: {err}")
             return
@@ -276,7 +281,7 @@ class RepoMap:
         code = self.io.read_text(fname)
         if not code:
             return
-        tree = parser.parse(bytes(code, "utf-8"))
+        tree = parse_cache.parse(lang, code, fname)
 
         # Run the tags queries
         query = language.query(query_scm)
@@ -332,6 +337,23 @@ class RepoMap:
                 line=-1,
             )
 
+    def get_iac_tags_raw(self, fname, rel_fname):
+        code = self.io.read_text(fname)
+        if not code:
+            return
+
+        try:
+            for kind, name, line in iac_tags.get_iac_tags(fname, code):
+                yield Tag(
+                    rel_fname=rel_fname,
+                    fname=fname,
+                    name=name,
+                    kind=kind,
+                    line=line,
+                )
+        except Exception as err:
+            print(f"Skipping file {fname}: {err}")
+
     def get_ranked_tags(
         self, chat_fnames, other_fnames, mentioned_fnames, mentioned_idents, progress=None
     ):
@@ -650,8 +672,8 @@ class RepoMap:
             if not code.endswith("\n"):
                 code += "\n"
 
-            context = TreeContext(
-                rel_fname,
+            context = parse_cache.CachedTreeContext(
+                iac_tags.tree_context_fname(rel_fname),
                 code,
                 color=False,
                 line_number=False,
@@ -749,7 +771,8 @@ def get_supported_languages_md():
 
     for lang, ext in data:
         fn = get_scm_fname(lang)
-        repo_map = "✓" if Path(fn).exists() else ""
+        has_tags = Path(fn).exists() or lang in iac_tags.IAC_LANGS.values()
+        repo_map = "✓" if has_tags else ""
         linter_support = "✓"
         res += f"| {lang:20} | {ext:20} | {repo_map:^8} | {linter_support:^6} |\n"
 
@@ -1,21 +1,102 @@
 import hashlib
 import json
+import os
 import time
 
 from forge.dump import dump  # noqa: F401
 from forge.exceptions import LiteLLMExceptions
 from forge.llm import litellm
 
-# from diskcache import Cache
-
-
 CACHE_PATH = "~/.forge.send.cache.v1"
 CACHE = None
-# CACHE = Cache(CACHE_PATH)
+CACHE_TTL = None
+CACHE_SIZE_LIMIT = 1024 * 1024 * 1024
+
+# Request params that don't change the response, left out of the cache key
+NON_SEMANTIC_PARAMS = {
+    "stream",
+    "stream_options",
+    "timeout",
+    "request_timeout",
+    "num_retries",
+    "max_retries",
+    "api_key",
+    "api_base",
+    "base_url",
+    "extra_headers",
+    "metadata",
+    "user",
+}
 
 RETRY_TIMEOUT = 60
 
 
+def enable_cache(path=CACHE_PATH, size_limit=CACHE_SIZE_LIMIT, ttl=None):
+    """Cache responses on disk, evicting least recently used entries past size_limit bytes."""
+    global CACHE, CACHE_TTL
+
+    from diskcache import Cache
+
+    CACHE = Cache(
+        os.path.expanduser(path), size_limit=size_limit, eviction_policy="least-recently-used"
+    )
+    CACHE_TTL = ttl
+    return CACHE
+
+
+def disable_cache():
+    global CACHE
+    if CACHE is not None:
+        CACHE.close()
+    CACHE = None
+
+
+def cache_key(kwargs):
+    semantic = {k: v for k, v in kwargs.items() if k not in NON_SEMANTIC_PARAMS}
+    digest = hashlib.sha1(json.dumps(semantic, sort_keys=True, default=str).encode()).hexdigest()
+    # Streamed responses are stored as their chunks, so they get their own entries
+    kind = "stream" if kwargs.get("stream") else "completion"
+    return f"{kind}:{digest}"
+
+
+def cache_set(key, value):
+    try:
+        CACHE.set(key, value, expire=CACHE_TTL)
+    except Exception:
+        # An unpicklable response just doesn't get cached
+        pass
+
+
+class CachedStream:
+    """Replays the chunks of a recorded stream."""
+
+    forge_cache_hit = True
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+
+class RecordingStream:
+    """Passes a stream through, and caches its chunks once it has been read to the end."""
+
+    forge_cache_hit = False
+
+    def __init__(self, stream, key):
+        self.stream = stream
+        self.key = key
+
+    def __iter__(self):
+        chunks = []
+        for chunk in self.stream:
+            chunks.append(chunk)
+            yield chunk
+        if CACHE is not None:
+            cache_set(self.key, chunks)
+
+
 def send_completion(
     model_name,
     messages,
@@ -45,14 +126,26 @@ def send_completion(
     # Generate SHA1 hash of kwargs and append it to chat_completion_call_hashes
     hash_object = hashlib.sha1(key)
 
-    if not stream and CACHE is not None and key in CACHE:
-        return hash_object, CACHE[key]
+    if CACHE is None:
+        return hash_object, litellm.completion(**kwargs)
+
+    response_key = cache_key(kwargs)
+    cached = CACHE.get(response_key)
+    if cached is not None:
+        if stream:
+            return hash_object, CachedStream(cached)
+        try:
+            cached.forge_cache_hit = True
+        except AttributeError:
+            pass
+        return hash_object, cached
 
     res = litellm.completion(**kwargs)
 
-    if not stream and CACHE is not None:
-        CACHE[key] = res
+    if stream:
+        return hash_object, RecordingStream(res, response_key)
 
+    cache_set(response_key, res)
     return hash_object, res
 
 
@@ -3,6 +3,7 @@ from pydantic import BaseModel, Field
 import os
 import json
 import google.generativeai as genai
+from forge.iac_graph import select_files
 
 # Initialize LLMs
 openai_llm = ChatOpenAI(model="gpt-4o", temperature=0, openai_api_key=os.getenv("OPENAI_API_KEY"))
@@ -19,17 +20,24 @@ class RelevantFilesSchema(BaseModel):
         description="List of relative file paths that are relevant to the query."
     )
 
-def choose_relevant_IaC_files(file_descriptions: str, query: str, file_tree: str) -> RelevantFilesSchema:
+def choose_relevant_IaC_files(file_descriptions: str, query: str, file_tree: str, repo_path: str = None) -> RelevantFilesSchema:
     """
     Analyzes IaC file descriptions and determines relevant files for a specific query. 
 
     Args:
         file_descriptions (str): Combined set of all file descriptions and relative paths as a string.
         query (str): The query specifying the task or issue to resolve.
+        repo_path (str, optional): Repository root. When given, the descriptions are first narrowed
+            to the files the IaC dependency graph links to the query.
 
     Returns:
         RelevantFilesSchema: Structured output containing a list of relevant file paths.
     """
+    if repo_path and isinstance(file_descriptions, dict):
+        candidates = select_files(repo_path, query, file_descriptions, max_files=40)
+        if candidates:
+            file_descriptions = {fname: file_descriptions[fname] for fname in candidates}
+
     # Bind the schema to the model
     model_with_structure = openai_llm.with_structured_output(RelevantFilesSchema)
 
@@ -52,13 +60,15 @@ def choose_relevant_IaC_files(file_descriptions: str, query: str, file_tree: str
     structured_output = model_with_structure.invoke(prompt)
     return structured_output.relevant_files
 
-def choose_relevant_aws_files(aws_file_tree: str, query: str) -> RelevantFilesSchema:
+def choose_relevant_aws_files(aws_file_tree: str, query: str, aws_changes: str = None) -> RelevantFilesSchema:
     """
     Analyzes AWS data and determines relevant files for information retrieval.
 
     Args:
         aws_file_tree (str): File tree representation of AWS data and relative paths.
         query (str): Query specifying the data or information to retrieve.
+        aws_changes (str, optional): Summary of the resources changed since the last collection
+            (InventoryStore.summarize), so the choice can favour files that changed.
 
     Returns:
         RelevantFilesSchema: Structured output containing a subset of AWS file paths relevant to the query.
@@ -75,6 +85,11 @@ def choose_relevant_aws_files(aws_file_tree: str, query: str) -> RelevantFilesSc
     AWS File Tree:
     {aws_file_tree}
     """
+    if aws_changes:
+        prompt += f"""
+    Resources changed since the last collection (prefer these files when the query is about recent changes):
+    {aws_changes}
+    """
 
     structured_output = model_with_structure.invoke(prompt)
     return structured_output
@@ -86,13 +101,15 @@ class InformationRetrievalSchema(BaseModel):
     """
     answer: str = Field(description="The answer to the user's query based on the provided file content.")
 
-def retrieve_information(file_content: str, query: str) -> InformationRetrievalSchema:
+def retrieve_information(file_content: str, query: str, is_delta: bool = False) -> InformationRetrievalSchema:
     """
     Answers a query using the full content of a specific file. 
 
     Args:
         file_content (str): Full content of the file as a string.
         query (str): Query specifying the information to retrieve.
+        is_delta (bool, optional): file_content is a delta (InventoryStore.read_delta) holding only the
+            resources added, modified or removed since the last collection, not the full file.
 
     Returns:
         InformationRetrievalSchema: Structured response to the query.
@@ -108,9 +125,14 @@ def retrieve_information(file_content: str, query: str) -> InformationRetrievalS
 
     Give all relevant information. Count carefully if needed.
     """
+    if is_delta:
+        prompt += """
+    The file content only lists the resources added, modified or removed since the last collection,
+    not the full inventory. Answer in terms of what changed.
+    """
 
     response = gemini_llm.generate_content(prompt)
-    answer = response.strip()
+    answer = response.text.strip()
 
     # Parse into structured schema
     structured_output = InformationRetrievalSchema(answer=answer)
@@ -8,7 +8,7 @@ import logging
 from typing import Annotated, Sequence
 from langgraph.graph import add_messages
 from typing import Literal
-from utils.workflow_utils import setup_AWS_state, generate_file_descriptions, generate_codebase_overview
+from utils.workflow_utils import setup_AWS_state, generate_file_descriptions, generate_codebase_overview, read_aws_file, inventory
 from rag_agent import choose_relevant_IaC_files, choose_relevant_aws_files, retrieve_information
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
@@ -30,6 +30,8 @@ class AgentState(TypedDict):
     repo_path: str
     combined_file_path: str 
     aws_identity: str
+    aws_data_tree: str
+    aws_data_changes: str
     file_descriptions: dict
     file_tree: str
     codebase_overview: str
@@ -38,6 +40,7 @@ class AgentState(TypedDict):
     implementation_plan: str
     execute_commands: str
     aws_info_query: str
+    aws_info: str
     info_retrieval_query: str
     retrieve_info: str
     user_questions: list[dict]
@@ -187,6 +190,30 @@ def retrieve_aws_info(state: AgentState) -> dict:
     state["aws_info_query"] = structured_output.aws_info_query
     state["messages"].append({"role": "system", "content": f"AWS info query: {state['aws_info_query']}."})
 
+    # Answer it from the collected AWS data. A file collected before is answered from
+    # its delta alone; only a file seen for the first time is read in full.
+    relevant_files = choose_relevant_aws_files(
+        state["aws_data_tree"], state["aws_info_query"], aws_changes=state["aws_data_changes"]
+    ).relevant_files
+    answers = []
+    for relpath in relevant_files:
+        if inventory.has_snapshot(relpath):
+            delta = inventory.read_delta(relpath)
+            if not (delta["added"] or delta["modified"] or delta["removed"]):
+                answers.append(f"{relpath}: unchanged since the last collection.")
+                continue
+            answer = retrieve_information(json.dumps(delta, default=str), state["aws_info_query"], is_delta=True).answer
+            answers.append(f"{relpath} (changed since the last collection):\n{answer}")
+            continue
+
+        content = read_aws_file(relpath)
+        if content is None:
+            continue
+        answer = retrieve_information(content, state["aws_info_query"]).answer
+        answers.append(f"{relpath}:\n{answer}")
+    state["aws_info"] = "\n\n".join(answers)
+    state["messages"].append({"role": "system", "content": f"AWS info from {len(answers)} answer(s)."})
+
     return state
 
 def initialize_repo_and_aws(state: AgentState) -> dict:
@@ -324,7 +351,9 @@ def identify_files_to_edit(state: AgentState) -> dict:
     Identify the files that need editing to implement the query.
     """
     file_descriptions = state["file_descriptions"]
-    files_to_edit = choose_relevant_IaC_files(file_descriptions, state["query"], state["file_tree"])
+    files_to_edit = choose_relevant_IaC_files(
+        file_descriptions, state["query"], state["file_tree"], repo_path=state["repo_path"]
+    )
     state["files_to_edit"] = files_to_edit
     state["messages"].append({"role": "system", "content": f"Files to edit: {state['files_to_edit']}."})
     return state
@@ -374,6 +403,9 @@ def plan_implementation(state: AgentState) -> dict:
     ** User Responses to questions: **
     {state["user_questions"]}
 
+    ** AWS Information **:
+    {state.get("aws_info") or "None retrieved"}
+
     """
     model_with_structure = llm.with_structured_output(ImplementationPlanSchema)
     structured_output = model_with_structure.invoke(prompt)
@@ -466,6 +498,9 @@ def start_setup():
         "repo_path": "",
         "combined_file_path": "",
         "aws_identity": "",
+        "aws_data_tree": "",
+        "aws_data_changes": "",
+        "aws_info": "",
         "file_descriptions": dict,
         "codebase_overview": "",
         "edit_code_decision": "",
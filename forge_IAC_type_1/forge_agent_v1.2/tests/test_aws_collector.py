@@ -0,0 +1,69 @@
+import json
+import os
+import pytest
+from utils.aws_collector import AWSCollector, lookup
+from utils.inventory_store import InventoryStore
+
+moto = pytest.importorskip("moto")
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    for name, value in {"AWS_ACCESS_KEY_ID": "test", "AWS_SECRET_ACCESS_KEY": "test",
+                        "AWS_DEFAULT_REGION": "us-east-1"}.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    with moto.mock_aws():
+        yield
+
+
+def test_lookup_follows_paths_and_flattens_lists():
+    data = {"Reservations": [{"Instances": [{"InstanceId": "i-1"}, {"InstanceId": "i-2"}]},
+                             {"Instances": [{"InstanceId": "i-3"}]}],
+            "DistributionList": {"Items": [{"Id": "d-1"}]}}
+
+    assert [i["InstanceId"] for i in lookup(data, "Reservations[].Instances")] == ["i-1", "i-2", "i-3"]
+    assert lookup(data, "DistributionList.Items") == [{"Id": "d-1"}]
+    assert lookup(data, "Missing.Items") is None
+    assert lookup({}, "Reservations[].Instances") == []
+
+
+def test_collect_reads_every_page(aws, tmp_path):
+    import boto3
+
+    sns = boto3.client("sns", region_name="us-east-1")
+    # Past the 100 topics of one list_topics page
+    for i in range(120):
+        sns.create_topic(Name=f"topic-{i}")
+
+    written = AWSCollector(str(tmp_path), services=["SNS", "SQS"], regions=["us-east-1"]).collect()
+
+    assert written == {"SNS": [str(tmp_path / "SNS" / "us-east-1_topics.json")], "SQS": []}
+    with open(written["SNS"][0]) as f:
+        assert len(json.load(f)["Topics"]) == 120
+    # No queues, so no file
+    assert not os.path.exists(tmp_path / "SQS")
+
+
+def test_collect_with_inventory_only_writes_changes(aws, tmp_path):
+    import boto3
+
+    ec2 = boto3.client("ec2", region_name="us-east-1")
+    instance_id = ec2.run_instances(ImageId="ami-12345678", MinCount=1, MaxCount=1)["Instances"][0]["InstanceId"]
+
+    def collect():
+        inventory = InventoryStore(str(tmp_path / "data"), str(tmp_path / "inventory"))
+        written = AWSCollector(inventory.data_dir, services=["EC2"], regions=["us-east-1"],
+                               inventory=inventory).collect()
+        return inventory, written["EC2"]
+
+    inventory, written = collect()
+    assert len(written) == 1
+    assert [change["resource"] for change in inventory.last_changes] == [f"Reservations[].Instances:{instance_id}"]
+
+    inventory, written = collect()
+    assert written == [] and inventory.last_changes == []
+
+    ec2.create_tags(Resources=[instance_id], Tags=[{"Key": "env", "Value": "prod"}])
+    inventory, written = collect()
+    assert [change["change"] for change in inventory.last_changes] == ["modified"]
@@ -0,0 +1,110 @@
+import json
+import os
+import pytest
+from utils.inventory_store import InventoryStore, resources
+
+KEYS = {"Vpcs": "VpcId"}
+
+
+def vpcs(*items):
+    return {"Vpcs": [dict(item) for item in items]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = InventoryStore(str(tmp_path / "data"), str(tmp_path / "inventory"))
+    store.start_run()
+    return store
+
+
+def test_resources_keys_items_by_id():
+    data = {"Vpcs": [{"VpcId": "vpc-1"}, {"CidrBlock": "10.0.0.0/16"}], "TableNames": ["t0"]}
+    found = resources(data, {"Vpcs": "VpcId", "TableNames": None})
+
+    assert found["Vpcs:vpc-1"] == {"VpcId": "vpc-1"}
+    assert found["TableNames:t0"] == "t0"
+    # Items without an id are keyed by their fingerprint
+    assert len(found) == 3
+
+
+def test_record_writes_only_changed_files(store, tmp_path):
+    relpath = os.path.join("VPC", "us-east-1_vpcs.json")
+    filepath = tmp_path / "data" / relpath
+
+    changes = store.record(relpath, vpcs({"VpcId": "vpc-1"}, {"VpcId": "vpc-2"}), KEYS)
+    assert sorted(change["change"] for change in changes) == ["added", "added"]
+    assert json.loads(filepath.read_text())["Vpcs"][0]["VpcId"] == "vpc-1"
+
+    mtime = os.path.getmtime(filepath)
+    assert store.record(relpath, vpcs({"VpcId": "vpc-1"}, {"VpcId": "vpc-2"}), KEYS) == []
+    assert os.path.getmtime(filepath) == mtime
+
+    changes = store.record(relpath, vpcs({"VpcId": "vpc-1", "State": "pending"}), KEYS)
+    assert {change["resource"]: change["change"] for change in changes} == {
+        "Vpcs:vpc-1": "modified", "Vpcs:vpc-2": "removed"
+    }
+
+    changes = store.record(relpath, {}, KEYS)
+    assert [change["change"] for change in changes] == ["removed"]
+    assert not filepath.exists()
+
+
+def test_commit_persists_fingerprints_and_change_log(store, tmp_path):
+    relpath = os.path.join("VPC", "us-east-1_vpcs.json")
+    store.record(relpath, vpcs({"VpcId": "vpc-1"}), KEYS)
+    run_id = store.run_id
+
+    assert len(store.commit()) == 1
+    assert store.last_changes[0]["resource"] == "Vpcs:vpc-1"
+
+    reopened = InventoryStore(store.data_dir, store.state_dir)
+    reopened.start_run()
+    assert reopened.record(relpath, vpcs({"VpcId": "vpc-1"}), KEYS) == []
+    assert [change["run"] for change in reopened.changes()] == [run_id]
+    assert reopened.changes("no-such-run") == []
+
+
+def test_read_delta_returns_changed_resources(store):
+    relpath = os.path.join("VPC", "us-east-1_vpcs.json")
+    store.record(relpath, vpcs({"VpcId": "vpc-1"}, {"VpcId": "vpc-2"}), KEYS)
+    store.commit()
+
+    store.start_run()
+    store.record(relpath, vpcs({"VpcId": "vpc-1", "State": "available"}, {"VpcId": "vpc-3"}), KEYS)
+    store.commit()
+
+    delta = store.read_delta(relpath)
+    assert delta["added"] == [{"VpcId": "vpc-3"}]
+    assert delta["modified"] == [{"VpcId": "vpc-1", "State": "available"}]
+    assert delta["removed"] == ["Vpcs:vpc-2"]
+    assert store.read_delta(os.path.join("VPC", "eu-west-1_vpcs.json"))["added"] == []
+
+    summary = InventoryStore.summarize(store.last_changes)
+    assert f"{relpath}: 1 added, 1 modified, 1 removed" in summary
+    assert InventoryStore.summarize([]) == "No changes since the last collection."
+
+
+def test_volatile_fields_are_not_changes(store):
+    relpath = os.path.join("RDS", "us-east-1_rds_instances.json")
+    keys = {"DBInstances": "DBInstanceArn"}
+    volatile = ["LatestRestorableTime"]
+
+    def rds(restorable, status="available"):
+        return {"DBInstances": [{"DBInstanceArn": "arn:db", "DBInstanceStatus": status,
+                                 "LatestRestorableTime": restorable}]}
+
+    assert len(store.record(relpath, rds("2024-01-01T00:00:00"), keys, volatile)) == 1
+    assert store.record(relpath, rds("2024-01-01T00:05:00"), keys, volatile) == []
+    changes = store.record(relpath, rds("2024-01-01T00:10:00", status="stopped"), keys, volatile)
+    assert [change["change"] for change in changes] == ["modified"]
+
+
+def test_has_snapshot_only_after_a_previous_run(store):
+    relpath = os.path.join("VPC", "us-east-1_vpcs.json")
+    store.record(relpath, vpcs({"VpcId": "vpc-1"}), KEYS)
+    store.commit()
+    assert not store.has_snapshot(relpath)
+
+    store.start_run()
+    assert store.has_snapshot(relpath)
+    assert InventoryStore(store.data_dir, store.state_dir).has_snapshot(relpath)
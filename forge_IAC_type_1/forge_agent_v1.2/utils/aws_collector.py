@@ -0,0 +1,245 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+
+EXCLUDED_REGIONS = ['cn-north-1', 'cn-northwest-1', 'us-gov-west-1', 'us-gov-east-1']
+
+# What to collect for each inventory folder: the boto3 service, the calls whose
+# (fully paginated) results are merged into one file, the lists in the result
+# mapped to the id field of their items (None when the items are ids; a file is
+# only written when one of them is non-empty; see lookup for the paths), and the
+# file name. Regional services get one file per region. "volatile" lists the
+# resource fields that change on every poll (timestamps, usage counters), which
+# are left out of the change detection.
+SERVICES = {
+    "EC2": {"service": "ec2", "calls": [("describe_instances", {})],
+            "keys": {"Reservations[].Instances": "InstanceId"},
+            "file": "{region}_ec2_instances.json", "regional": True},
+    "S3": {"service": "s3", "calls": [("list_buckets", {})],
+           "keys": {"Buckets": "Name"},
+           "file": "s3_buckets.json", "regional": False},
+    "VPC": {"service": "ec2", "calls": [("describe_vpcs", {})],
+            "keys": {"Vpcs": "VpcId"},
+            "file": "{region}_vpcs.json", "regional": True},
+    "IAM": {"service": "iam",
+            "calls": [("list_users", {}), ("list_roles", {}), ("list_policies", {"Scope": "Local"})],
+            "keys": {"Users": "Arn", "Roles": "Arn", "Policies": "Arn"},
+            "volatile": ["PasswordLastUsed", "RoleLastUsed"],
+            "file": "iam_data.json", "regional": False},
+    "RDS": {"service": "rds", "calls": [("describe_db_instances", {})],
+            "keys": {"DBInstances": "DBInstanceArn"},
+            "volatile": ["LatestRestorableTime"],
+            "file": "{region}_rds_instances.json", "regional": True},
+    "Lambda": {"service": "lambda", "calls": [("list_functions", {})],
+               "keys": {"Functions": "FunctionArn"},
+               "file": "{region}_lambda_functions.json", "regional": True},
+    "CloudFormation": {"service": "cloudformation", "calls": [("describe_stacks", {})],
+                       "keys": {"Stacks": "StackId"},
+                       "file": "{region}_stacks.json", "regional": True},
+    "ELB": {"service": "elbv2", "calls": [("describe_load_balancers", {})],
+            "keys": {"LoadBalancers": "LoadBalancerArn"},
+            "file": "{region}_load_balancers.json", "regional": True},
+    "CloudWatch": {"service": "cloudwatch", "calls": [("describe_alarms", {})],
+                   "keys": {"MetricAlarms": "AlarmArn", "CompositeAlarms": "AlarmArn"},
+                   "volatile": ["StateReason", "StateReasonData", "StateUpdatedTimestamp",
+                                "StateTransitionedTimestamp"],
+                   "file": "{region}_alarms.json", "regional": True},
+    "EKS": {"service": "eks", "calls": [("list_clusters", {})],
+            "keys": {"clusters": None},
+            "file": "{region}_clusters.json", "regional": True},
+    "CloudTrail": {"service": "cloudtrail", "calls": [("describe_trails", {})],
+                   "keys": {"trailList": "TrailARN"},
+                   "file": "{region}_trails.json", "regional": True},
+    "DynamoDB": {"service": "dynamodb", "calls": [("list_tables", {})],
+                 "keys": {"TableNames": None},
+                 "file": "{region}_tables.json", "regional": True},
+    "SQS": {"service": "sqs", "calls": [("list_queues", {})],
+            "keys": {"QueueUrls": None},
+            "file": "{region}_queues.json", "regional": True},
+    "SNS": {"service": "sns", "calls": [("list_topics", {})],
+            "keys": {"Topics": "TopicArn"},
+            "file": "{region}_topics.json", "regional": True},
+    "EFS": {"service": "efs", "calls": [("describe_file_systems", {})],
+            "keys": {"FileSystems": "FileSystemId"},
+            "volatile": ["SizeInBytes"],
+            "file": "{region}_file_systems.json", "regional": True},
+    "CloudFront": {"service": "cloudfront", "calls": [("list_distributions", {})],
+                   "keys": {"DistributionList.Items": "Id"},
+                   "file": "distributions.json", "regional": False},
+    "Route53": {"service": "route53", "calls": [("list_hosted_zones", {})],
+                "keys": {"HostedZones": "Id"},
+                "file": "hosted_zones.json", "regional": False},
+    "SecretsManager": {"service": "secretsmanager", "calls": [("list_secrets", {})],
+                       "keys": {"SecretList": "ARN"},
+                       "volatile": ["LastAccessedDate"],
+                       "file": "{region}_secrets.json", "regional": True},
+    "ElasticBeanstalk": {"service": "elasticbeanstalk", "calls": [("describe_applications", {})],
+                         "keys": {"Applications": "ApplicationArn"},
+                         "file": "{region}_applications.json", "regional": True},
+    "ECS": {"service": "ecs", "calls": [("list_clusters", {})],
+            "keys": {"clusterArns": None},
+            "file": "{region}_clusters.json", "regional": True},
+    "ECR": {"service": "ecr", "calls": [("describe_repositories", {})],
+            "keys": {"repositories": "repositoryArn"},
+            "file": "{region}_repositories.json", "regional": True},
+}
+
+
+class AWSCollector:
+    """
+    Collects the AWS inventory into data_dir/<Folder>/<file>.json.
+
+    Every (service, region) pair is a separate task on one thread pool, and each
+    file is written as soon as its task finishes. Sessions are created once per
+    region and clients once per (region, service); list calls go through boto3
+    paginators so results aren't cut off at the first page. Regions are the
+    account's enabled regions (one describe_regions call) that offer the service.
+
+    With an inventory (utils.inventory_store.InventoryStore), files are only
+    written when their resources changed and the run's changes are logged.
+    """
+
+    def __init__(self, data_dir, services=None, regions=None, max_workers=16, profile_name=None,
+                 inventory=None):
+        self.data_dir = data_dir
+        self.inventory = inventory
+        self.services = {name: SERVICES[name] for name in (services or SERVICES)}
+        self.regions = regions
+        self.max_workers = max_workers
+        self.profile_name = profile_name
+        self.base_session = boto3.session.Session(profile_name=profile_name)
+        self.sessions = {}
+        self.clients = {}
+        self.enabled_regions = None
+        self.lock = threading.Lock()
+
+    def get_client(self, service_name, region_name):
+        # Clients are thread safe once created, but sessions and client creation
+        # aren't, so both are cached and built under the lock
+        with self.lock:
+            if region_name not in self.sessions:
+                self.sessions[region_name] = boto3.session.Session(
+                    profile_name=self.profile_name, region_name=region_name
+                )
+            key = (region_name, service_name)
+            if key not in self.clients:
+                self.clients[key] = self.sessions[region_name].client(service_name)
+            return self.clients[key]
+
+    def accessible_regions(self, service_name):
+        """Enabled regions of the account where service_name is offered."""
+        available = self.base_session.get_available_regions(service_name)
+        regions = self.regions or self._enabled_regions() or available
+        return [region for region in regions if region in available and region not in EXCLUDED_REGIONS]
+
+    def collect(self):
+        """Collect every configured service; returns the files written, per folder."""
+        targets = []
+        for folder, spec in self.services.items():
+            if spec["regional"]:
+                targets.extend((folder, region) for region in self.accessible_regions(spec["service"]))
+            else:
+                targets.append((folder, None))
+
+        if self.inventory is not None:
+            self.inventory.start_run()
+        written = {folder: [] for folder in self.services}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.collect_target, folder, region): folder for folder, region in targets}
+            for future in as_completed(futures):
+                filepath = future.result()
+                if filepath:
+                    written[futures[future]].append(filepath)
+        if self.inventory is not None:
+            self.inventory.commit()
+        return written
+
+    def collect_target(self, folder, region=None):
+        """Fetch one service in one region (or globally) and write its file; returns the path if it changed."""
+        spec = self.services[folder]
+        where = f"in region {region}" if region else "globally"
+        try:
+            client = self.get_client(spec["service"], region or self._global_region())
+            data = {}
+            for operation, params in spec["calls"]:
+                data.update(self._call(client, operation, params))
+        except (ClientError, BotoCoreError) as e:
+            print(f"Error fetching {folder} data {where}: {e}")
+            return None
+
+        relpath = os.path.join(folder, spec["file"].format(region=region))
+        has_data = any(lookup(data, key) for key in spec["keys"])
+        if not has_data:
+            print(f"No {folder} data found {where}")
+        if self.inventory is not None:
+            # An empty result still counts, so the resources it used to have are logged as removed
+            changes = self.inventory.record(
+                relpath, data if has_data else {}, spec["keys"], spec.get("volatile", ())
+            )
+            return os.path.join(self.data_dir, relpath) if changes else None
+        if not has_data:
+            return None
+        filepath = os.path.join(self.data_dir, relpath)
+        save_data_to_file(data, filepath)
+        return filepath
+
+    @staticmethod
+    def _call(client, operation, params):
+        if client.can_paginate(operation):
+            data = client.get_paginator(operation).paginate(**params).build_full_result()
+        else:
+            data = getattr(client, operation)(**params)
+        data.pop("ResponseMetadata", None)
+        return data
+
+    def _global_region(self):
+        return self.base_session.region_name or "us-east-1"
+
+    def _enabled_regions(self):
+        with self.lock:
+            if self.enabled_regions is not None:
+                return self.enabled_regions
+        try:
+            client = self.get_client("ec2", self._global_region())
+            regions = [region["RegionName"] for region in client.describe_regions()["Regions"]]
+        except (ClientError, BotoCoreError) as e:
+            print(f"Could not list enabled regions, using all available regions: {e}")
+            regions = []
+        with self.lock:
+            self.enabled_regions = regions
+        return regions
+
+
+def lookup(data, key):
+    """
+    data[key], where key may be a dotted path into nested dicts. A part ending
+    in [] goes into each item of a list and concatenates the results, e.g.
+    "Reservations[].Instances" is the instances of every reservation.
+    """
+    part, _, rest = key.partition(".")
+    if part.endswith("[]"):
+        items = lookup(data, part[:-2]) or []
+        if not rest:
+            return items
+        found = []
+        for item in items:
+            found.extend(lookup(item, rest) or [])
+        return found
+    value = data.get(part) if isinstance(data, dict) else None
+    return lookup(value, rest) if rest else value
+
+
+def save_data_to_file(data, filepath):
+    """Write data as JSON, replacing filepath in one step so readers never see a partial file."""
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    tmp_path = f"{filepath}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, default=str, indent=2)
+        os.replace(tmp_path, filepath)
+        print(f"Data saved to {filepath}")
+    except Exception as e:
+        print(f"Error saving data to file {filepath}: {e}")
@@ -2,6 +2,7 @@ import os
 import git
 from pathlib import Path
 from .env_loader import load_env_variables
+from forge import git_mirror
 
 from dotenv import load_dotenv
 
@@ -15,20 +16,12 @@ def clone_repository(state):
     repo_path = os.environ.get("REPO_PATH")
     branch_name = os.environ.get("BRANCH_NAME")
     print(f"Repo path: {repo_path}")
-    if os.path.exists(repo_path):
-        try:
-            # If the repository already exists, perform a pull
-            repo = git.Repo(repo_path)
-            origin = repo.remotes.origin
-            origin.pull(branch_name)
-        except Exception as e:
-            raise RuntimeError(f"Failed to pull latest changes: {e}")
-    else:
-        try:
-            # If the repository does not exist, clone it
-            repo = git.Repo.clone_from(repo_url, repo_path, branch=branch_name)
-        except git.exc.GitCommandError as e:
-            raise RuntimeError(f"Failed to clone repository: {e}")
+    try:
+        # Clones borrow objects from a local mirror of the remote, and an existing
+        # checkout of the same remote is just fetched and fast-forwarded
+        git_mirror.clone(repo_url, repo_path, branch=branch_name)
+    except (git.exc.GitCommandError, git_mirror.GitMirrorError) as e:
+        raise RuntimeError(f"Failed to clone or update repository: {e}")
 
     state["repo_path"] = repo_path
 
@@ -0,0 +1,199 @@
+# A copy of forge_agent_v1.2/utils/inventory_store.py, as this agent runs standalone;
+# keep the two in sync.
+import os
+import json
+import time
+import hashlib
+import threading
+from aws_collector import SERVICES, save_data_to_file, lookup
+
+
+class InventoryStore:
+    """
+    Per-resource fingerprints of the collected AWS inventory, so a collection
+    run only rewrites the files whose resources changed.
+
+    Each inventory file (e.g. EC2/us-east-1_ec2_instances.json) is split into
+    resources keyed by the id field of the service (see aws_collector.SERVICES),
+    and each resource is fingerprinted with a hash of its JSON, less the
+    service's volatile fields. A file is
+    written only when a resource in it was added, modified or removed, and
+    every such change is appended to a change log (changes.jsonl in state_dir,
+    one JSON object per change) so the RAG agents can look at what changed
+    instead of re-reading full dumps.
+    """
+
+    def __init__(self, data_dir, state_dir):
+        self.data_dir = data_dir
+        self.state_dir = state_dir
+        self.index_path = os.path.join(state_dir, "fingerprints.json")
+        self.changes_path = os.path.join(state_dir, "changes.jsonl")
+        self.fingerprints = self._load_index()
+        # Files that had fingerprints before the current run, i.e. have a delta to read
+        self.previous_files = set(self.fingerprints)
+        self.run_id = None
+        self.pending = []
+        self.last_changes = []
+        self.lock = threading.Lock()
+
+    def start_run(self):
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self.pending = []
+        with self.lock:
+            self.previous_files = set(self.fingerprints)
+
+    def has_snapshot(self, relpath):
+        """Whether relpath was collected before the current run, so its delta says what changed."""
+        return relpath in self.previous_files
+
+    def record(self, relpath, data, keys, volatile=()):
+        """
+        Compare data for one inventory file with its last fingerprints, write
+        the file (or remove it, when empty) if anything changed, and return
+        the changes. Fields in volatile are ignored in the comparison.
+        """
+        current = resources(data, keys)
+        new_prints = {rid: fingerprint(resource, volatile) for rid, resource in current.items()}
+        with self.lock:
+            old_prints = self.fingerprints.get(relpath, {})
+
+        changes = [
+            self._change(relpath, rid, "added" if rid not in old_prints else "modified")
+            for rid, digest in new_prints.items() if old_prints.get(rid) != digest
+        ]
+        changes.extend(self._change(relpath, rid, "removed") for rid in old_prints if rid not in new_prints)
+
+        filepath = os.path.join(self.data_dir, relpath)
+        if not changes and os.path.exists(filepath) == bool(current):
+            return []
+        if current:
+            save_data_to_file(data, filepath)
+        elif os.path.exists(filepath):
+            os.remove(filepath)
+            print(f"Removed {filepath}, it has no resources left")
+
+        with self.lock:
+            if new_prints:
+                self.fingerprints[relpath] = new_prints
+            else:
+                self.fingerprints.pop(relpath, None)
+            self.pending.extend(changes)
+        return changes
+
+    def commit(self):
+        """Persist the fingerprints and append this run's changes to the change log; returns the changes."""
+        with self.lock:
+            changes, self.pending = self.pending, []
+            fingerprints = json.dumps(self.fingerprints, indent=2)
+
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(fingerprints)
+        os.replace(tmp_path, self.index_path)
+        if changes:
+            with open(self.changes_path, 'a') as f:
+                f.writelines(json.dumps(change) + "\n" for change in changes)
+
+        self.last_changes = changes
+        return changes
+
+    def changes(self, run_id=None):
+        """Changes from the change log, for one run or all of them."""
+        if not os.path.exists(self.changes_path):
+            return []
+        with open(self.changes_path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return [record for record in records if run_id is None or record["run"] == run_id]
+
+    def read_delta(self, relpath, changes=None):
+        """
+        The added and modified resources of one inventory file (as currently
+        on disk) and the ids of the removed ones, for changes (default: the
+        last run's).
+        """
+        changes = [change for change in (self.last_changes if changes is None else changes)
+                   if change["file"] == relpath]
+        delta = {"file": relpath, "added": [], "modified": [], "removed": []}
+        if not changes:
+            return delta
+
+        current = {}
+        filepath = os.path.join(self.data_dir, relpath)
+        if os.path.exists(filepath):
+            with open(filepath) as f:
+                current = resources(json.load(f), self._keys(relpath))
+        for change in changes:
+            if change["change"] == "removed":
+                delta["removed"].append(change["resource"])
+            elif change["resource"] in current:
+                delta[change["change"]].append(current[change["resource"]])
+        return delta
+
+    @staticmethod
+    def summarize(changes, max_ids=5):
+        """A short, per-file text summary of changes, for prompts."""
+        by_file = {}
+        for change in changes:
+            by_file.setdefault(change["file"], {"added": [], "modified": [], "removed": []})
+            by_file[change["file"]][change["change"]].append(change["resource"])
+        if not by_file:
+            return "No changes since the last collection."
+
+        lines = []
+        for relpath, kinds in sorted(by_file.items()):
+            counts = ", ".join(f"{len(ids)} {kind}" for kind, ids in kinds.items() if ids)
+            lines.append(f"{relpath}: {counts}")
+            for kind, ids in kinds.items():
+                for rid in ids[:max_ids]:
+                    lines.append(f"    {kind}: {rid}")
+                if len(ids) > max_ids:
+                    lines.append(f"    ... {len(ids) - max_ids} more {kind}")
+        return "\n".join(lines)
+
+    def _change(self, relpath, rid, kind):
+        return {
+            "run": self.run_id,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "file": relpath,
+            "resource": rid,
+            "change": kind
+        }
+
+    def _keys(self, relpath):
+        folder = relpath.replace(os.sep, "/").split("/")[0]
+        return SERVICES.get(folder, {}).get("keys", {})
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read inventory fingerprints, starting fresh: {e}")
+            return {}
+
+
+def resources(data, keys):
+    """
+    Split an inventory file into {resource id: resource}. keys maps each list
+    in the file to the id field of its items (None when the items are ids).
+    """
+    found = {}
+    for key, id_field in keys.items():
+        for item in lookup(data, key) or []:
+            if id_field is None:
+                rid = str(item)
+            elif isinstance(item, dict) and item.get(id_field):
+                rid = str(item[id_field])
+            else:
+                rid = fingerprint(item)
+            found[f"{key}:{rid}"] = item
+    return found
+
+
+def fingerprint(resource, volatile=()):
+    if volatile and isinstance(resource, dict):
+        resource = {key: value for key, value in resource.items() if key not in volatile}
+    return hashlib.sha1(json.dumps(resource, sort_keys=True, default=str).encode()).hexdigest()
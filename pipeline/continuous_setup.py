@@ -6,6 +6,7 @@ import json
 import logging
 import git
 from dotenv import load_dotenv
+from forge import git_mirror
 from langchain_openai import ChatOpenAI
 import google.generativeai as genai
 import asyncio
@@ -52,23 +53,13 @@ def clone_repository():
     if not github_token:
         raise ValueError("GITHUB_TOKEN not found in .env file")
     
-    if os.path.exists(repo_path):
-        # print(f"\nRemoving existing repo directory: {repo_path}")
-        import shutil
-        shutil.rmtree(repo_path)
-    
-    # Create parent directories if they don't exist
-    os.makedirs(os.path.dirname(repo_path), exist_ok=True)
-    
-    # print(f"\nCloning repository from {repo_url} to {repo_path}")
-    
     try:
         # Construct authenticated URL
         auth_url = repo_url.replace('https://', f'https://{github_token}@')
         
-        # Clone repository
-        repo = git.Repo.clone_from(auth_url, repo_path)
-        repo.git.checkout(repo_branch)
+        # Clone from the local mirror of the remote; an existing checkout is reset to
+        # the remote branch in place, anything else at repo_path is replaced
+        git_mirror.clone(auth_url, repo_path, branch=repo_branch, reset=True)
         # print("Repository cloned successfully!")
         
         return repo_path
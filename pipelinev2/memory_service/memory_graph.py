@@ -11,6 +11,8 @@ from dotenv import load_dotenv
 import logging
 from typing import Annotated
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +23,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+EMBED_BATCH_SIZE = 100
+EMBED_WORKERS = 4
+
 class MemoryState(TypedDict):
     messages: Annotated[list, add_messages]
     repo_path: str
@@ -90,33 +95,69 @@ class MemoryService:
         state["memories"] = memories
         return state
     
+    @staticmethod
+    def memory_id(memory: Dict) -> str:
+        """Stable id for a memory, prefixed by its repo so a repo's memories can be fetched by id."""
+        key = hashlib.sha1(memory.get("file_path", "").encode('utf-8')).hexdigest()[:16]
+        return f"{memory['repo_path']}#{memory['type']}#{key}"
+
+    @staticmethod
+    def content_hash(memory: Dict) -> str:
+        payload = json.dumps([memory["type"], memory.get("file_path", ""), memory["content"]])
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in chunks, with a few chunks in flight at once."""
+        chunks = [texts[start:start + EMBED_BATCH_SIZE] for start in range(0, len(texts), EMBED_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=EMBED_WORKERS) as executor:
+            results = executor.map(self.embeddings.embed_documents, chunks)
+        return [embedding for chunk in results for embedding in chunk]
+
+    def fetch_memories(self, ids: List[str]) -> Dict[str, Dict]:
+        """Fetch stored memories by id, without any embedding or similarity search."""
+        found = {}
+        for start in range(0, len(ids), 100):
+            response = self.index.fetch(ids=ids[start:start + 100], namespace=self.namespace)
+            for vector_id, vector in response.vectors.items():
+                found[vector_id] = vector.metadata or {}
+        return found
+
+    def get_repo_memories(self, repo_path: str, file_paths: List[str]) -> Dict[str, Dict]:
+        """Look up a repo's file_analysis and repo_overview memories by id."""
+        keys = [{"repo_path": repo_path, "type": "file_analysis", "file_path": f} for f in file_paths]
+        keys.append({"repo_path": repo_path, "type": "repo_overview"})
+        return self.fetch_memories([self.memory_id(key) for key in keys])
+
     def store_memories(self, state: MemoryState) -> MemoryState:
         """Store memories in Pinecone."""
         logger.info("Storing memories in Pinecone")
         
         try:
-            # Prepare vectors for upsert
-            vectors = []
-            for memory in state["memories"]:
-                # Convert memory to string for embedding
-                memory_str = json.dumps(memory)
-                
-                # Generate embedding using OpenAI
-                embedding = self.embeddings.embed_query(memory_str)
-                
-                # Create vector ID
-                vector_id = f"{memory['repo_path']}_{memory['type']}_{datetime.now().timestamp()}"
-                
-                # Add to vectors list
-                vectors.append({
+            # Memories already stored with the same content need no new embedding
+            by_id = {self.memory_id(memory): memory for memory in state["memories"]}
+            stored = self.fetch_memories(list(by_id))
+            to_store = [
+                (vector_id, memory) for vector_id, memory in by_id.items()
+                if stored.get(vector_id, {}).get("content_hash") != self.content_hash(memory)
+            ]
+            if not to_store:
+                logger.info("All memories are up to date")
+                return state
+
+            embeddings = self.embed_documents([json.dumps(memory) for _, memory in to_store])
+            vectors = [
+                {
                     "id": vector_id,
                     "values": embedding,
-                    "metadata": memory
-                })
-            
+                    "metadata": {**memory, "content_hash": self.content_hash(memory)}
+                }
+                for (vector_id, memory), embedding in zip(to_store, embeddings)
+            ]
+
             # Upsert to Pinecone
-            self.index.upsert(vectors=vectors, namespace=self.namespace)
-            logger.info(f"Successfully stored {len(vectors)} memories")
+            for start in range(0, len(vectors), 100):
+                self.index.upsert(vectors=vectors[start:start + 100], namespace=self.namespace)
+            logger.info(f"Successfully stored {len(vectors)} memories, {len(by_id) - len(vectors)} unchanged")
             
         except Exception as e:
             logger.error(f"Error storing memories: {str(e)}")
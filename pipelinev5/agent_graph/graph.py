@@ -7,7 +7,15 @@ from langchain_core.messages import SystemMessage, HumanMessage
 
 from agents.planning_workflow_agents import question_generator_agent, plan_creator_agent, plan_validator_agent, end_node
 # from agents.temp_devops import devops_agent, get_next_devops_action, execute_tool
-from agents.devops_agents import get_next_devops_action, execute_tool
+from agents.devops_agents import (
+    get_next_devops_action,
+    execute_tool,
+    schedule_steps,
+    route_scheduled_steps,
+    route_devops_action,
+    run_parallel_step,
+    merge_parallel_steps
+)
 
 from agents.human_replanning_agents import replanning_agent
 from agents.system_mapper_agents import system_mapper_agent
@@ -140,6 +148,27 @@ def create_graph(server=None, model=None, deepseek_model=None, stop=None, model_
         lambda state: execute_tool(state)
     )
 
+    # Plan step scheduling: independent steps fan out to run_parallel_step
+    graph.add_node(
+        "schedule_steps",
+        lambda state: schedule_steps(state)
+    )
+
+    graph.add_node(
+        "run_parallel_step",
+        lambda state: run_parallel_step(
+            state=state,
+            prompt=devops_prompt_template,
+            model=model,
+            server=server
+        )
+    )
+
+    graph.add_node(
+        "merge_parallel_steps",
+        lambda state: merge_parallel_steps(state)
+    )
+
     # End node
     graph.add_node("end", lambda state: end_node(state=state))
 
@@ -156,6 +185,8 @@ def create_graph(server=None, model=None, deepseek_model=None, stop=None, model_
     graph.add_edge("compression", "plan_creator")
     graph.add_edge("plan_creator", "plan_validator")
     graph.add_edge("execute_tool", "get_devops_action")
+    graph.add_edge("run_parallel_step", "merge_parallel_steps")
+    graph.add_edge("merge_parallel_steps", "schedule_steps")
 
     # Conditional edges for router
     graph.add_conditional_edges(
@@ -185,18 +216,22 @@ def create_graph(server=None, model=None, deepseek_model=None, stop=None, model_
         lambda state: (
             "plan_validator"
             if state.get("edit_request") and state.get("edit_request").get("request") != "done"
-            else "get_devops_action"
+            else "schedule_steps"
         )
     )
 
+    # Conditional edges for step scheduling: end, the next step in place, or a fan-out
+    graph.add_conditional_edges(
+        "schedule_steps",
+        route_scheduled_steps,
+        ["end", "get_devops_action", "run_parallel_step"]
+    )
+
     # Conditional edges for devops execution
     graph.add_conditional_edges(
         "get_devops_action",
-        lambda state: (
-            "end" 
-            if state["current_step_index"] >= len(state["plan_steps"])
-            else "execute_tool"
-        )
+        route_devops_action,
+        ["execute_tool", "schedule_steps"]
     )
 
     return graph
@@ -233,6 +268,7 @@ def initialize_state(query: str, repo_path: str) -> AgentGraphState:
         "current_step_index": 0,
         "completed_steps": [],
         "knowledge_sequence": [],
+        "parallel_step_results": {},
         "iteration": 0,
         # Add GitHub-specific information
         "github_owner": github_owner,
@@ -243,6 +279,6 @@ def initialize_state(query: str, repo_path: str) -> AgentGraphState:
     })
     return initial_state
 
-def compile_workflow(graph):
-    """Compile the workflow graph."""
-    return graph.compile()
\ No newline at end of file
+def compile_workflow(graph, checkpointer=None):
+    """Compile the workflow graph, saving a checkpoint after every node when checkpointer is given."""
+    return graph.compile(checkpointer=checkpointer)
\ No newline at end of file
@@ -1,6 +1,5 @@
+import sys
 import json
-import time
-import select
 from pathlib import Path
 import subprocess
 import os
@@ -12,6 +11,7 @@ from prompts.devops_agent_prompts import DECISION_SUMMARY_PROMPT, STEP_SUMMARY_P
 from pydantic import BaseModel
 from ai_models.openai_models import get_open_ai
 from utils.general_helper_functions import configure_logger
+from utils.command_executor import AsyncCommandExecutor, CommandResult, run_coroutine
 from langchain_core.prompts import PromptTemplate
 from termcolor import colored
 
@@ -21,6 +21,16 @@ class DecisionSummaryModel(BaseModel):
     tagline: str
     summary: str
 
+def template_decision_summary(decision: "LLMDecision") -> (str, str):
+    """Tagline and summary for a decision built locally, without an LLM call."""
+    action = decision.type.replace('_', ' ')
+    if decision.type == "end":
+        return "Mission Accomplished", "The current step has been completed successfully. Moving to next step."
+    return (
+        f"DevOps {action.title()} in Progress",
+        f"Performing a {action} operation. {decision.description}"
+    )
+
 def generate_quick_summary_from_decision(decision: "LLMDecision") -> (str, str):
     """
     Generate a short tagline and summary from the LLM decision.
@@ -59,30 +69,34 @@ def generate_quick_summary_from_decision(decision: "LLMDecision") -> (str, str):
         except (json.JSONDecodeError, ValueError) as e:
             logger.warning(f"Failed to parse decision summary as JSON: {response.content}\nError: {e}")
             # Provide meaningful defaults instead of "No tagline/summary"
-            if decision.type == "end":
-                return "Mission Accomplished", "The current step has been completed successfully. Moving to next step."
-            return (
-                f"DevOps {decision.type.replace('_', ' ').title()} in Progress",
-                f"Performing a {decision.type.replace('_', ' ')} operation. {safe_description}"
-            )
+            return template_decision_summary(decision)
     except Exception as e:
         logger.warning(f"Could not generate quick summary: {str(e)}")
-        return (
-            f"DevOps {decision.type.replace('_', ' ').title()} in Progress",
-            f"Performing a {decision.type.replace('_', ' ')} operation. {safe_description}"
-        )
+        return template_decision_summary(decision)
 
 ##############################################################################
 #                        Helper Formatting Functions
 ##############################################################################
 
-def format_knowledge_sequence(knowledge_sequence: List[Dict], step_description: str) -> str:
-    """Convert the knowledge_sequence (tool calls + outcomes) into text."""
+def format_knowledge_sequence(knowledge_sequence: List[Dict], step_description: str, max_full_entries: Optional[int] = None) -> str:
+    """
+    Convert the knowledge_sequence (tool calls + outcomes) into text.
+    With max_full_entries, only the latest entries are shown in full and older
+    ones are collapsed to one line each.
+    """
     if not knowledge_sequence:
         return "No tool calls or outcomes for this step yet. This is the first time we're seeing this step."
     
     text = f"Current Step: {step_description}\n\n"
-    for i, entry in enumerate(knowledge_sequence, 1):
+    first_full = 1
+    if max_full_entries is not None and len(knowledge_sequence) > max_full_entries:
+        first_full = len(knowledge_sequence) - max_full_entries + 1
+        text += "Earlier Actions:\n"
+        for i, entry in enumerate(knowledge_sequence[:first_full - 1], 1):
+            text += f"Action {i}: {entry['action_type']} {str(entry['action'])[:80]} -> {entry['result']['status']}\n"
+        text += "\n"
+
+    for i, entry in enumerate(knowledge_sequence[first_full - 1:], first_full):
         text += f"Action {i}:\n"
         text += f"Type: {entry['action_type']}\n"
         text += f"Input: {entry['action']}\n"
@@ -132,6 +146,29 @@ def format_step_knowledge(knowledge_sequence: List[Dict], step_description: str)
         text += "\n"
     return text
 
+def template_step_summary(knowledge_sequence: List[Dict], step_description: str) -> Dict:
+    """Summary of a step built locally from its actions, used until the LLM summary is ready."""
+    if not knowledge_sequence:
+        return {
+            "summary": "No actions taken",
+            "key_learnings": [],
+            "relevant_for_future": []
+        }
+
+    actions = [entry['action_type'] for entry in knowledge_sequence]
+    errors = [entry['result']['error'] for entry in knowledge_sequence if entry['result'].get('error')]
+    # Compacted history starts with one entry standing for the earlier actions
+    action_count = sum(entry.get('folded_actions', 1) for entry in knowledge_sequence)
+    summary = (
+        f"{step_description}: {action_count} action(s) ({', '.join(actions)}), "
+        f"last result {knowledge_sequence[-1]['result']['status']}"
+    )
+    return {
+        "summary": summary,
+        "key_learnings": [f"Error seen: {error[:200]}" for error in errors[-3:]],
+        "relevant_for_future": []
+    }
+
 def summarize_step_knowledge(knowledge_sequence: List[Dict], step_description: str) -> Dict:
     """Use an LLM to summarize everything that happened in this step."""
     if not knowledge_sequence:
@@ -192,10 +229,18 @@ class ToolResult(BaseModel):
 class DevOpsTools:
     """Collection of tools for DevOps automation, including code execution and LLM-based validations."""
     
-    def __init__(self, working_directory: str, subprocess_handler: Any):
+    def __init__(self, working_directory: str, subprocess_handler: Any, interactive: Optional[bool] = None):
         self.working_directory = Path(working_directory)
         self.subprocess_handler = subprocess_handler
+        # None follows the terminal; False never reads stdin, e.g. in a parallel step
+        self.interactive = interactive
         self.forge = None
+        self.command_executor = AsyncCommandExecutor(
+            max_output_lines=int(os.getenv("DEVOPS_COMMAND_OUTPUT_LINES", "2000")),
+            max_concurrency=int(os.getenv("DEVOPS_COMMAND_CONCURRENCY", "4"))
+        )
+        # Wall-clock ceiling for any one command, whatever it keeps printing
+        self.max_command_runtime = float(os.getenv("DEVOPS_COMMAND_MAX_RUNTIME", "3600"))
         
         # Make sure the working directory exists
         self.working_directory.mkdir(parents=True, exist_ok=True)
@@ -212,124 +257,29 @@ class DevOpsTools:
         self,
         command: str,
         timeout: Optional[int] = 20,
-        cwd: Optional[str] = None
+        cwd: Optional[str] = None,
+        interactive: Optional[bool] = None
     ) -> ToolResult:
         """
-        Execute a shell command in a subprocess with proper interactive input support.
-        Uses non-blocking I/O to handle input requests naturally.
+        Execute a shell command, streaming its output as it runs.
+        `timeout` is how long the command may go without output or input before
+        it's killed, and no command runs longer than DEVOPS_COMMAND_MAX_RUNTIME
+        seconds. When attached to a terminal, typed lines are passed to the
+        command's stdin (`exit` stops it).
         """
         try:
             effective_cwd = cwd if cwd else str(self.working_directory)
             print(colored(f"\nExecuting command: {command}", 'yellow'))
-            
-            # Create process with pipes
-            process = subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                stdin=subprocess.PIPE,
-                cwd=str(effective_cwd)
-            )
-            
-            output_buffer = []
-            current_line = []
-            start_time = time.time()
-            
-            def read_stream(stream):
-                """Helper to read from a stream."""
-                try:
-                    return stream.read1().decode('utf-8')
-                except (IOError, BlockingIOError):
-                    return None
-            
-            # Set non-blocking mode
-            import fcntl
-            import os
-            for stream in [process.stdout, process.stderr]:
-                flags = fcntl.fcntl(stream, fcntl.F_GETFL)
-                fcntl.fcntl(stream, fcntl.F_SETFL, flags | os.O_NONBLOCK)
-            
-            while True:
-                # Check timeout
-                if timeout and time.time() - start_time > timeout:
-                    process.kill()
-                    return ToolResult(
-                        status="error",
-                        error=f"Command timed out after {timeout} seconds"
-                    )
 
-                # Check for output
-                readable, writable, _ = select.select(
-                    [process.stdout, process.stderr],
-                    [process.stdin],
-                    [],
-                    0.1
-                )
-
-                # Handle output
-                for stream in readable:
-                    data = read_stream(stream)
-                    if data:
-                        if stream == process.stderr:
-                            print(colored(data, 'red'), end='', flush=True)
-                        else:
-                            print(data, end='', flush=True)
-                        output_buffer.append(data)
-
-                # Check if process has finished
-                retcode = process.poll()
-                if retcode is not None:
-                    # Get any remaining output
-                    try:
-                        stdout, stderr = process.communicate(timeout=0.1)
-                        if stdout:
-                            stdout = stdout.decode('utf-8')
-                            print(stdout, end='', flush=True)
-                            output_buffer.append(stdout)
-                        if stderr:
-                            stderr = stderr.decode('utf-8')
-                            print(colored(stderr, 'red'), end='', flush=True)
-                            output_buffer.append(stderr)
-                    except subprocess.TimeoutExpired:
-                        pass
-                    break
-
-                # Check if input is needed
-                if not readable:
-                    try:
-                        user_input = input()
-                        if user_input.strip().lower() == 'exit':
-                            process.kill()
-                            return ToolResult(
-                                status="success",
-                                output=''.join(output_buffer)
-                            )
-                        process.stdin.write(user_input.encode('utf-8') + b'\n')
-                        process.stdin.flush()
-                        output_buffer.append(f"{user_input}\n")
-                        start_time = time.time()  # Reset timeout after input
-                    except (EOFError, KeyboardInterrupt):
-                        process.kill()
-                        return ToolResult(
-                            status="error",
-                            error="Input interrupted"
-                        )
-
-                time.sleep(0.01)  # Prevent CPU thrashing
-
-            output = ''.join(output_buffer)
-            if retcode == 0:
-                return ToolResult(
-                    status="success",
-                    output=output
-                )
-            else:
-                return ToolResult(
-                    status="error",
-                    error=f"Command failed with exit code {retcode}",
-                    output=output
-                )
+            if interactive is None:
+                interactive = self.interactive
+            if interactive is None:
+                interactive = sys.stdin.isatty()
+            result = run_coroutine(self.command_executor.run(
+                command, cwd=str(effective_cwd), timeout=timeout, interactive=interactive,
+                max_runtime=self.max_command_runtime
+            ))
+            return self._command_tool_result(result, timeout)
 
         except Exception as e:
             import traceback
@@ -337,7 +287,67 @@ class DevOpsTools:
                 status="error",
                 error=f"Error executing command: {str(e)}\n{traceback.format_exc()}"
             )
-    
+
+    def execute_commands(
+        self,
+        commands: List[str],
+        timeout: Optional[int] = 20,
+        cwd: Optional[str] = None
+    ) -> ToolResult:
+        """
+        Execute independent commands concurrently, never reading stdin. Output
+        lines are prefixed with the command's number; the result succeeds only
+        if every command does, and reports each one.
+        """
+        if not commands:
+            return ToolResult(status="error", error="No commands given")
+        try:
+            effective_cwd = cwd if cwd else str(self.working_directory)
+            for i, command in enumerate(commands, 1):
+                print(colored(f"\nExecuting command [{i}]: {command}", 'yellow'))
+
+            results = run_coroutine(self.command_executor.run_many(
+                commands, cwd=str(effective_cwd), timeout=timeout, max_runtime=self.max_command_runtime
+            ))
+        except Exception as e:
+            return ToolResult(status="error", error=f"Error executing commands: {str(e)}")
+
+        tool_results = [self._command_tool_result(result, timeout) for result in results]
+        output = "\n\n".join(
+            f"[{i}] $ {command}\n{tool_result.output or ''}"
+            for i, (command, tool_result) in enumerate(zip(commands, tool_results), 1)
+        )
+        errors = [
+            f"[{i}] {command}: {tool_result.error}"
+            for i, (command, tool_result) in enumerate(zip(commands, tool_results), 1)
+            if tool_result.status != "success"
+        ]
+        if errors:
+            return ToolResult(status="error", error="\n".join(errors), output=output)
+        return ToolResult(status="success", output=output)
+
+    def _command_tool_result(self, result: CommandResult, timeout: Optional[int]) -> ToolResult:
+        if result.exceeded_max_runtime:
+            return ToolResult(
+                status="error",
+                error=f"Command killed after running for {self.max_command_runtime:g} seconds",
+                output=result.output
+            )
+        if result.timed_out:
+            return ToolResult(
+                status="error",
+                error=f"Command timed out after {timeout} seconds without output",
+                output=result.output
+            )
+        # Typing exit stops the command, as a deliberate end rather than a failure
+        if result.cancelled or result.returncode == 0:
+            return ToolResult(status="success", output=result.output)
+        return ToolResult(
+            status="error",
+            error=f"Command failed with exit code {result.returncode}",
+            output=result.output
+        )
+
     def modify_code(self, code: str, instructions: str, cwd: Optional[str] = None) -> "ToolResult":
         """Execute code through Forge's chat interface, returning a ToolResult."""
         if self.forge is None:
@@ -492,8 +502,16 @@ Please make any necessary modifications and execute the code.
     #  Human involvement
     ########################################################################
     
+    def _no_human_input(self) -> Optional["ToolResult"]:
+        if self.interactive is False:
+            return ToolResult(status="error", error="No human input is available while steps run in parallel")
+        return None
+
     def ask_human_for_information(self, question: str) -> "ToolResult":
         """Prompt the user for information via CLI and return their response."""
+        unavailable = self._no_human_input()
+        if unavailable:
+            return unavailable
         try:
             print(f"\n[DEVOPS AGENT QUESTION]: {question}")
             answer = input("Your response: ").strip()
@@ -503,6 +521,9 @@ Please make any necessary modifications and execute the code.
 
     def ask_human_for_intervention(self, explanation: str) -> "ToolResult":
         """Wait for user intervention and explanation before proceeding."""
+        unavailable = self._no_human_input()
+        if unavailable:
+            return unavailable
         try:
             print(f"\n[DEVOPS AGENT INTERVENTION REQUIRED]: {explanation}")
             print("Please perform the necessary actions and type 'done' when finished.")
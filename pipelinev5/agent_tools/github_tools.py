@@ -1,38 +1,38 @@
 # pipelinev5/agent_tools/github_tools.py
 
 import os
+import json
 import requests
 from typing import List, Optional, Dict, Any
 from termcolor import colored
 from states.state import ToolResult
-from utils.general_helper_functions import load_config
+from utils.general_helper_functions import load_config, base_path
+from utils.github_client import GitHubClient
 
 config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
 load_config(config_path)
 
 github_token = os.getenv("GIT_TOKEN")
 
+# One pooled client for all GitHub calls. List endpoints are paginated up to
+# GITHUB_MAX_PAGES pages and responses are cached by ETag in GITHUB_CACHE_DIR
+# (relative to pipelinev5), so repeat runs mostly get 304s
+github_client = GitHubClient(
+    token=github_token,
+    cache_dir=str(base_path(os.getenv("GITHUB_CACHE_DIR", os.path.join("system_maps", "github_cache")))),
+    max_pages=int(os.getenv("GITHUB_MAX_PAGES", "3")),
+    max_workers=int(os.getenv("GITHUB_MAX_WORKERS", "6"))
+)
+
 def fetch_github(owner: str, repo: str, endpoint: str, method: str = "GET", params: dict = None) -> Dict[str, Any]:
     """
     Generic GitHub API request handler with error handling
     """
     try:
-        url = f"https://api.github.com/repos/{owner}/{repo}/{endpoint}"
-        headers = {
-            "Authorization": f"Bearer {github_token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
-        
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=headers,
-            params=params
-        )
-        
-        response.raise_for_status()
-        return response.json()
+        path = f"repos/{owner}/{repo}/{endpoint}"
+        if method == "GET":
+            return github_client.get(path, params=params)
+        return github_client.request(method, path, params=params)
         
     except requests.exceptions.RequestException as e:
         print(colored(f"GitHub API error: {str(e)}", 'red'))
@@ -44,6 +44,18 @@ class GitHubTools:
     def __init__(self, owner: str, repo: str):
         self.owner = owner
         self.repo = repo
+
+    def fetch_all(self, tool_names: List[str]) -> Dict[str, ToolResult]:
+        """Run the named fetch_* tools concurrently; unknown names are left out."""
+        calls = {
+            name: (getattr(self, name), ())
+            for name in tool_names
+            if name.startswith("fetch_") and name != "fetch_all" and callable(getattr(self, name, None))
+        }
+        return {
+            name: result if isinstance(result, ToolResult) else ToolResult(status="error", error=str(result))
+            for name, result in github_client.fetch_many(calls).items()
+        }
         
     def fetch_issues(self, state: str = "all") -> ToolResult:
         """Fetch repository issues."""
@@ -59,7 +71,7 @@ class GitHubTools:
                 
             return ToolResult(
                 status="success",
-                output=str(result)
+                output=json.dumps(result)
             )
             
         except Exception as e:
@@ -81,7 +93,7 @@ class GitHubTools:
                 
             return ToolResult(
                 status="success",
-                output=str(result)
+                output=json.dumps(result)
             )
             
         except Exception as e:
@@ -104,7 +116,7 @@ class GitHubTools:
                 
             return ToolResult(
                 status="success",
-                output=str(result)
+                output=json.dumps(result)
             )
             
         except Exception as e:
@@ -126,7 +138,7 @@ class GitHubTools:
                 
             return ToolResult(
                 status="success",
-                output=str(result)
+                output=json.dumps(result)
             )
             
         except Exception as e:
@@ -149,7 +161,7 @@ class GitHubTools:
                 
             return ToolResult(
                 status="success",
-                output=str(result)
+                output=json.dumps(result)
             )
             
         except Exception as e:
@@ -171,7 +183,7 @@ class GitHubTools:
                 
             return ToolResult(
                 status="success",
-                output=str(result)
+                output=json.dumps(result)
             )
             
         except Exception as e:
@@ -193,7 +205,7 @@ class GitHubTools:
                 
             return ToolResult(
                 status="success",
-                output=str(result)
+                output=json.dumps(result)
             )
             
         except Exception as e:
@@ -216,7 +228,7 @@ class GitHubTools:
                 
             return ToolResult(
                 status="success",
-                output=str(result)
+                output=json.dumps(result)
             )
             
         except Exception as e:
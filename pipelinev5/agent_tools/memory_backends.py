@@ -0,0 +1,317 @@
+import os
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from utils.general_helper_functions import configure_logger
+
+logger = configure_logger(__name__)
+
+EMBEDDING_DIMENSIONS = 1536
+
+# Metadata fields which can be filtered on exactly, without a vector search
+FILTER_FIELDS = ("type", "repo_path", "file_path")
+
+# Pinecone's top_k limits for queries returning metadata, and ids only
+PINECONE_MAX_TOP_K_WITH_METADATA = 1000
+PINECONE_MAX_TOP_K = 10000
+
+
+class MemoryBackend:
+    """
+    Vector store interface used by MemoryTools.
+
+    Records are dicts with "id", "values" (the embedding) and "metadata", the
+    same shape Pinecone's upsert takes. Filters map metadata fields to a value,
+    or to a list of accepted values.
+    """
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def query(self, vector: List[float], top_k: int = 10, filter: Optional[Dict] = None) -> List[Dict]:
+        """Return up to top_k {"id", "score", "metadata"} dicts, most similar first."""
+        raise NotImplementedError
+
+    def find(self, filter: Dict, limit: int = 10000, id_prefix: Optional[Union[str, List[str]]] = None) -> List[Dict]:
+        """Return the {"id", "metadata"} dicts exactly matching filter (and starting with an id_prefix)."""
+        raise NotImplementedError
+
+    def fetch(self, ids: List[str]) -> Dict[str, Dict]:
+        """Return the metadata of the given ids, for the ids that exist."""
+        raise NotImplementedError
+
+    def delete(self, ids: List[str]) -> None:
+        """Remove the given ids; unknown ids are ignored."""
+        raise NotImplementedError
+
+
+def id_prefixes(id_prefix: Optional[Union[str, List[str]]]) -> List[str]:
+    if not id_prefix:
+        return []
+    return [id_prefix] if isinstance(id_prefix, str) else list(id_prefix)
+
+
+def matches_filter(metadata: Dict, filter: Optional[Dict]) -> bool:
+    for field, value in (filter or {}).items():
+        accepted = value if isinstance(value, (list, tuple)) else [value]
+        if metadata.get(field) not in accepted:
+            return False
+    return True
+
+
+class PineconeMemoryBackend(MemoryBackend):
+    def __init__(self, index_name: str = "forge", dimensions: int = EMBEDDING_DIMENSIONS):
+        from pinecone import Pinecone
+
+        pc = Pinecone(api_key=os.getenv('PINECONE_API_KEY'))
+        self.index = pc.Index(index_name)
+        self.dimensions = dimensions
+
+    @staticmethod
+    def _pinecone_filter(filter: Optional[Dict]) -> Optional[Dict]:
+        if not filter:
+            return None
+        return {
+            field: {"$in": value} if isinstance(value, (list, tuple)) else {"$eq": value}
+            for field, value in filter.items()
+        }
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        self.index.upsert(vectors=vectors)
+
+    def query(self, vector: List[float], top_k: int = 10, filter: Optional[Dict] = None) -> List[Dict]:
+        results = self.index.query(
+            vector=vector,
+            top_k=min(top_k, PINECONE_MAX_TOP_K_WITH_METADATA),
+            include_metadata=True,
+            filter=self._pinecone_filter(filter)
+        )
+        return [{"id": m.id, "score": m.score, "metadata": m.metadata} for m in results.matches]
+
+    def fetch(self, ids: List[str]) -> Dict[str, Dict]:
+        found = {}
+        for start in range(0, len(ids), 100):
+            response = self.index.fetch(ids=ids[start:start + 100])
+            for vector_id, vector in response.vectors.items():
+                found[vector_id] = vector.metadata or {}
+        return found
+
+    def delete(self, ids: List[str]) -> None:
+        for start in range(0, len(ids), 1000):
+            self.index.delete(ids=ids[start:start + 1000])
+
+    def find(self, filter: Dict, limit: int = 10000, id_prefix: Optional[Union[str, List[str]]] = None) -> List[Dict]:
+        prefixes = id_prefixes(id_prefix)
+        if prefixes:
+            # Key-value path: list the ids under the prefixes and fetch them directly
+            try:
+                ids = [
+                    vector_id
+                    for prefix in prefixes
+                    for page in self.index.list(prefix=prefix)
+                    for vector_id in page
+                ]
+            except Exception as e:
+                logger.warning(f"Listing ids by prefix failed, falling back to a filtered query: {str(e)}")
+                ids = []
+            if ids:
+                found = self.fetch(ids[:limit])
+                return [
+                    {"id": vector_id, "metadata": metadata}
+                    for vector_id, metadata in found.items()
+                    if matches_filter(metadata, filter)
+                ]
+
+        # Pinecone has no filter-only read, so query with a constant vector:
+        # with a metadata filter the matches are exactly the filtered records
+        probe = [1.0] + [0.0] * (self.dimensions - 1)
+        if limit <= PINECONE_MAX_TOP_K_WITH_METADATA:
+            results = self.index.query(
+                vector=probe,
+                top_k=limit,
+                include_metadata=True,
+                filter=self._pinecone_filter(filter)
+            )
+            return [{"id": m.id, "metadata": m.metadata} for m in results.matches]
+
+        # Past 1000 matches Pinecone only returns ids, so fetch the metadata in pages
+        results = self.index.query(
+            vector=probe,
+            top_k=min(limit, PINECONE_MAX_TOP_K),
+            include_metadata=False,
+            filter=self._pinecone_filter(filter)
+        )
+        ids = [m.id for m in results.matches]
+        found = self.fetch(ids)
+        return [{"id": vector_id, "metadata": found[vector_id]} for vector_id in ids if vector_id in found]
+
+
+class LocalMemoryBackend(MemoryBackend):
+    """
+    Embedded vector store needing no network service.
+
+    Embeddings are appended to a flat float32 file read back through a NumPy
+    memmap, and metadata lives in SQLite with the filterable fields indexed, so
+    exact lookups by repo and type never touch the vectors.
+    """
+
+    def __init__(self, path: str, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dimensions = dimensions
+        self.vectors_path = self.path / 'vectors.f32'
+        self.vectors_path.touch(exist_ok=True)
+        self.lock = threading.Lock()
+
+        self.db = sqlite3.connect(self.path / 'metadata.sqlite3', check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS memories (
+                id TEXT PRIMARY KEY,
+                row INTEGER NOT NULL,
+                type TEXT,
+                repo_path TEXT,
+                file_path TEXT,
+                metadata TEXT NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS memories_repo_type ON memories (repo_path, type)")
+        self.db.commit()
+
+    def _row_count(self) -> int:
+        return os.path.getsize(self.vectors_path) // (4 * self.dimensions)
+
+    def _vectors(self, mode: str = 'r') -> np.ndarray:
+        rows = self._row_count()
+        if not rows:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return np.memmap(self.vectors_path, dtype=np.float32, mode=mode, shape=(rows, self.dimensions))
+
+    def _where(self, filter: Optional[Dict]) -> tuple:
+        clauses = []
+        params = []
+        for field, value in (filter or {}).items():
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"Unsupported filter field: {field}")
+            if isinstance(value, (list, tuple)):
+                clauses.append(f"{field} IN ({','.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                clauses.append(f"{field} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            ids = [v["id"] for v in vectors]
+            existing = {}
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                existing.update(self.db.execute(
+                    f"SELECT id, row FROM memories WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+
+            # Overwrite the rows of known ids in place, append the rest
+            overwrites = [(existing[v["id"]], v) for v in vectors if v["id"] in existing]
+            if overwrites:
+                matrix = self._vectors(mode='r+')
+                for row, v in overwrites:
+                    matrix[row] = np.asarray(v["values"], dtype=np.float32)
+                matrix.flush()
+                del matrix
+
+            rows = dict(existing)
+            next_row = self._row_count()
+            with open(self.vectors_path, 'ab') as f:
+                for v in vectors:
+                    if v["id"] in rows:
+                        continue
+                    f.write(np.asarray(v["values"], dtype=np.float32).tobytes())
+                    rows[v["id"]] = next_row
+                    next_row += 1
+
+            self.db.executemany(
+                "INSERT OR REPLACE INTO memories (id, row, type, repo_path, file_path, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        v["id"],
+                        rows[v["id"]],
+                        v["metadata"].get("type"),
+                        v["metadata"].get("repo_path"),
+                        v["metadata"].get("file_path"),
+                        json.dumps(v["metadata"])
+                    )
+                    for v in vectors
+                ]
+            )
+            self.db.commit()
+
+    def query(self, vector: List[float], top_k: int = 10, filter: Optional[Dict] = None) -> List[Dict]:
+        where, params = self._where(filter)
+        with self.lock:
+            records = self.db.execute(f"SELECT id, row, metadata FROM memories{where}", params).fetchall()
+            if not records:
+                return []
+            matrix = np.asarray(self._vectors()[[row for _, row, _ in records]])
+
+        query = np.asarray(vector, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = matrix @ query / np.where(norms == 0, 1.0, norms)
+
+        top_k = min(top_k, len(records))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [
+            {"id": records[i][0], "score": float(scores[i]), "metadata": json.loads(records[i][2])}
+            for i in best
+        ]
+
+    def fetch(self, ids: List[str]) -> Dict[str, Dict]:
+        found = {}
+        with self.lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                found.update(
+                    (record_id, json.loads(metadata))
+                    for record_id, metadata in self.db.execute(
+                        f"SELECT id, metadata FROM memories WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                    )
+                )
+        return found
+
+    def delete(self, ids: List[str]) -> None:
+        # Only the metadata rows go; their vector rows stay in the file, unreferenced
+        with self.lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                self.db.execute(f"DELETE FROM memories WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            self.db.commit()
+
+    def find(self, filter: Dict, limit: int = 10000, id_prefix: Optional[Union[str, List[str]]] = None) -> List[Dict]:
+        where, params = self._where(filter)
+        prefixes = id_prefixes(id_prefix)
+        if prefixes:
+            where += " AND " if where else " WHERE "
+            where += f"({' OR '.join(['substr(id, 1, ?) = ?'] * len(prefixes))})"
+            for prefix in prefixes:
+                params += [len(prefix), prefix]
+        with self.lock:
+            records = self.db.execute(
+                f"SELECT id, metadata FROM memories{where} LIMIT ?", params + [limit]
+            ).fetchall()
+        return [{"id": record_id, "metadata": json.loads(metadata)} for record_id, metadata in records]
+
+
+def get_memory_backend() -> MemoryBackend:
+    """Pick the memory backend from the MEMORY_BACKEND config value (pinecone or local)."""
+    backend = os.getenv('MEMORY_BACKEND', 'pinecone').lower()
+    if backend == 'local':
+        path = os.getenv('MEMORY_LOCAL_PATH', 'memory_store')
+        logger.info(f"Using local memory backend at {path}")
+        return LocalMemoryBackend(path)
+    if backend != 'pinecone':
+        raise ValueError(f"Unknown MEMORY_BACKEND: {backend}")
+    return PineconeMemoryBackend()
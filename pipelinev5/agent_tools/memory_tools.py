@@ -1,66 +1,131 @@
-import os
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Optional
 import json
-import logging
-from pathlib import Path
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from langchain_openai import OpenAIEmbeddings
-from pinecone import Pinecone
+from agent_tools.memory_backends import MemoryBackend, get_memory_backend
 from states.state import Memory, MemoryContext
 from utils.general_helper_functions import configure_logger
 
 logger = configure_logger(__name__)
 
+EMBED_BATCH_SIZE = 100
+EMBED_WORKERS = 4
+UPSERT_BATCH_SIZE = 100
+
+
+def memory_id(memory: Memory) -> str:
+    """Stable id for a memory, prefixed by its repo so a repo's memories can be listed by id."""
+    key = hashlib.sha1(memory.file_path.encode('utf-8')).hexdigest()[:16]
+    return f"{memory.repo_path}#{memory.type}#{key}"
+
+
+def memory_content_hash(memory: Memory) -> str:
+    payload = [memory.type, memory.repo_type, memory.file_path, memory.content]
+    if memory.blob_sha:
+        payload.append(memory.blob_sha)
+    payload = json.dumps(payload)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
 class MemoryTools:
-    def __init__(self):
-        pc = Pinecone(api_key=os.getenv('PINECONE_API_KEY'))
-        self.index_name = "forge"
-        self.index = pc.Index(self.index_name)
+    def __init__(self, backend: Optional[MemoryBackend] = None):
+        # Pinecone or the local store, picked by MEMORY_BACKEND in the config
+        self.index = backend or get_memory_backend()
         self.embeddings = OpenAIEmbeddings(
             model="text-embedding-3-small",
             dimensions=1536
         )
 
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in chunks, with a few chunks in flight at once."""
+        chunks = [texts[start:start + EMBED_BATCH_SIZE] for start in range(0, len(texts), EMBED_BATCH_SIZE)]
+        if len(chunks) <= 1:
+            return self.embeddings.embed_documents(texts) if texts else []
+
+        with ThreadPoolExecutor(max_workers=EMBED_WORKERS) as executor:
+            results = executor.map(self.embeddings.embed_documents, chunks)
+        return [embedding for chunk in results for embedding in chunk]
+
     def store_memories(self, memories: List[Memory]) -> None:
-        vectors = []
-        for memory in memories:
-            memory_str = json.dumps(memory.dict())
-            embedding = self.embeddings.embed_query(memory_str)
-            vector_id = f"{memory.repo_path}_{memory.type}_{datetime.now().timestamp()}"
-            
-            vectors.append({
+        if not memories:
+            return
+
+        # Memories whose content is already stored under their id need no new embedding
+        by_id = {memory_id(memory): memory for memory in memories}
+        stored = self.index.fetch(list(by_id))
+        to_store = [
+            (vector_id, memory, memory_content_hash(memory))
+            for vector_id, memory in by_id.items()
+            if stored.get(vector_id, {}).get("content_hash") != memory_content_hash(memory)
+        ]
+        if len(to_store) < len(by_id):
+            logger.info(f"Skipping {len(by_id) - len(to_store)} unchanged memories")
+        if not to_store:
+            return
+
+        embeddings = self._embed([json.dumps(memory.dict()) for _, memory, _ in to_store])
+
+        vectors = [
+            {
                 "id": vector_id,
                 "values": embedding,
-                "metadata": memory.dict()
-            })
-        
-        self.index.upsert(vectors=vectors)
+                "metadata": {**memory.dict(), "content_hash": content_hash}
+            }
+            for (vector_id, memory, content_hash), embedding in zip(to_store, embeddings)
+        ]
+        for start in range(0, len(vectors), UPSERT_BATCH_SIZE):
+            self.index.upsert(vectors=vectors[start:start + UPSERT_BATCH_SIZE])
         logger.info(f"Stored {len(vectors)} memories")
 
+    def delete_file_memories(self, repo_url: str, file_paths: List[str]) -> None:
+        """Remove the file analyses stored for file_paths, e.g. files deleted from the repo."""
+        if not file_paths:
+            return
+        matches = self.index.find(
+            filter={"repo_path": repo_url, "type": "file_analysis", "file_path": list(file_paths)}
+        )
+        if matches:
+            self.index.delete([match["id"] for match in matches])
+        logger.info(f"Removed {len(matches)} memories of {len(file_paths)} deleted files")
+
     def query_memories(self, repo_url: str, k: int = 1000) -> MemoryContext:
-        query_embedding = self.embeddings.embed_query(repo_url)
-        
-        results = self.index.query(
-            vector=query_embedding,
-            top_k=k,
-            include_metadata=True
+        # An exact metadata lookup, nothing to embed or rank. Memories stored before
+        # ids were keyed by file have {repo}_{type}_{timestamp}_{i} ids, so list those
+        # too; the newest memory per file wins below.
+        memory_types = ["file_analysis", "repo_overview"]
+        matches = self.index.find(
+            filter={"repo_path": repo_url, "type": memory_types},
+            limit=k,
+            id_prefix=[f"{repo_url}#"] + [f"{repo_url}_{memory_type}_" for memory_type in memory_types]
         )
 
-        if not results.matches:
+        if not matches:
             return MemoryContext()
 
-        # Group memories by type
+        # Group memories by type, keeping the newest memory for each file and overview
         file_analyses = {}
+        blob_shas = {}
         overview = None
         latest_timestamp = None
+        seen_timestamps = {}
 
-        for match in results.matches:
-            metadata = match.metadata
+        for match in matches:
+            metadata = match["metadata"]
             if not latest_timestamp or metadata["timestamp"] > latest_timestamp:
                 latest_timestamp = metadata["timestamp"]
-                
+
+            key = (metadata["type"], metadata.get("file_path", ""))
+            if key in seen_timestamps and seen_timestamps[key] >= metadata["timestamp"]:
+                continue
+            seen_timestamps[key] = metadata["timestamp"]
+
             if metadata["type"] == "file_analysis":
                 file_analyses[metadata["file_path"]] = json.loads(metadata["content"])
+                if metadata.get("blob_sha"):
+                    blob_shas[metadata["file_path"]] = metadata["blob_sha"]
+                else:
+                    blob_shas.pop(metadata["file_path"], None)
             elif metadata["type"] == "repo_overview":
                 overview = metadata["content"]
 
@@ -68,5 +133,6 @@ class MemoryTools:
             past_repo_url=repo_url if file_analyses or overview else None,
             last_accessed=latest_timestamp,
             past_analyses=file_analyses,
+            past_blob_shas=blob_shas,
             past_overview=overview
         )
\ No newline at end of file
@@ -5,14 +5,18 @@ import json
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
-import shutil
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.prompts import PromptTemplate
 from pydantic import BaseModel, Field
 import time
-from utils.general_helper_functions import configure_logger, load_config
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.general_helper_functions import configure_logger, load_config, base_path
+from utils.rate_limiter import TokenBucket, call_with_retries
 from prompts.system_mapper_prompts import ANALYZE_FILE_TEMPLATE, GENERATE_OVERVIEW_TEMPLATE
 from ai_models.openai_models import get_open_ai
+from forge.git_mirror import get_mirror_cache
+from forge.file_walker import FileWalker, WalkEntry, entries_to_tree
 
 logger = configure_logger(__name__)
 
@@ -39,6 +43,55 @@ class FileAnalysis(BaseModel):
         default_factory=list
     )
 
+def git_blob_sha(data: bytes) -> str:
+    """Hash content the way `git hash-object` does."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class AnalysisStore:
+    """
+    Local store of file analyses keyed by the git blob SHA of the analyzed content,
+    and of repository overviews keyed by a digest of the analyses they summarize.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _analysis_path(self, blob_sha: str) -> Path:
+        return self.root / 'analyses' / blob_sha[:2] / f"{blob_sha}.json"
+
+    def _overview_path(self, digest: str) -> Path:
+        return self.root / 'overviews' / f"{digest}.md"
+
+    def get(self, blob_sha: str) -> Optional[Dict]:
+        try:
+            with open(self._analysis_path(blob_sha), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, blob_sha: str, analysis: Dict) -> None:
+        self._write(self._analysis_path(blob_sha), json.dumps(analysis))
+
+    def get_overview(self, digest: str) -> Optional[str]:
+        try:
+            return self._overview_path(digest).read_text(encoding='utf-8')
+        except OSError:
+            return None
+
+    def put_overview(self, digest: str, overview: str) -> None:
+        self._write(self._overview_path(digest), overview)
+
+    def _write(self, path: Path, text: str) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_text(text, encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Unable to write analysis store entry {path}: {str(e)}")
+
+
 class SystemMapper:
     def __init__(self, memory_context=None):
         load_dotenv()
@@ -60,6 +113,20 @@ class SystemMapper:
         logger.info(f"Initialized OpenAI LLM with model: {model}")
 
         self.memory_context = memory_context
+        self.system_maps_dir = self.base_dir / 'system_maps'
+
+        # Opt-in: re-analyze only files whose content changed since they were last analyzed
+        self.incremental = os.getenv('SYSTEM_MAPPER_INCREMENTAL', 'false').lower() == 'true'
+        self.analysis_store = AnalysisStore(
+            base_path(os.getenv('SYSTEM_MAPPER_ANALYSIS_DIR', os.path.join('system_maps', 'analysis_store')))
+        )
+        # (path, entries) of the last repository walk
+        self._scan_cache = None
+
+        # Concurrency for per-file analysis, shared by one rate limiter across workers
+        self.max_workers = int(os.getenv('SYSTEM_MAPPER_WORKERS', '8'))
+        self.max_retries = int(os.getenv('SYSTEM_MAPPER_MAX_RETRIES', '3'))
+        self.rate_limiter = TokenBucket(rate=float(os.getenv('SYSTEM_MAPPER_REQUESTS_PER_SECOND', '5')))
 
 
     def _handle_rate_limit(self, retry_after: int):
@@ -69,28 +136,12 @@ class SystemMapper:
 
     def _make_llm_call(self, messages: List[dict], max_retries: int = 3) -> str:
         """Make LLM call with rate limit handling."""
-        retry_count = 0
-        
-        while retry_count < max_retries:
-            try:
-                response = self.llm.invoke(messages)
-                return response.content
-            except Exception as e:
-                error_str = str(e)
-                if "429" in error_str:  # Rate limit hit
-                    retry_after = 2  # Default to 2 seconds if not specified
-                    if "retry-after" in error_str.lower():
-                        try:
-                            # Try to extract retry-after value
-                            retry_after = int(error_str.split("retry-after:")[1].split()[0])
-                        except:
-                            pass
-                    self._handle_rate_limit(retry_after)
-                    retry_count += 1
-                else:
-                    raise e
-        
-        raise Exception(f"Failed after {max_retries} retries due to rate limits")
+        response = call_with_retries(
+            lambda: self.llm.invoke(messages),
+            limiter=self.rate_limiter,
+            max_retries=max_retries
+        )
+        return response.content
 
     def _initialize_git_repo(self, path: Path) -> None:
         """Initialize a git repository if it doesn't exist."""
@@ -127,6 +178,7 @@ class SystemMapper:
     def clone_repositories(self) -> None:
         """Clone the repository/repositories locally."""
         logger.info("Starting repository cloning")
+        self._scan_cache = None
         self.local_path.mkdir(exist_ok=True)
         
         if not self.repo_urls:
@@ -154,89 +206,71 @@ class SystemMapper:
             else:
                 auth_url = repo_url
 
-            # Check memory context for repo matching
-            past_repo = self.memory_context.past_repo_url if self.memory_context else None
-            
-            if past_repo == repo_url and path.exists():
-                try:
-                    repo = git.Repo(path)
-                    logger.info(f"Existing repository found at {path}, attempting update...")
-                    repo.remotes.origin.fetch()
-                    repo.git.reset('--hard', f'origin/{self.repo_branch}')
-                    
-                    with repo.config_writer() as git_config:
-                        git_config.set_value('user', 'name', 'forge-bot')
-                        git_config.set_value('user', 'email', 'forge-bot@example.com')
-                    
-                    logger.info("Repository updated successfully")
-                    return
-                except Exception as e:
-                    logger.warning(f"Failed to update repository: {str(e)}")
-                    logger.info("Attempting fresh clone...")
-                    shutil.rmtree(path)
-            elif path.exists():
-                logger.info("Different repository detected, removing existing and cloning fresh")
-                shutil.rmtree(path)
-            
-            path.parent.mkdir(parents=True, exist_ok=True)
-            logger.info(f"Cloning repository to: {path}")
-            
-            # Try main branch first, then master
-            for branch in ['main', 'master']:
-                try:
-                    repo = git.Repo.clone_from(
-                        auth_url,
-                        path,
-                        branch=branch,
-                        depth=1
-                    )
-                    with repo.config_writer() as git_config:
-                        git_config.set_value('user', 'name', 'forge-bot')
-                        git_config.set_value('user', 'email', 'forge-bot@example.com')
-                    logger.info(f"Repository cloned successfully using branch: {branch}")
-                    return
-                except git.exc.GitCommandError:
-                    if branch == 'master':
-                        raise
-                    logger.warning(f"Failed to clone branch {branch}, trying next branch")
-                    if path.exists():
-                        shutil.rmtree(path)
-                        
+            mirror_cache = get_mirror_cache()
+            if mirror_cache.existing_checkout(auth_url, path):
+                logger.info(f"Existing repository found at {path}, updating...")
+
+            # Objects come from a local mirror of the remote, so only deltas are fetched,
+            # and the clone is full rather than depth=1 as the history is local anyway.
+            # Without REPO_BRANCH, "main" is only a guess and falls back to the remote's
+            # default branch via ls-remote. The
+            # checkout is the pipeline's working copy (ForgeWrapper auto-commits into it),
+            # so reset it to the remote on every run, as the fetch + reset --hard did.
+            repo = mirror_cache.clone(
+                auth_url, path, branch=self.repo_branch, fallback=not os.getenv('REPO_BRANCH'),
+                reset=True
+            )
+            with repo.config_writer() as git_config:
+                git_config.set_value('user', 'name', 'forge-bot')
+                git_config.set_value('user', 'email', 'forge-bot@example.com')
+
+            logger.info(f"Repository ready at {path} on branch: {repo.active_branch.name}")
+
         except Exception as e:
             logger.error(f"Error cloning repository: {str(e)}")
             raise
 
+    # Directories and files left out of the tree and the analysis
+    EXCLUDE_NAMES = {
+        '.git',
+        '__pycache__',
+        '.pytest_cache',
+        '.venv',
+        'venv',
+        '.env',
+        '.idea',
+        '.vscode',
+        'planning'
+    }
+    EXCLUDE_FILES = {'plan.json', 'plan.txt'}
+    MAX_FILE_SIZE = 50000  # 50KB
+
+    def _excluded(self, entry: WalkEntry) -> bool:
+        if 'plan_iteration_' in entry.name:
+            return True
+        return not entry.is_dir and entry.name in self.EXCLUDE_FILES
+
+    def scan_repository(self, path: Optional[Path] = None) -> List[WalkEntry]:
+        """
+        Walk the repository once, with stat info and .gitignore rules applied.
+
+        The file tree, environment detection and the analysis file list are all
+        built from this walk, which is cached until the next clone.
+        """
+        path = Path(path or self.local_path)
+        if self._scan_cache and self._scan_cache[0] == path:
+            return self._scan_cache[1]
+
+        walker = FileWalker(path, exclude_names=self.EXCLUDE_NAMES, exclude=self._excluded)
+        entries = list(walker.walk())
+        self._scan_cache = (path, entries)
+        logger.info(f"Scanned {len(entries)} entries in {path}")
+        return entries
+
     def generate_file_tree(self, path: Optional[Path] = None) -> Dict:
         """Generate a hierarchical file tree structure with absolute paths."""
-        if path is None:
-            path = self.local_path
-
-        # Define patterns to exclude
-        exclude_patterns = {
-            '.git',
-            '__pycache__',
-            'planning',
-            '.env',
-            '.vscode',
-            '.idea'
-        }
-
-        tree = {}
-        for item in path.iterdir():
-            # Skip excluded directories and files
-            if (item.name.startswith('.') or 
-                item.name in exclude_patterns or
-                'plan_iteration_' in item.name or
-                (item.is_file() and item.name in {'plan.json', 'plan.txt'})):
-                continue
-                
-            abs_path = str(item.resolve())  # Get absolute path
-            if item.is_file():
-                tree[abs_path] = 'file'
-            elif item.is_dir():
-                tree[abs_path] = self.generate_file_tree(item)
-        
-        return tree
+        path = Path(path or self.local_path)
+        return entries_to_tree(self.scan_repository(path), path.resolve())
 
     def detect_environments(self) -> Dict[str, List[str]]:
         """Detect and analyze different environments in the codebase."""
@@ -253,41 +287,21 @@ class SystemMapper:
             'production': ['prod', 'production']
         }
 
-        for root, _, files in os.walk(self.local_path):
-            for file in files:
-                if file.endswith(('.env', '.yaml', '.yml', '.json')):
-                    file_path = Path(root) / file
-                    relative_path = file_path.relative_to(self.local_path)
-                    
-                    for env, indicators in env_indicators.items():
-                        if any(ind in file.lower() for ind in indicators):
-                            environments[env].append(str(relative_path))
-                            logger.info(f"Found {env} environment file: {relative_path}")
+        for entry in self.scan_repository():
+            if entry.is_dir or not entry.name.endswith(('.env', '.yaml', '.yml', '.json')):
+                continue
+
+            for env, indicators in env_indicators.items():
+                if any(ind in entry.name.lower() for ind in indicators):
+                    environments[env].append(entry.rel_path)
+                    logger.info(f"Found {env} environment file: {entry.rel_path}")
 
         return environments
 
     def collect_files_to_analyze(self) -> List[str]:
         """Collect all relevant files for analysis."""
         logger.info("Collecting files for analysis")
-        MAX_FILE_SIZE = 50000  # 50KB
-        files_to_analyze = []
-        
-        exclude_patterns = {
-            '.git',
-            '__pycache__',
-            '.pytest_cache',
-            '.venv',
-            'venv',
-            '.env',
-            '.idea',
-            '.vscode',
-            'planning',
-            'plan_iteration_',
-            'plan.json',
-            'plan.txt'
-        }
-        
-        include_extensions = {
+        include_extensions = (
             '.tf',
             '.tfvars',
             '.hcl',
@@ -296,33 +310,21 @@ class SystemMapper:
             '.json',
             '.sh',
             '.md'
-        }
-        
-        for root, dirs, files in os.walk(self.local_path):
-            dirs[:] = [d for d in dirs if d not in exclude_patterns]
-            
-            for file in files:
-                if (file.startswith('.') or 
-                    any(pattern in root for pattern in exclude_patterns) or
-                    any(pattern in file for pattern in exclude_patterns)):
-                    continue
-                
-                if not any(file.endswith(ext) for ext in include_extensions):
-                    continue
-                
-                file_path = os.path.join(root, file)
-                
-                # Skip large files
-                try:
-                    if os.path.getsize(file_path) > MAX_FILE_SIZE:
-                        logger.warning(f"Skipping large file: {file_path}")
-                        continue
-                except OSError:
-                    continue
-                
-                files_to_analyze.append(file_path)
-                logger.info(f"Added file for analysis: {file_path}")
-        
+        )
+
+        files_to_analyze = []
+        for entry in self.scan_repository():
+            if entry.is_dir or not entry.name.endswith(include_extensions):
+                continue
+
+            # Skip large files, using the size the walk already read
+            if entry.size > self.MAX_FILE_SIZE:
+                logger.warning(f"Skipping large file: {entry.path}")
+                continue
+
+            files_to_analyze.append(entry.path)
+
+        logger.info(f"Collected {len(files_to_analyze)} files for analysis")
         return files_to_analyze
 
     def _determine_file_type(self, file_path: Path) -> str:
@@ -379,13 +381,17 @@ class SystemMapper:
             template=ANALYZE_FILE_TEMPLATE
         )
 
+        formatted_prompt = prompt.format(
+            file_name=os.path.basename(file_path),
+            file_type=file_type,
+            content=content
+        )
+
         try:
-            response = self.llm.with_structured_output(FileAnalysis).invoke(
-                prompt.format(
-                    file_name=os.path.basename(file_path),
-                    file_type=file_type,
-                    content=content
-                )
+            response = call_with_retries(
+                lambda: self.llm.with_structured_output(FileAnalysis).invoke(formatted_prompt),
+                limiter=self.rate_limiter,
+                max_retries=self.max_retries
             )
             
             # Clean up response by removing duplicates
@@ -399,21 +405,167 @@ class SystemMapper:
                 
         except Exception as e:
             logger.error(f"Error analyzing file {file_path}: {str(e)}")
-            return FileAnalysis(
-                main_purpose=f"Error analyzing file: {str(e)}",
-                key_components=[],
-                patterns=[],
-                dependencies=[]
-            )
+            return self._error_analysis(e)
+
+    @staticmethod
+    def _error_analysis(error: Exception) -> FileAnalysis:
+        return FileAnalysis(
+            main_purpose=f"Error analyzing file: {str(error)}",
+            key_components=[],
+            patterns=[],
+            dependencies=[]
+        )
+
+    def _progress_path(self) -> Path:
+        """Where partial analyses for the current repo set are kept between runs."""
+        key = hashlib.sha1(f"{','.join(self.repo_urls)}@{self.repo_branch}".encode()).hexdigest()[:12]
+        return self.system_maps_dir / f"analysis_progress_{key}.json"
+
+    def _load_progress(self, progress_path: Path) -> Dict:
+        try:
+            with open(progress_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_progress(self, progress_path: Path, progress: Dict) -> None:
+        try:
+            progress_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = progress_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(progress, f)
+            os.replace(tmp_path, progress_path)
+        except OSError as e:
+            logger.warning(f"Unable to save analysis progress: {str(e)}")
+
+    def _analyze_path(self, file_path: str) -> tuple:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        content_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        return content_hash, self.analyze_file(file_path, content)
+
+    def analyze_files(self, files_to_analyze: List[str], progress_path: Optional[Path] = None) -> tuple:
+        """
+        Analyze files concurrently, persisting progress so an interrupted run resumes.
+
+        Each completed analysis is saved to the progress file with the hash of the
+        content it was made from. On the next run, files whose content is unchanged
+        are taken from there instead of being sent to the LLM again. The progress
+        file is removed once every file has been analyzed.
+
+        Returns:
+            tuple: (file_analyses, errors), with analyses in `files_to_analyze` order.
+        """
+        progress_path = progress_path or self._progress_path()
+        progress = self._load_progress(progress_path)
+
+        file_analyses = {}
+        errors = []
+        pending = []
+        for file_path in files_to_analyze:
+            entry = progress.get(file_path)
+            if entry and entry.get('hash') == self._file_hash(file_path):
+                file_analyses[file_path] = entry['analysis']
+            else:
+                pending.append(file_path)
+
+        if file_analyses:
+            logger.info(f"Resuming analysis: {len(file_analyses)} files already done, {len(pending)} remaining")
+
+        last_save = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._analyze_path, file_path): file_path for file_path in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                file_path = futures[future]
+                try:
+                    content_hash, analysis = future.result()
+                    file_analyses[file_path] = analysis.dict()
+                    if not analysis.main_purpose.startswith("Error analyzing file"):
+                        progress[file_path] = {'hash': content_hash, 'analysis': file_analyses[file_path]}
+                except Exception as e:
+                    errors.append(f"Error analyzing {file_path}: {str(e)}")
+
+                if time.monotonic() - last_save > 2 or done == len(pending):
+                    self._save_progress(progress_path, progress)
+                    last_save = time.monotonic()
+                logger.info(f"Analyzed {done}/{len(pending)} files")
+
+        if not errors and all(file_path in progress for file_path in files_to_analyze):
+            progress_path.unlink(missing_ok=True)
+
+        ordered = {file_path: file_analyses[file_path] for file_path in files_to_analyze if file_path in file_analyses}
+        return ordered, errors
+
+    @staticmethod
+    def _file_hash(file_path: str) -> Optional[str]:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return hashlib.sha1(f.read().encode('utf-8')).hexdigest()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def _incremental_analyses(self, files_to_analyze: List[str], past_analyses: Dict,
+                              past_blob_shas: Optional[Dict] = None) -> tuple:
+        """
+        Reuse analyses of unchanged files and analyze the rest.
+
+        A file is unchanged if its past analysis was made from the same blob SHA
+        (working tree content, so uncommitted and auto-committed edits count), or
+        if the analysis store has an entry for its blob SHA.
+
+        Returns:
+            tuple: (file_analyses, updated_files, blob_shas, errors)
+        """
+        past_blob_shas = past_blob_shas or {}
+        blob_shas = {}
+        file_analyses = {}
+        to_analyze = []
+        for file_path in files_to_analyze:
+            try:
+                with open(file_path, 'rb') as f:
+                    blob_shas[file_path] = git_blob_sha(f.read())
+            except OSError:
+                continue
+
+            if file_path in past_analyses and past_blob_shas.get(file_path) == blob_shas[file_path]:
+                file_analyses[file_path] = past_analyses[file_path]
+                continue
+
+            analysis = self.analysis_store.get(blob_shas[file_path])
+            if analysis is not None:
+                file_analyses[file_path] = analysis
+            else:
+                to_analyze.append(file_path)
+
+        logger.info(f"Reusing {len(file_analyses)} analyses, analyzing {len(to_analyze)} new or modified files")
+        new_analyses, errors = self.analyze_files(to_analyze)
+        for file_path, analysis in new_analyses.items():
+            if not analysis['main_purpose'].startswith("Error analyzing file"):
+                self.analysis_store.put(blob_shas[file_path], analysis)
+        file_analyses.update(new_analyses)
+
+        ordered = {file_path: file_analyses[file_path] for file_path in files_to_analyze if file_path in file_analyses}
+        # Also files whose analysis is the same but was stored for older content
+        updated_files = [
+            file_path for file_path, analysis in ordered.items()
+            if past_analyses.get(file_path) != analysis or past_blob_shas.get(file_path) != blob_shas[file_path]
+        ]
+        return ordered, updated_files, blob_shas, errors
 
     def generate_system_map(self) -> Dict:
         """Generate a complete system map."""
         logger.info("Starting system map generation")
-        
-        # Check memory context for existing analysis
-        if (self.memory_context and 
+
+        has_past_analysis = bool(
+            self.memory_context and
             self.memory_context.past_repo_url == os.getenv('REPO_URLS') and
-            self.memory_context.past_analyses):
+            self.memory_context.past_analyses
+        )
+        if self.incremental:
+            return self._generate_incremental_system_map(has_past_analysis)
+
+        # Check memory context for existing analysis
+        if has_past_analysis:
             
             logger.info("Using cached analysis from Pinecone")
             return {
@@ -437,18 +589,7 @@ class SystemMapper:
         
         # Collect and analyze files
         files_to_analyze = self.collect_files_to_analyze()
-        file_analyses = {}
-        errors = []
-        
-        for file_path in files_to_analyze:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                analysis = self.analyze_file(file_path, content)
-                file_analyses[file_path] = analysis.dict()
-                    
-            except Exception as e:
-                errors.append(f"Error analyzing {file_path}: {str(e)}")
+        file_analyses, errors = self.analyze_files(files_to_analyze)
         
         # Generate repository overview
         repo_overview = self._generate_overview(file_tree, file_analyses)
@@ -462,6 +603,55 @@ class SystemMapper:
             'errors': errors
         }
 
+    def _generate_incremental_system_map(self, has_past_analysis: bool) -> Dict:
+        """Update the repositories and re-analyze only added or modified files."""
+        self.clone_repositories()
+
+        file_tree = self.generate_file_tree()
+        environments = self.detect_environments()
+
+        past_analyses = self.memory_context.past_analyses if has_past_analysis else {}
+        past_blob_shas = self.memory_context.past_blob_shas if has_past_analysis else {}
+        files_to_analyze = self.collect_files_to_analyze()
+        file_analyses, updated_files, blob_shas, errors = self._incremental_analyses(
+            files_to_analyze, past_analyses, past_blob_shas
+        )
+        # Files analyzed before that are gone from the repo, to be pruned from memory
+        deleted_files = sorted(set(past_analyses) - set(files_to_analyze))
+        analyses_changed = bool(updated_files) or bool(deleted_files) or set(file_analyses) != set(past_analyses)
+
+        # The overview only depends on the analyses, so regenerate it only when they changed
+        digest = hashlib.sha1(json.dumps(
+            sorted((file_path, blob_shas.get(file_path)) for file_path in file_analyses)
+        ).encode()).hexdigest()
+        repo_overview = None
+        if has_past_analysis and not analyses_changed:
+            repo_overview = self.memory_context.past_overview
+        if not repo_overview:
+            repo_overview = self.analysis_store.get_overview(digest)
+        overview_changed = not repo_overview
+        if overview_changed:
+            repo_overview = self._generate_overview(file_tree, file_analyses)
+            if not repo_overview.startswith("Error generating overview"):
+                self.analysis_store.put_overview(digest, repo_overview)
+        else:
+            logger.info("Analyses unchanged, reusing repository overview")
+
+        return {
+            'repository_type': self.repo_type,
+            'repository_overview': repo_overview,
+            'file_tree': file_tree,
+            'environments': environments,
+            'file_analyses': file_analyses,
+            'blob_shas': blob_shas,
+            'updated_files': updated_files,
+            'deleted_files': deleted_files,
+            'overview_changed': overview_changed or (
+                has_past_analysis and repo_overview != self.memory_context.past_overview
+            ),
+            'errors': errors
+        }
+
     def _generate_overview(self, file_tree: Dict, file_analyses: Dict) -> str:
         """Generate repository overview using GPT-4."""
         analyses_str = "\n\n".join([
@@ -523,4 +713,4 @@ def main():
     mapper.save_system_map()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
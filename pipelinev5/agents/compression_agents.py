@@ -1,99 +1,187 @@
+import os
 import json
+from pathlib import Path
 from typing import Dict
 from termcolor import colored
+from diskcache import Cache
 from langchain_core.messages import SystemMessage
+from langchain_openai import OpenAIEmbeddings
 from ai_models.openai_models import get_open_ai_json
 from ai_models.deepseek_models import get_deepseek_ai_json
 from states.state import AgentGraphState
 from prompts.compression_prompts import COMPRESSION_AGENT_PROMPT
+from forge.iac_graph import IacGraph
+from utils.relevance import CachedEmbedder, rank_file_analyses
+from utils.general_helper_functions import base_path
+
+MAX_CANDIDATE_FILES = 40
+
+# Token budget for the analyses handed to the planner, and how clearly the local
+# ranking has to separate the files before its selection is used without the LLM
+COMPRESSION_TOKEN_BUDGET = int(os.getenv('COMPRESSION_TOKEN_BUDGET', '12000'))
+MIN_RANKING_CONFIDENCE = float(os.getenv('COMPRESSION_MIN_CONFIDENCE', '0.3'))
+EMBEDDING_CACHE_DIR = base_path(os.getenv('COMPRESSION_EMBEDDING_CACHE_DIR', os.path.join('system_maps', 'embedding_cache')))
+
+def get_embedder():
+    """Embeddings for ranking, cached per file content so unchanged files are embedded once."""
+    if os.getenv('COMPRESSION_USE_EMBEDDINGS', 'true').lower() == 'false':
+        return None
+    try:
+        embeddings = OpenAIEmbeddings(model="text-embedding-3-small", dimensions=1536)
+        return CachedEmbedder(embeddings, Cache(str(EMBEDDING_CACHE_DIR)))
+    except Exception as e:
+        print(colored(f"Embeddings unavailable, ranking with BM25 only: {str(e)}", 'yellow'))
+        return None
+
+def get_graph_neighbors(repo_path, file_paths):
+    """Map each analyzed file to the files the IaC dependency graph links it to."""
+    root = repo_path or (os.path.commonpath(file_paths) if file_paths else None)
+    if not root or not os.path.isdir(root):
+        return None
+
+    try:
+        graph = IacGraph(root).build()
+    except Exception as e:
+        print(colored(f"Could not build dependency graph: {str(e)}", 'yellow'))
+        return None
+
+    def neighbors(file_path):
+        rel_path = Path(os.path.relpath(file_path, root)).as_posix()
+        return [os.path.join(root, neighbor) for neighbor in graph.neighbors(rel_path)]
+
+    return neighbors
+
+def rank_files(state: AgentGraphState):
+    file_analyses = state["file_analyses"]
+    neighbors = get_graph_neighbors(state.get("repo_path"), list(file_analyses))
+    embed = get_embedder()
+    try:
+        return rank_file_analyses(
+            state["query"], file_analyses, COMPRESSION_TOKEN_BUDGET, embed=embed, neighbors=neighbors
+        )
+    except Exception as e:
+        if not embed:
+            raise
+        print(colored(f"Embedding failed, ranking with BM25 only: {str(e)}", 'yellow'))
+        return rank_file_analyses(
+            state["query"], file_analyses, COMPRESSION_TOKEN_BUDGET, neighbors=neighbors
+        )
+
+def get_llm_decision(state: AgentGraphState, available_files, model=None) -> Dict:
+    # Format files list for prompt
+    files_str = "\n".join(available_files)
+
+    # Get environment overview
+    env_overview = state.get("codebase_overview", "No overview available")
+
+    # Format the compression prompt
+    prompt = COMPRESSION_AGENT_PROMPT.format(
+        query=state["query"],
+        available_files=files_str,
+        env_overview=env_overview
+    )
+
+    messages = [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": "Analyze files and determine compression needs"}
+    ]
+
+    # # Get LLM decision based on number of files
+    # if len(available_files) > 50:
+    #     print(colored("Using DeepSeek model for large file set...", 'cyan'))
+    #     llm = get_deepseel_ai_json(model=deepseek_model)
+    # else:
+    print(colored("Using OpenAI model for small file set...", 'cyan'))
+    llm = get_open_ai_json(model=model)
+
+    print(colored("Compression Agent 🗜️: Analyzing file relevance...", 'cyan'))
+    ai_msg = llm.invoke(messages)
+
+    try:
+        decision = json.loads(ai_msg.content)
+    except json.JSONDecodeError as e:
+        error_msg = f"Invalid JSON response from LLM: {str(e)}"
+        print(colored(error_msg, 'red'))
+        raise
+
+    # Validate required fields
+    required_fields = ["compress", "selected_files", "rationale"]
+    for field in required_fields:
+        if field not in decision:
+            error_msg = f"Invalid response format: Missing required field: {field}"
+            print(colored(error_msg, 'red'))
+            raise ValueError(f"Missing required field: {field}")
+
+    return decision
 
 def compression_agent(state: AgentGraphState, model=None, deepseek_model=None, server=None) -> AgentGraphState:
     """
     Agent that analyzes and potentially compresses file analysis data based on relevance.
+
+    Files are ranked locally (BM25 over the analyses, cached embeddings and the IaC
+    dependency graph) and the best ones kept under a token budget. The LLM is only
+    asked to choose when the ranking can't clearly tell the files apart.
     """
     try:
         print(colored("\nCompression Agent 🗜️: Starting analysis...", 'cyan'))
-        
+
         # Get available files from file_analyses
         available_files = list(state.get("file_analyses", {}).keys())
         if not available_files:
             print(colored("No files to analyze", 'yellow'))
             return state
-            
-        # Format files list for prompt
-        files_str = "\n".join(available_files)
-        
-        # Get environment overview
-        env_overview = state.get("codebase_overview", "No overview available")
-        
-        # Format the compression prompt
-        prompt = COMPRESSION_AGENT_PROMPT.format(
-            query=state["query"],
-            available_files=files_str,
-            env_overview=env_overview
-        )
 
-        messages = [
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": "Analyze files and determine compression needs"}
-        ]
-
-        # # Get LLM decision based on number of files
-        # if len(available_files) > 50:
-        #     print(colored("Using DeepSeek model for large file set...", 'cyan'))
-        #     llm = get_deepseel_ai_json(model=deepseek_model)
-        # else:
-        print(colored("Using OpenAI model for small file set...", 'cyan'))
-        llm = get_open_ai_json(model=model)
-        
-        print(colored("Compression Agent 🗜️: Analyzing file relevance...", 'cyan'))
-        ai_msg = llm.invoke(messages)
-        
-        try:
-            decision = json.loads(ai_msg.content)
-            
-            # Validate required fields
-            required_fields = ["compress", "selected_files", "rationale"]
-            for field in required_fields:
-                if field not in decision:
-                    raise ValueError(f"Missing required field: {field}")
-
-            print(colored(f"Compression decision: {'Compress' if decision['compress'] else 'No compression needed'}", 'cyan'))
-            print(colored(f"Rationale: {decision['rationale']}", 'cyan'))
-            
-            if decision["compress"]:
-                # Create compressed version of file_analyses
-                compressed_analyses = {
-                    file_path: analysis 
-                    for file_path, analysis in state["file_analyses"].items()
-                    if file_path in decision["selected_files"]
-                }
-                
-                # Store compressed analyses in state
-                state["file_analyses_compressed"] = compressed_analyses
-                print(colored(f"Compressed analysis from {len(state['file_analyses'])} to {len(compressed_analyses)} files", 'green'))
-            else:
-                print(colored("No compression needed, using full file analysis", 'green'))
-                
-            # Store the compression decision
-            state["compression_decision"] = decision
-
-        except json.JSONDecodeError as e:
-            error_msg = f"Invalid JSON response from LLM: {str(e)}"
-            print(colored(error_msg, 'red'))
-            raise
-            
-        except ValueError as e:
-            error_msg = f"Invalid response format: {str(e)}"
-            print(colored(error_msg, 'red'))
-            raise
+        ranking = rank_files(state)
+        print(colored(
+            f"Ranked {len(available_files)} files: {ranking.total_tokens} tokens of analyses, "
+            f"budget {COMPRESSION_TOKEN_BUDGET}, confidence {ranking.confidence:.2f}", 'cyan'
+        ))
+
+        if ranking.total_tokens <= COMPRESSION_TOKEN_BUDGET:
+            decision = {
+                "compress": False,
+                "selected_files": [],
+                "rationale": f"All file analyses fit in the {COMPRESSION_TOKEN_BUDGET} token budget"
+            }
+        elif ranking.selected and ranking.confidence >= MIN_RANKING_CONFIDENCE:
+            decision = {
+                "compress": True,
+                "selected_files": ranking.selected,
+                "rationale": (
+                    f"Kept the {len(ranking.selected)} most relevant files to the query that fit in "
+                    f"the {COMPRESSION_TOKEN_BUDGET} token budget, by local relevance ranking"
+                )
+            }
+        else:
+            print(colored("Ranking confidence is low, asking the LLM to choose", 'yellow'))
+            decision = get_llm_decision(state, ranking.ranked[:MAX_CANDIDATE_FILES], model=model)
+
+        print(colored(f"Compression decision: {'Compress' if decision['compress'] else 'No compression needed'}", 'cyan'))
+        print(colored(f"Rationale: {decision['rationale']}", 'cyan'))
+
+        if decision["compress"]:
+            # Create compressed version of file_analyses
+            compressed_analyses = {
+                file_path: analysis
+                for file_path, analysis in state["file_analyses"].items()
+                if file_path in decision["selected_files"]
+            }
+
+            # Store compressed analyses in state
+            state["file_analyses_compressed"] = compressed_analyses
+            print(colored(f"Compressed analysis from {len(state['file_analyses'])} to {len(compressed_analyses)} files", 'green'))
+        else:
+            print(colored("No compression needed, using full file analysis", 'green'))
+
+        # Store the compression decision
+        state["compression_decision"] = decision
 
         if "compression_agent_response" not in state:
             state["compression_agent_response"] = []
         state["compression_agent_response"].append(
-            SystemMessage(content=ai_msg.content)
+            SystemMessage(content=json.dumps(decision))
         )
-        
+
         return state
 
     except Exception as e:
@@ -102,4 +190,4 @@ def compression_agent(state: AgentGraphState, model=None, deepseek_model=None, s
         if "compression_agent_response" not in state:
             state["compression_agent_response"] = []
         state["compression_agent_response"].append(SystemMessage(content=error_msg))
-        return state
\ No newline at end of file
+        return state
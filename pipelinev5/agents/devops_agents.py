@@ -1,27 +1,152 @@
+import os
 import json
-from typing import Dict
+import queue
+from typing import Dict, List, Optional, Set, Tuple, Union
 from termcolor import colored
 from datetime import datetime
 from pathlib import Path
 from langchain_core.messages import SystemMessage
+from langgraph.types import Send
+from forge.forge_wrapper import ForgeWrapper
 from ai_models.openai_models import get_open_ai_json
 from states.state import AgentGraphState, LLMDecision, ToolResult
-from utils.general_helper_functions import check_for_content
+from utils.general_helper_functions import check_for_content, base_path
 from utils.logging_helper_functions import log_interaction, log_status_update
 from prompts.devops_agent_prompts import devops_prompt_template
+from utils.prompt_builder import PromptBuilder, format_file_tree
+from utils.step_scheduler import step_dependencies, ready_steps, parallel_batch
+from utils.step_workspace import StepWorkspace
+from utils.blob_store import BlobStore
+from utils.knowledge_store import KnowledgeStore
+from utils.summary_worker import SummaryWorker
 from agent_tools.devops_tools import (
     format_knowledge_sequence,
     format_completed_steps,
     summarize_step_knowledge,
+    template_step_summary,
     generate_quick_summary_from_decision,
+    template_decision_summary,
     DevOpsTools
 )
 
-def get_next_devops_action(state: AgentGraphState, prompt=devops_prompt_template, model=None, server=None, feedback=None) -> AgentGraphState:
+# Token budgets for each part of the decision prompt, overridable per section with
+# DEVOPS_PROMPT_BUDGET_<NAME>. Execution history keeps its most recent actions.
+PROMPT_SECTION_BUDGETS = {
+    name: int(os.getenv(f"DEVOPS_PROMPT_BUDGET_{name.upper()}", default))
+    for name, default in {
+        "current_step": 1000,
+        "previous_steps": 1500,
+        "execution_history": 3000,
+        "overview": 2000,
+        "file_tree": 1500,
+        "file_contents": 8000,
+        "credentials": 500,
+    }.items()
+}
+KNOWLEDGE_FULL_ENTRIES = int(os.getenv("DEVOPS_PROMPT_FULL_ACTIONS", "5"))
+
+# Independent plan steps run side by side, each in its own copy of the repo
+PARALLEL_STEPS = os.getenv("DEVOPS_PARALLEL_STEPS", "true").lower() != "false"
+MAX_PARALLEL_STEPS = int(os.getenv("DEVOPS_MAX_PARALLEL_STEPS", "4"))
+MAX_STEP_ACTIONS = int(os.getenv("DEVOPS_MAX_STEP_ACTIONS", "25"))
+# Decisions a parallel step can't act on, since stdin is shared with the other steps
+HUMAN_TOOLS = {"ask_human_for_information", "ask_human_for_intervention"}
+
+# knowledge_sequence is copied on every graph step, so long action inputs and
+# outputs live in a blob store with previews in state, and past
+# DEVOPS_KNOWLEDGE_MAX_ACTIONS entries the older ones are folded into a summary.
+# Blobs unused for DEVOPS_KNOWLEDGE_MAX_AGE_DAYS are removed.
+knowledge_store = KnowledgeStore(
+    BlobStore(
+        str(base_path(os.getenv("DEVOPS_KNOWLEDGE_DIR", os.path.join("system_maps", "knowledge_blobs")))),
+        max_age_days=float(os.getenv("DEVOPS_KNOWLEDGE_MAX_AGE_DAYS", "7"))
+    ),
+    preview_chars=int(os.getenv("DEVOPS_KNOWLEDGE_PREVIEW_CHARS", "500")),
+    max_entries=int(os.getenv("DEVOPS_KNOWLEDGE_MAX_ACTIONS", "20")),
+    keep_recent=int(os.getenv("DEVOPS_KNOWLEDGE_KEEP_RECENT", "10"))
+)
+
+# Status taglines and step summaries are written in the background, never waited on
+summary_worker = SummaryWorker(workers=int(os.getenv("DEVOPS_SUMMARY_WORKERS", "2")))
+# How long the end of the plan waits for step summaries still being written
+SUMMARY_FLUSH_TIMEOUT = float(os.getenv("DEVOPS_SUMMARY_FLUSH_TIMEOUT", "10"))
+
+# LLM step summaries come back from the worker threads through this queue, as
+# ((step_index, timestamp), summary); apply_finished_summaries puts them into
+# state from inside a node. Summaries whose step isn't in completed_steps yet
+# (a parallel step not merged yet) wait in _unapplied_summaries.
+finished_summaries = queue.Queue()
+_unapplied_summaries: Dict[Tuple[int, str], Dict] = {}
+
+def log_decision_status(decision: LLMDecision):
+    """Log a status line for decision once the LLM tagline is ready (or its template)."""
+    timestamp = datetime.now().isoformat()
+    summary_worker.submit(
+        generate_quick_summary_from_decision,
+        decision,
+        fallback=lambda: template_decision_summary(decision),
+        on_done=lambda result: log_status_update(*result, timestamp=timestamp)
+    )
+
+def summarize_step_in_background(completed_step: Dict, knowledge_sequence, step_description: str):
+    """
+    Give completed_step a template summary now, and have the LLM summary written
+    in the background, while the next step is already being decided. The worker
+    only queues it; apply_finished_summaries swaps it in.
+    """
+    knowledge_sequence = list(knowledge_sequence)
+    completed_step["summary"] = template_step_summary(knowledge_sequence, step_description)
+    key = (completed_step["step_index"], completed_step["timestamp"])
+
+    def deliver(summary):
+        if summary:
+            finished_summaries.put((key, summary))
+
+    summary_worker.submit(
+        summarize_step_knowledge,
+        knowledge_sequence,
+        step_description,
+        on_done=deliver
+    )
+
+def apply_finished_summaries(state: AgentGraphState, wait: Optional[float] = None):
+    """
+    Replace the template summaries in completed_steps with the LLM summaries
+    finished so far, waiting up to wait seconds for the pending ones first.
+    Steps are replaced with updated copies, never changed in place.
+    """
+    if wait is not None and not summary_worker.flush(timeout=wait):
+        print(colored("Some step summaries were still pending, keeping their templates", 'yellow'))
+    while True:
+        try:
+            key, summary = finished_summaries.get_nowait()
+        except queue.Empty:
+            break
+        _unapplied_summaries[key] = summary
+
+    completed_steps = state["completed_steps"]
+    for i, step in enumerate(completed_steps):
+        key = (step.get("step_index"), step.get("timestamp"))
+        if key in _unapplied_summaries:
+            completed_steps[i] = {**step, "summary": _unapplied_summaries.pop(key)}
+
+def make_prompt_builder() -> PromptBuilder:
+    return PromptBuilder(
+        PROMPT_SECTION_BUDGETS,
+        keep={"execution_history": "tail", "previous_steps": "tail"}
+    )
+
+# Kept across calls so unchanged sections are reused between iterations. Steps
+# running in parallel each get their own, as PromptBuilder isn't thread-safe.
+prompt_builder = make_prompt_builder()
+
+def get_next_devops_action(state: AgentGraphState, prompt=devops_prompt_template, model=None, server=None, feedback=None,
+                           builder: Optional[PromptBuilder] = None) -> AgentGraphState:
     """
     Determine the next action for the current step in the DevOps workflow.
     This function handles decision-making only, with execution handled separately.
     """
+    builder = builder or prompt_builder
     try:
         # Initialize response list if not present
         if "devops_agent_response" not in state:
@@ -49,7 +174,8 @@ def get_next_devops_action(state: AgentGraphState, prompt=devops_prompt_template
         # Get execution history and previous steps
         exec_history = format_knowledge_sequence(
             state["knowledge_sequence"],
-            current_step.description
+            current_step.description,
+            max_full_entries=KNOWLEDGE_FULL_ENTRIES
         )
         prev_steps = format_completed_steps(state["completed_steps"])
         
@@ -61,22 +187,23 @@ def get_next_devops_action(state: AgentGraphState, prompt=devops_prompt_template
             except Exception as e:
                 print(colored(f"Warning: Could not retrieve file contents: {e}", 'yellow'))
 
-        # Format the context into the system prompt
+        # Format the context into the system prompt, each section within its token budget
         context_dict = {
             "current_step": json.dumps(current_step.dict(), indent=2),
             "previous_steps": prev_steps,
             "execution_history": exec_history,
             "codebase_context": _format_codebase_context(
-                state["codebase_overview"],
-                state["file_tree"],
-                file_contents
+                builder.fit("overview", state["codebase_overview"] or ""),
+                builder.fit("file_tree", format_file_tree(state["file_tree"])),
+                _fit_file_contents(file_contents, builder)
             ),
             "current_directory": state["current_directory"],
             "credentials": json.dumps(state.get("credentials", {}), indent=2)
         }
         
         # Create the full system prompt by formatting the template with the context
-        system_prompt = prompt.format(**context_dict)
+        system_prompt = builder.build(prompt, context_dict)
+        print(colored(builder.describe(), 'cyan'))
         # print(f"DevOps Agent Prompt: {system_prompt}")
 
         # Prepare messages for LLM with simplified user message
@@ -100,9 +227,8 @@ def get_next_devops_action(state: AgentGraphState, prompt=devops_prompt_template
             
         decision = LLMDecision(**json.loads(response))
         
-        # Generate and log summary
-        tagline, summary = generate_quick_summary_from_decision(decision)
-        log_status_update(tagline, summary)
+        # Log a status line in the background
+        log_decision_status(decision)
         
         # Print decision details
         print(colored(f"DevOps Agent Decision 🤔: {decision.type}", 'magenta'))
@@ -112,21 +238,16 @@ def get_next_devops_action(state: AgentGraphState, prompt=devops_prompt_template
         if decision.type in ["end", "none"]:
             print(colored(f"DevOps Agent 🤖: Step complete ({decision.type})", 'green'))
             
-            # Create step summary
-            step_summary = summarize_step_knowledge(
-                state["knowledge_sequence"],
-                current_step.description
-            )
-            
-            # Record completion
+            # Record completion, summarizing the step in the background
             completed_step = {
+                "step_index": state["current_step_index"],
                 "description": current_step.description,
                 "status": "completed",
-                "summary": step_summary,
                 "result": {"status": "success"},
                 "tool_used": "none",
                 "timestamp": datetime.now().isoformat()
             }
+            summarize_step_in_background(completed_step, state["knowledge_sequence"], current_step.description)
             state["completed_steps"].append(completed_step)
             
             # Reset step state
@@ -153,6 +274,195 @@ def get_next_devops_action(state: AgentGraphState, prompt=devops_prompt_template
         state["devops_agent_response"].append(SystemMessage(content=error_msg))
         return state
     
+def _fit_file_contents(file_contents: Dict, builder: PromptBuilder) -> Dict:
+    """Split the file contents budget evenly so one large file can't crowd out the rest."""
+    if not file_contents:
+        return file_contents
+    budget = max(1, PROMPT_SECTION_BUDGETS["file_contents"] // len(file_contents))
+    return {
+        path: builder.fit(f"file_contents:{path}", str(content), budget=budget, keep="both")
+        for path, content in file_contents.items()
+    }
+
+def _done_step_indices(state: AgentGraphState) -> Set[int]:
+    return {
+        step.get("step_index", i)
+        for i, step in enumerate(state["completed_steps"])
+        if step.get("status", "completed") == "completed"
+    }
+
+def _scheduled_steps(state: AgentGraphState) -> Tuple[List[int], List[int]]:
+    """Return the ready steps, and the ones among them to fan out (empty to run ready[0] in place)."""
+    ready = ready_steps(step_dependencies(state["plan_steps"]), _done_step_indices(state))
+    if not PARALLEL_STEPS:
+        return ready, []
+    # A step that didn't complete in its own workspace runs again in the repository
+    tried = set(state.get("parallel_step_results") or {})
+    batch = parallel_batch(state["plan_steps"], [i for i in ready if i not in tried], MAX_PARALLEL_STEPS)
+    return ready, batch if len(batch) > 1 else []
+
+def schedule_steps(state: AgentGraphState) -> AgentGraphState:
+    """
+    Pick what runs next from the plan's dependency graph. Independent code steps
+    editing different files are fanned out by route_scheduled_steps; anything
+    else is worked on in place, one step at a time, through
+    get_devops_action/execute_tool as before.
+    """
+    apply_finished_summaries(state)
+    ready, batch = _scheduled_steps(state)
+    if not ready:
+        # The plan is done: let the last summaries land in the final state
+        apply_finished_summaries(state, wait=SUMMARY_FLUSH_TIMEOUT)
+        _unapplied_summaries.clear()
+        state["current_step_index"] = len(state["plan_steps"])
+        return state
+
+    if batch:
+        print(colored(f"DevOps Agent 🤖: Running steps {[i + 1 for i in batch]} in parallel", 'cyan'))
+    elif state["current_step_index"] != ready[0]:
+        state["current_step_index"] = ready[0]
+        state["current_step_attempts"] = 0
+        state["current_step_context"] = {}
+        state["knowledge_sequence"] = []
+    return state
+
+def route_scheduled_steps(state: AgentGraphState) -> Union[str, List[Send]]:
+    ready, batch = _scheduled_steps(state)
+    if not ready:
+        return "end"
+    if not batch:
+        return "get_devops_action"
+    return [Send("run_parallel_step", {**state, "current_step_index": index}) for index in batch]
+
+def route_devops_action(state: AgentGraphState) -> str:
+    """Run the decided tool, or go back to the scheduler once the step is done."""
+    if state.get("current_step_context", {}).get("last_decision"):
+        return "execute_tool"
+    return "schedule_steps"
+
+def _workspace_path(workspace: StepWorkspace, path: str) -> str:
+    """Map a path inside the repo to the same path inside the step's workspace."""
+    try:
+        relative = Path(path).resolve().relative_to(workspace.repo_path.resolve())
+    except ValueError:
+        return path if not Path(path).is_absolute() else str(workspace.path)
+    return str(workspace.path / relative)
+
+def _unfinished_step(index: int, description: str, status: str, error: str) -> Dict:
+    return {
+        "step_index": index,
+        "description": description,
+        "status": status,
+        "result": {"status": "error", "error": error},
+        "tool_used": "none",
+        "timestamp": datetime.now().isoformat()
+    }
+
+def run_parallel_step(state: AgentGraphState, prompt=devops_prompt_template, model=None, server=None) -> Dict:
+    """
+    Work one plan step to completion in a private copy of the repository, then
+    merge the files it changed back. Runs as a fan-out branch, so it only returns
+    its result for merge_parallel_steps.
+
+    The branch never reads stdin, which the other branches share: a step that
+    needs a human stops, and like a step that fails or conflicts with the
+    repository, is left unmerged to be run again in the repository. The copy has
+    no .git, so steps that need git history also end up there.
+    """
+    index = state["current_step_index"]
+    step = state["plan_steps"][index]
+    print(colored(f"\nDevOps Agent 🤖: Starting step {index + 1} in its own workspace", 'cyan'))
+
+    workspace = StepWorkspace(state["repo_path"])
+    try:
+        plan_steps = list(state["plan_steps"])
+        plan_steps[index] = step.copy(update={"files": [_workspace_path(workspace, f) for f in step.files]})
+
+        forge = None
+        if step.files and state.get("forge"):
+            forge = ForgeWrapper(model=state["forge"].model, git_root=str(workspace.path), auto_commit=False)
+
+        current_directory = _workspace_path(workspace, state["current_directory"])
+        tools = DevOpsTools(
+            working_directory=current_directory,
+            subprocess_handler=state["subprocess_handler"],
+            interactive=False
+        )
+        tools.set_forge(forge)
+
+        step_state = dict(state)
+        step_state.update({
+            "plan_steps": plan_steps,
+            "completed_steps": list(state["completed_steps"]),
+            "current_directory": current_directory,
+            "current_step_attempts": 0,
+            "current_step_context": {},
+            "knowledge_sequence": [],
+            "devops_agent_response": [],
+            "tools": tools,
+            "forge": forge
+        })
+
+        builder = make_prompt_builder()
+        completed = len(step_state["completed_steps"])
+        needs_human = False
+        for _ in range(MAX_STEP_ACTIONS):
+            get_next_devops_action(step_state, prompt=prompt, model=model, server=server, builder=builder)
+            if len(step_state["completed_steps"]) > completed:
+                break
+            decision = step_state["current_step_context"].get("last_decision") or {}
+            if decision.get("type") in HUMAN_TOOLS:
+                needs_human = True
+                break
+            execute_tool(step_state)
+
+        if len(step_state["completed_steps"]) > completed:
+            result = step_state["completed_steps"][-1]
+        else:
+            error = ("Step needs human input" if needs_human
+                     else f"Step did not finish within {MAX_STEP_ACTIONS} actions")
+            result = _unfinished_step(index, step.description, "incomplete", error)
+            # Never merged into completed_steps, so the template will do
+            result["summary"] = template_step_summary(step_state["knowledge_sequence"], step.description)
+
+        if result["status"] == "completed":
+            result["workspace_changes"] = workspace.merge_back()
+            conflicts = result["workspace_changes"]["conflicts"]
+            if conflicts:
+                result["status"] = "failed"
+                result["result"] = {"status": "error", "error": f"Not merged, changed in the repo meanwhile: {conflicts}"}
+    except Exception as e:
+        print(colored(f"Error running step {index + 1} in parallel: {str(e)}", 'red'))
+        result = _unfinished_step(index, step.description, "failed", str(e))
+    finally:
+        workspace.cleanup()
+
+    return {"parallel_step_results": {index: result}}
+
+def merge_parallel_steps(state: AgentGraphState) -> AgentGraphState:
+    """
+    Add the results of steps that ran in parallel to completed_steps, in plan
+    order. Steps that didn't complete are left for the scheduler to run again in
+    the repository.
+    """
+    done = _done_step_indices(state)
+    for index, result in sorted(state.get("parallel_step_results", {}).items()):
+        if index in done:
+            continue
+        if result["status"] == "completed":
+            state["completed_steps"].append(result)
+            print(colored(f"DevOps Agent 🤖: Step {index + 1} completed", 'green'))
+        else:
+            print(colored(
+                f"DevOps Agent 🤖: Step {index + 1} {result['status']} in its workspace "
+                f"({result['result'].get('error')}), running it again in the repository", 'yellow'
+            ))
+
+    state["current_step_attempts"] = 0
+    state["current_step_context"] = {}
+    state["knowledge_sequence"] = []
+    return state
+
 def _format_codebase_context(overview: str, file_tree: str, file_contents: Dict) -> str:
     """Format codebase context for LLM consumption."""
     return f"""Overview:
@@ -165,25 +475,31 @@ def _format_codebase_context(overview: str, file_tree: str, file_contents: Dict)
                 {json.dumps(file_contents, indent=2) if file_contents else 'No file contents available'}
             """
 
+def _parse_commands(content: str) -> List[str]:
+    """The commands of an execute_commands decision: a JSON list, or one command per line."""
+    try:
+        commands = json.loads(content)
+    except (TypeError, ValueError):
+        commands = None
+    if isinstance(commands, list):
+        return [str(command).strip() for command in commands if str(command).strip()]
+    return [line.strip() for line in str(content).splitlines() if line.strip()]
+
 def _handle_step_completion(state: AgentGraphState):
     """Handle completion of current step and prepare for next step."""
     print(colored("DevOps Agent 🤖: Completing current step", 'green'))
     
-    # Generate step summary
-    step_summary = summarize_step_knowledge(
-        state["knowledge_sequence"],
-        state["plan_steps"][state["current_step_index"]].description
-    )
-    
-    # Record completion
+    # Record completion, summarizing the step in the background
+    step_description = state["plan_steps"][state["current_step_index"]].description
     completed_step = {
-        "description": state["plan_steps"][state["current_step_index"]].description,
+        "step_index": state["current_step_index"],
+        "description": step_description,
         "status": "completed",
-        "summary": step_summary,
         "result": {"status": "forced_end"},
         "tool_used": "none",
         "timestamp": datetime.now().isoformat()
     }
+    summarize_step_in_background(completed_step, state["knowledge_sequence"], step_description)
     state["completed_steps"].append(completed_step)
     
     # Move to next step
@@ -232,6 +548,7 @@ def execute_tool(state: AgentGraphState) -> AgentGraphState:
         tool_map = {
             "modify_code": "modify_code",
             "execute_command": "execute_command",
+            "execute_commands": "execute_commands",
             "retrieve_documentation": "retrieve_documentation",
             "ask_human_for_information": "ask_human_for_information",
             "ask_human_for_intervention": "ask_human_for_intervention",
@@ -270,6 +587,9 @@ def execute_tool(state: AgentGraphState) -> AgentGraphState:
             elif decision.type == "execute_command":
                 print(colored("\nPreparing command execution...", 'yellow'))
                 inputs["command"] = decision.content
+            elif decision.type == "execute_commands":
+                print(colored("\nPreparing concurrent command execution...", 'yellow'))
+                inputs["commands"] = _parse_commands(decision.content)
             elif decision.type == "retrieve_documentation":
                 print(colored("\nPreparing documentation retrieval...", 'yellow'))
                 inputs = {"query": decision.content} 
@@ -346,7 +666,7 @@ def execute_tool(state: AgentGraphState) -> AgentGraphState:
             }
             
             # Update state
-            state["knowledge_sequence"].append(knowledge_update)
+            state["knowledge_sequence"] = knowledge_store.append(state["knowledge_sequence"], knowledge_update)
             state["current_step_attempts"] += 1
             
             # Log the execution result
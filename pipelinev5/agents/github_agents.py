@@ -101,15 +101,15 @@ def github_agent(state: AgentGraphState, model=None, server=None) -> AgentGraphS
             "data": {}
         }
 
-        # Execute each requested tool and store results
-        for tool_name in decision.get("tools_to_use", []):
-            print(colored(f"\nGitHub Agent 🐙: Fetching {tool_name}...", 'cyan'))
-            
-            tool_func = getattr(github_tools, tool_name, None)
-            if tool_func:
+        # Fetch everything requested at once, then store results in the order asked for
+        tools_to_use = decision.get("tools_to_use", [])
+        print(colored(f"\nGitHub Agent 🐙: Fetching {', '.join(tools_to_use)}...", 'cyan'))
+        results = github_tools.fetch_all(tools_to_use)
+
+        for tool_name in tools_to_use:
+            result = results.get(tool_name)
+            if result:
                 try:
-                    result = tool_func()
-                    
                     if result.status == "success":
                         # Try to parse the output string as JSON if it looks like JSON
                         try:
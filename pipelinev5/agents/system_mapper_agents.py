@@ -18,28 +18,37 @@ def system_mapper_agent(state: AgentGraphState) -> AgentGraphState:
         state["file_tree"] = system_map.get("file_tree", {})
         state["file_analyses"] = system_map.get("file_analyses", {})
         
-        # Only store memories if no previous analysis exists
+        # Store all memories if no previous analysis exists, otherwise only what changed
         if repo_url := os.getenv('REPO_URLS', '').strip():
             memory_context = state.get("memory_context")
-            if not memory_context or not memory_context.past_analyses:
+            has_past_analysis = memory_context and memory_context.past_analyses
+            updated_files = system_map.get("updated_files", [])
+            deleted_files = system_map.get("deleted_files", [])
+            if has_past_analysis and deleted_files:
+                MemoryTools().delete_file_memories(repo_url, deleted_files)
+                print(colored(f"Removed memories of {len(deleted_files)} deleted files", 'cyan'))
+            if not has_past_analysis or updated_files or system_map.get("overview_changed"):
                 memory_tools = MemoryTools()
                 memories = []
                 
                 curr_time = datetime.now().isoformat()
                 
                 # Store file analyses
-                for file_path, analysis in state["file_analyses"].items():
+                files_to_store = updated_files if has_past_analysis else state["file_analyses"].keys()
+                for file_path in files_to_store:
+                    analysis = state["file_analyses"][file_path]
                     memories.append(Memory(
                         type="file_analysis",
                         content=json.dumps(analysis),
                         timestamp=curr_time,
                         repo_path=repo_url,
                         repo_type=state.get("repo_type", "mono"),
-                        file_path=str(file_path)
+                        file_path=str(file_path),
+                        blob_sha=system_map.get("blob_shas", {}).get(file_path, "")
                     ))
                 
                 # Store overview
-                if state["codebase_overview"]:
+                if state["codebase_overview"] and (not has_past_analysis or system_map.get("overview_changed")):
                     memories.append(Memory(
                         type="repo_overview",
                         content=state["codebase_overview"],
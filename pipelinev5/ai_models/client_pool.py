@@ -0,0 +1,88 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+import httpx
+
+DEFAULT_CONCURRENCY = 8
+
+
+def parse_concurrency(value: str) -> Dict[str, int]:
+    """Parse "gpt-4o=8,deepseek-reasoner=2" into {model: limit}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        model, _, limit = item.rpartition("=")
+        if model and limit.isdigit():
+            limits[model] = int(limit)
+    return limits
+
+
+class LLMClientPool:
+    """
+    Process-wide registry of chat model clients.
+
+    Clients are built once per (provider, model, mode, temperature) and shared by
+    every agent. All clients for a model send through one httpx.Client, so
+    keep-alive connections and TLS sessions are reused across calls and agents.
+    That client has at most `concurrency(model)` connections, which caps the
+    requests in flight to the model: extra requests wait for a free connection
+    rather than failing.
+    """
+
+    def __init__(self, default_concurrency: int = DEFAULT_CONCURRENCY,
+                 concurrency: Optional[Dict[str, int]] = None, timeout: float = 600.0):
+        self.default_concurrency = default_concurrency
+        self.limits = dict(concurrency or {})
+        self.timeout = timeout
+        self.http_clients: Dict[Tuple[str, str], httpx.Client] = {}
+        self.clients: Dict[Tuple, Any] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LLMClientPool":
+        return cls(
+            default_concurrency=int(os.getenv("LLM_DEFAULT_CONCURRENCY", str(DEFAULT_CONCURRENCY))),
+            concurrency=parse_concurrency(os.getenv("LLM_CONCURRENCY", "")),
+            timeout=float(os.getenv("LLM_TIMEOUT", "600"))
+        )
+
+    def concurrency(self, model: str) -> int:
+        return self.limits.get(model, self.default_concurrency)
+
+    def set_concurrency(self, model: str, limit: int):
+        """Set the limit for a model; takes effect for models with no clients yet."""
+        with self.lock:
+            self.limits[model] = limit
+
+    def http_client(self, provider: str, model: str) -> httpx.Client:
+        with self.lock:
+            return self._http_client(provider, model)
+
+    def _http_client(self, provider: str, model: str) -> httpx.Client:
+        key = (provider, model)
+        if key not in self.http_clients:
+            limit = self.concurrency(model)
+            self.http_clients[key] = httpx.Client(
+                limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+                # No pool timeout: waiting for a connection is how the limit is applied
+                timeout=httpx.Timeout(self.timeout, pool=None)
+            )
+        return self.http_clients[key]
+
+    def get(self, provider: str, model: str, mode: str, temperature: float,
+            factory: Callable[[httpx.Client], Any]) -> Any:
+        """Return the shared client for these settings, building it with factory(http_client) once."""
+        key = (provider, model, mode, temperature)
+        with self.lock:
+            if key not in self.clients:
+                self.clients[key] = factory(self._http_client(provider, model))
+            return self.clients[key]
+
+    def close(self):
+        with self.lock:
+            for client in self.http_clients.values():
+                client.close()
+            self.http_clients.clear()
+            self.clients.clear()
+
+
+client_pool = LLMClientPool.from_env()
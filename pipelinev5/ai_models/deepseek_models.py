@@ -1,5 +1,7 @@
 from langchain_openai.chat_models.base import BaseChatOpenAI
 from utils.general_helper_functions import load_config
+from ai_models.client_pool import client_pool
+from ai_models.response_cache import get_response_cache
 import os
 # from dotenv import load_dotenv
 
@@ -23,22 +25,24 @@ langchain_project = os.getenv('LANGCHAIN_PROJECT', 'your_LANGCHAIN_PROJECT')
 os.environ["LANGCHAIN_PROJECT"] = langchain_project
 
 def get_deepseek_ai(temperature=0, model='deepseek-reasoner'):
-    llm = BaseChatOpenAI(
-    api_key = deepseek_api_key,
-    model=model,
-    temperature = temperature,
-    openai_api_base='https://api.deepseek.com',
-    max_tokens=8192
-)
-    return llm
+    return client_pool.get("deepseek", model, "text", temperature, lambda http_client: BaseChatOpenAI(
+        api_key=deepseek_api_key,
+        model=model,
+        temperature=temperature,
+        openai_api_base='https://api.deepseek.com',
+        max_tokens=8192,
+        http_client=http_client,
+        cache=get_response_cache(),
+    ))
 
 def get_deepseek_ai_json(temperature=0, model='deepseek-reasoner'):
-    llm = BaseChatOpenAI(
-    model=model,
-    api_key = deepseek_api_key,
-    temperature = temperature,
-    openai_api_base='https://api.deepseek.com',
-    max_tokens=8192,
-    model_kwargs={"response_format": {"type": "json_object"}},
-)
-    return llm
+    return client_pool.get("deepseek", model, "json", temperature, lambda http_client: BaseChatOpenAI(
+        model=model,
+        api_key=deepseek_api_key,
+        temperature=temperature,
+        openai_api_base='https://api.deepseek.com',
+        max_tokens=8192,
+        model_kwargs={"response_format": {"type": "json_object"}},
+        http_client=http_client,
+        cache=get_response_cache(),
+    ))
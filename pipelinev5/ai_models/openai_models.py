@@ -1,5 +1,7 @@
 from langchain_openai import ChatOpenAI
 from utils.general_helper_functions import load_config
+from ai_models.client_pool import client_pool
+from ai_models.response_cache import get_response_cache
 import os
 # from dotenv import load_dotenv
 
@@ -25,16 +27,18 @@ os.environ["LANGCHAIN_PROJECT"] = langchain_project
 
 
 def get_open_ai(temperature=0, model='gpt-4o'):
-    llm = ChatOpenAI(
-    model=model,
-    temperature = temperature,
-)
-    return llm
+    return client_pool.get("openai", model, "text", temperature, lambda http_client: ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        http_client=http_client,
+        cache=get_response_cache(),
+    ))
 
 def get_open_ai_json(temperature=0, model='gpt-4o'):
-    llm = ChatOpenAI(
-    model=model,
-    temperature = temperature,
-    model_kwargs={"response_format": {"type": "json_object"}},
-)
-    return llm
+    return client_pool.get("openai", model, "json", temperature, lambda http_client: ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        model_kwargs={"response_format": {"type": "json_object"}},
+        http_client=http_client,
+        cache=get_response_cache(),
+    ))
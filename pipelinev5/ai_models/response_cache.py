@@ -0,0 +1,83 @@
+import os
+import hashlib
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+from diskcache import Cache
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+from utils.general_helper_functions import base_path
+
+MODES = ("off", "auto", "record", "replay")
+
+
+class CacheMissError(RuntimeError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+class LLMResponseCache(BaseCache):
+    """
+    Disk-backed LangChain cache for chat model responses.
+
+    Entries are keyed by the SHA1 of the prompt and the model's settings (model,
+    temperature, response format, bound tools), expire after `ttl` seconds and
+    are evicted least recently used past `size_limit` bytes.
+
+    Modes:
+        auto    serve cached responses, call the model and store on a miss
+        record  always call the model and store the response
+        replay  only serve cached responses; a miss raises CacheMissError, so
+                runs are offline and deterministic
+    """
+
+    def __init__(self, directory: str, mode: str = "auto", ttl: Optional[float] = None,
+                 size_limit: int = 512 * 1024 * 1024):
+        if mode not in MODES[1:]:
+            raise ValueError(f"Unknown cache mode {mode!r}, expected one of {MODES[1:]}")
+        self.mode = mode
+        self.ttl = ttl
+        self.cache = Cache(directory, size_limit=size_limit, eviction_policy="least-recently-used")
+
+    @staticmethod
+    def key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha1(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        if self.mode == "record":
+            return None
+        value = self.cache.get(self.key(prompt, llm_string))
+        if value is None:
+            if self.mode == "replay":
+                raise CacheMissError(f"No recorded LLM response for request {self.key(prompt, llm_string)}")
+            return None
+        return [loads(generation) for generation in value]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        if self.mode == "replay":
+            return
+        self.cache.set(
+            self.key(prompt, llm_string),
+            [dumps(generation) for generation in return_val],
+            expire=self.ttl
+        )
+
+    def clear(self, **kwargs: Any) -> None:
+        self.cache.clear()
+
+
+@lru_cache(maxsize=None)
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """
+    The process-wide cache configured by LLM_CACHE_MODE (off, auto, record or replay),
+    LLM_CACHE_DIR (relative to pipelinev5), LLM_CACHE_TTL (seconds) and LLM_CACHE_SIZE_MB; None when off.
+    """
+    mode = os.getenv("LLM_CACHE_MODE", "off").lower()
+    if mode == "off":
+        return None
+    ttl = os.getenv("LLM_CACHE_TTL")
+    return LLMResponseCache(
+        str(base_path(os.getenv("LLM_CACHE_DIR", os.path.join("system_maps", "llm_cache")))),
+        mode=mode,
+        ttl=float(ttl) if ttl else None,
+        size_limit=int(os.getenv("LLM_CACHE_SIZE_MB", "512")) * 1024 * 1024
+    )
@@ -6,14 +6,20 @@ import git
 import shutil
 import sys
 import json
+import uuid
 import logging
+import argparse
+from datetime import datetime
 from termcolor import colored
 from dotenv import load_dotenv
 from agent_tools.system_mapper_tools import SystemMapper
-from utils.general_helper_functions import configure_logger
+from utils.general_helper_functions import configure_logger, base_path
 from forge.forge_wrapper import ForgeWrapper
 from utils.subprocess_handler import SubprocessHandler
+from utils.checkpointer import RunCheckpointer
+from states.state import STATE_MODELS
 from agent_graph.graph import create_graph, compile_workflow, initialize_state
+from agents.devops_agents import summary_worker, SUMMARY_FLUSH_TIMEOUT
 
 # Initialize logging
 logger = configure_logger(__name__)
@@ -35,6 +41,9 @@ class Pipeline:
         self.system_map = None
         self.forge = None
         self.subprocess_handler = None
+        self.run_id = None
+        # Every run is checkpointed after each node, so it can be resumed by run id
+        self.checkpoint_db = base_path(os.getenv('DEVOPS_CHECKPOINT_DB', os.path.join('system_maps', 'checkpoints.sqlite')))
 
         # Create necessary directories
         self.system_maps_dir.mkdir(parents=True, exist_ok=True)
@@ -89,8 +98,10 @@ class Pipeline:
             
         return self.system_map
 
-    def run_workflow(self, query: str) -> dict:
-        """Run the complete workflow with the graph."""
+    def run_workflow(self, query: str = None, resume_run_id: str = None) -> dict:
+        """Run the complete workflow with the graph, or continue run resume_run_id from its last checkpoint."""
+        checkpointer = None
+        self.run_id = None
         try:
             # Initialize components
             self.initialize_forge()
@@ -106,24 +117,45 @@ class Pipeline:
                 query=query,
                 repo_path=str(self.test_repos_path)
             )
-            
-            workflow = compile_workflow(graph)
 
-            # Initialize state
-            initial_state = initialize_state(
-                query=query,
-                repo_path=str(self.test_repos_path)
+            # Forge and the subprocess handler aren't saved in checkpoints; a resumed
+            # run gets this process's instances
+            checkpointer = RunCheckpointer.open(
+                str(self.checkpoint_db),
+                runtime={"forge": self.forge, "subprocess_handler": self.subprocess_handler},
+                state_types=STATE_MODELS
             )
-
-            # Add forge and subprocess handler to state
-            initial_state["forge"] = self.forge
-            initial_state["subprocess_handler"] = self.subprocess_handler
-
-            print(colored("\nStarting workflow execution...", 'green'))
+            workflow = compile_workflow(graph, checkpointer=checkpointer)
+
+            self.run_id = resume_run_id or f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            config = {"recursion_limit": iterations, "configurable": {"thread_id": self.run_id}}
+
+            if resume_run_id:
+                saved = workflow.get_state(config)
+                if not saved.values:
+                    raise ValueError(f"No checkpoints found for run {resume_run_id}")
+                if not saved.next:
+                    print(colored(f"\nRun {resume_run_id} already finished", 'yellow'))
+                    return {"final_state": saved.values}
+                print(colored(f"\nResuming run {resume_run_id} at {', '.join(saved.next)}...", 'green'))
+                # No input: continue from the last checkpoint, skipping completed nodes
+                workflow_input = None
+            else:
+                # Initialize state
+                workflow_input = initialize_state(
+                    query=query,
+                    repo_path=str(self.test_repos_path)
+                )
+
+                # Add forge and subprocess handler to state
+                workflow_input["forge"] = self.forge
+                workflow_input["subprocess_handler"] = self.subprocess_handler
+
+                print(colored(f"\nStarting workflow execution (run {self.run_id})...", 'green'))
             
             # Execute workflow
-            limit = {"recursion_limit": iterations}
-            for event in workflow.stream(initial_state, limit):
+            event = {}
+            for event in workflow.stream(workflow_input, config):
                 if event.get("end_chain") == "end_chain":
                     print(colored("\nWorkflow completed successfully", 'green'))
                     break
@@ -134,9 +166,21 @@ class Pipeline:
 
         except Exception as e:
             logger.error(f"Workflow execution failed: {str(e)}")
+            if self.run_id:
+                print(colored(f"Resume this run with: --resume {self.run_id}", 'yellow'))
             raise
+        finally:
+            # The summary threads are daemons, so status lines still queued are lost at exit
+            if not summary_worker.flush(timeout=SUMMARY_FLUSH_TIMEOUT):
+                logger.warning("Some status lines were still pending when the run ended")
+            if checkpointer:
+                checkpointer.conn.close()
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the DevOps agent pipeline")
+    parser.add_argument("--resume", metavar="RUN_ID", help="continue an interrupted run from its last checkpoint")
+    args = parser.parse_args()
+
     # Load environment variables
     load_dotenv()
 
@@ -150,6 +194,16 @@ def main():
     print(colored("\n=== Initializing Pipeline ===", 'blue'))
     pipeline = Pipeline(repo_path)
 
+    if args.resume:
+        try:
+            pipeline.run_workflow(resume_run_id=args.resume)
+        except KeyboardInterrupt:
+            print(colored(f"\nOperation cancelled by user. Resume with: --resume {args.resume}", 'yellow'))
+            return
+        except Exception as e:
+            print(colored(f"\nError: {str(e)}", 'red'))
+            return
+
     while True:
         try:
             # Get user query
@@ -172,6 +226,8 @@ def main():
             
         except KeyboardInterrupt:
             print(colored("\nOperation cancelled by user", 'yellow'))
+            if pipeline.run_id:
+                print(colored(f"Resume this run with: --resume {pipeline.run_id}", 'yellow'))
             break
         except Exception as e:
             print(colored(f"\nError: {str(e)}", 'red'))
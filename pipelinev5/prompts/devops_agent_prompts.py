@@ -29,6 +29,10 @@ execute_command:
 - Required: command (str)
 - Optional: completion_patterns (List[str]), error_patterns (List[str]), input_patterns (Dict[str, str]), timeout (int), cwd (str)
 
+execute_commands:
+- Required: commands (JSON list of str, as the content)
+* Use this to run several independent, non-interactive commands at once (e.g. `terraform fmt -check` and `tflint` in different folders). They run concurrently, so none may depend on another's result or prompt for input.
+
 retrieve_documentation:
 - Required: query (str)
 - Optional: domain_filter (List[str])
@@ -89,6 +93,14 @@ You must respond with this flat JSON schema (no 'action' object). Example schema
     "reasoning": "We need to set up Terraform backend before applying changes."
 }}
 
+**Example**: (if you want to validate two independent modules)
+{{
+    "type": "execute_commands",
+    "description": "Validate the network and compute modules",
+    "content": "[\\"terraform -chdir=network validate\\", \\"terraform -chdir=compute validate\\"]",
+    "reasoning": "The two validations don't depend on each other, so they can run at the same time."
+}}
+
 **Example**: (if no further steps are needed)
 {{
     "type": "end",
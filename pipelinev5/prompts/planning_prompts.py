@@ -24,7 +24,8 @@ You must return a JSON object with this exact schema:
             "description": "Clear description of what needs to be done",
             "content": "Specific changes or commands to execute",
             "step_type": "code" | "command",
-            "files": ["list", "of", "files"] 
+            "files": ["list", "of", "files"],
+            "depends_on": [1, 2]
         }}
     ]
 }}
@@ -34,6 +35,7 @@ Requirements:
 - content: Exact code changes or commands
 - step_type: Must be "code" or "command"
 - files: List relevant files or empty list for commands
+- depends_on: Numbers (starting at 1) of the earlier steps this step needs to have finished; [] if it needs none. Steps that don't depend on each other may run in parallel
 
 Create a complete implementation plan that:
 1. Maintains consistency with existing codebase
@@ -72,7 +74,8 @@ You must return a JSON object with this exact schema:
             "description": "Clear description of what needs to be done",
             "content": "Specific changes or commands to execute",
             "step_type": "code" | "command",
-            "files": ["list", "of", "files"] 
+            "files": ["list", "of", "files"],
+            "depends_on": [1, 2]
         }}
     ]
 }}
@@ -82,6 +85,7 @@ Requirements:
 - content: Exact code changes or commands
 - step_type: Must be "code" or "command"
 - files: List relevant files or empty list for commands
+- depends_on: Numbers (starting at 1) of the earlier steps this step needs to have finished; [] if it needs none. Steps that don't depend on each other may run in parallel
 
 Create a complete implementation plan that:
 1. Maintains consistency with existing codebase
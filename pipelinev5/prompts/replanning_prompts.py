@@ -24,7 +24,8 @@ You must return a JSON object with this exact schema:
             "description": "Clear description of what needs to be done",
             "content": "Specific changes or commands to execute",
             "step_type": "code" | "command",
-            "files": ["list", "of", "files"] // empty list for command steps
+            "files": ["list", "of", "files"], // empty list for command steps
+            "depends_on": [1, 2] // numbers of earlier steps this step needs
         }}
     ]
 }}
@@ -34,5 +35,6 @@ Requirements for each field:
 - content: For code steps, include the exact code changes. For command steps, the exact command to run
 - step_type: Must be either "code" or "command"
 - files: For code steps, list all files that will be modified. For command steps, use empty list
+- depends_on: Numbers (starting at 1) of the earlier steps this step needs to have finished; [] if it needs none. Steps that don't depend on each other may run in parallel
 
 Return the complete updated plan, not just the changes. Ensure all steps are properly sequenced and maintain dependencies.""" 
\ No newline at end of file
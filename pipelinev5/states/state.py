@@ -19,11 +19,14 @@ class Memory(BaseModel):
     repo_path: str
     repo_type: str
     file_path: str = ""
+    # Git blob SHA of the file content a file analysis was made from
+    blob_sha: str = ""
 
 class MemoryContext(BaseModel):
     past_repo_url: Optional[str] = None
     last_accessed: Optional[str] = None 
     past_analyses: Dict[str, Any] = {}
+    past_blob_shas: Dict[str, str] = {}
     past_overview: Optional[str] = None
 
 class Question(BaseModel):
@@ -53,13 +56,16 @@ class PlanStep(BaseModel):
     content: str 
     step_type: str
     files: List[str] = []
+    # 1-based numbers of the steps this one needs; None means the previous step
+    depends_on: Optional[List[int]] = None
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             "description": self.description,
             "content": self.content,
             "step_type": self.step_type,
-            "files": self.files
+            "files": self.files,
+            "depends_on": self.depends_on
         }
     
     def json(self) -> str:
@@ -81,7 +87,15 @@ class EditRequest(BaseModel):
     """Structure for edit requests from users"""
     request: str
     rationale: Optional[str] = None
+
+# Models kept in the graph state, loaded back from run checkpoints
+STATE_MODELS = (Memory, MemoryContext, Question, ValidationResult, ValidationContext,
+                LLMDecision, PlanStep, ToolResult, EditRequest)
     
+def merge_step_results(left: Optional[Dict[int, Dict]], right: Optional[Dict[int, Dict]]) -> Dict[int, Dict]:
+    """Reducer for results of steps run in parallel branches, keyed by step index."""
+    return {**(left or {}), **(right or {})}
+
 class AgentGraphState(TypedDict):
     # Only annotate actual message fields
     system_mapper_response: Annotated[list, add_messages]
@@ -125,6 +139,7 @@ class AgentGraphState(TypedDict):
     tools: Any
     iteration: int
     credentials: Dict[str, str]
+    parallel_step_results: Annotated[Dict[int, Dict], merge_step_results]
 
     github_info: Optional[str]
     github_owner: Optional[str]
@@ -196,6 +211,7 @@ state = {
     "tools": None,
     "iteration": 0,
     "credentials": {},
+    "parallel_step_results": {},
 
     "github_info": None,
     "github_owner": None,
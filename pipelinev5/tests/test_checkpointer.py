@@ -0,0 +1,92 @@
+import operator
+import threading
+from typing import Annotated, Any, Dict, List, TypedDict
+import pytest
+from langgraph.graph import StateGraph, END
+from langgraph.types import Send
+from utils.checkpointer import RunCheckpointer
+
+
+class Handle:
+    """Stands in for Forge: a live object that can't be serialized."""
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+
+
+class State(TypedDict):
+    plan_steps: List[str]
+    visited: Annotated[List[str], operator.add]
+    forge: Any
+    branch_results: Annotated[Dict[str, str], operator.or_]
+
+
+def build_graph(calls, fail_on=None):
+    def node(name):
+        def run(state):
+            calls.append(name)
+            if name == fail_on:
+                raise RuntimeError(f"crashed in {name}")
+            return {"visited": [f"{name}:{state['forge'].name}"]}
+        return run
+
+    def branch(state):
+        calls.append(state["step"])
+        if state["step"] == fail_on:
+            raise RuntimeError(f"crashed in {state['step']}")
+        return {"branch_results": {state["step"]: state["forge"].name}}
+
+    graph = StateGraph(State)
+    for name in ("memory", "planning", "execute"):
+        graph.add_node(name, node(name))
+    graph.add_node("branch", branch)
+    graph.set_entry_point("memory")
+    graph.add_edge("memory", "planning")
+    graph.add_conditional_edges(
+        "planning",
+        lambda state: [Send("branch", {**state, "step": step}) for step in state["plan_steps"]],
+        ["branch"]
+    )
+    graph.add_edge("branch", "execute")
+    graph.add_edge("execute", END)
+    return graph
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "runs.sqlite")
+
+
+def test_resume_skips_completed_nodes_and_reattaches_runtime(db_path):
+    config = {"configurable": {"thread_id": "run-1"}}
+    calls = []
+    checkpointer = RunCheckpointer.open(db_path)
+    workflow = build_graph(calls, fail_on="execute").compile(checkpointer=checkpointer)
+    with pytest.raises(RuntimeError):
+        workflow.invoke({"plan_steps": ["a", "b"], "visited": [], "forge": Handle("first")}, config)
+    assert sorted(calls) == ["a", "b", "execute", "memory", "planning"]
+
+    # A new process: fresh checkpointer and graph, with a new Forge attached
+    calls = []
+    checkpointer = RunCheckpointer.open(db_path, runtime={"forge": Handle("second")})
+    workflow = build_graph(calls).compile(checkpointer=checkpointer)
+    final = workflow.invoke(None, config)
+
+    assert calls == ["execute"]
+    assert final["visited"] == ["memory:first", "planning:first", "execute:second"]
+    assert final["branch_results"] == {"a": "first", "b": "first"}
+
+
+def test_interrupted_fan_out_reruns_only_failed_branches(db_path):
+    config = {"configurable": {"thread_id": "run-2"}}
+    calls = []
+    workflow = build_graph(calls, fail_on="b").compile(checkpointer=RunCheckpointer.open(db_path))
+    with pytest.raises(RuntimeError):
+        workflow.invoke({"plan_steps": ["a", "b"], "visited": [], "forge": Handle("first")}, config)
+
+    calls = []
+    checkpointer = RunCheckpointer.open(db_path, runtime={"forge": Handle("second")})
+    final = build_graph(calls).compile(checkpointer=checkpointer).invoke(None, config)
+
+    assert "memory" not in calls and "planning" not in calls
+    assert final["branch_results"]["b"] == "second"
@@ -0,0 +1,107 @@
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from langchain_openai import ChatOpenAI
+from ai_models.client_pool import LLMClientPool, parse_concurrency
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers /chat/completions like the OpenAI API, keeping connections alive."""
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.in_flight -= 1
+
+        payload = json.dumps({
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": f"echo: {body['messages'][-1]['content']}"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mock_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAIHandler)
+    server.lock = threading.Lock()
+    server.connections = server.in_flight = server.max_in_flight = 0
+    server.delay = 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_factory(server, model):
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    return lambda http_client: ChatOpenAI(
+        model=model, api_key="test", base_url=base_url, max_retries=0, http_client=http_client
+    )
+
+
+def test_clients_are_shared_and_reuse_connections(mock_server):
+    pool = LLMClientPool(default_concurrency=4)
+    try:
+        llm = pool.get("openai", "test-model", "text", 0, make_factory(mock_server, "test-model"))
+        assert pool.get("openai", "test-model", "text", 0, make_factory(mock_server, "test-model")) is llm
+        json_llm = pool.get("openai", "test-model", "json", 0, make_factory(mock_server, "test-model"))
+        assert json_llm is not llm
+
+        for i in range(5):
+            assert llm.invoke(f"hello {i}").content == f"echo: hello {i}"
+        json_llm.invoke("hello")
+
+        # Sequential calls through both clients go over one keep-alive connection
+        assert mock_server.connections == 1
+    finally:
+        pool.close()
+
+
+def test_concurrency_is_limited_per_model(mock_server):
+    mock_server.delay = 0.2
+    pool = LLMClientPool(default_concurrency=8, concurrency={"slow-model": 2})
+    try:
+        slow = pool.get("openai", "slow-model", "text", 0, make_factory(mock_server, "slow-model"))
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(lambda i: slow.invoke(f"q{i}").content, range(6)))
+
+        assert results == [f"echo: q{i}" for i in range(6)]
+        assert mock_server.max_in_flight == 2
+        assert mock_server.connections == 2
+        assert pool.concurrency("other-model") == 8
+    finally:
+        pool.close()
+
+
+def test_parse_concurrency():
+    assert parse_concurrency("gpt-4o=8, deepseek-reasoner=2,bad,x=") == {"gpt-4o": 8, "deepseek-reasoner": 2}
+    assert parse_concurrency("") == {}
@@ -0,0 +1,87 @@
+import time
+import asyncio
+from utils.command_executor import AsyncCommandExecutor, OutputBuffer, run_coroutine
+
+
+def test_streams_lines_and_returns_exit_code():
+    lines = []
+    result = run_coroutine(AsyncCommandExecutor().run(
+        "echo one; echo two >&2; printf 'Enter a value: '; sleep 0.5; exit 3",
+        on_line=lambda stream, line: lines.append((stream, line)),
+    ))
+
+    assert result.returncode == 3 and not result.ok
+    assert ("stdout", "one") in lines
+    assert ("stderr", "two") in lines
+    # A prompt without a newline is passed on before the command finishes
+    assert ("stdout", "Enter a value: ") in lines
+    assert "one" in result.output and "two" in result.output
+
+
+def test_output_buffer_is_bounded():
+    buffer = OutputBuffer(max_lines=3)
+    for i in range(10):
+        buffer.append(f"line {i}")
+
+    assert buffer.dropped == 7
+    assert buffer.text() == "... [7 earlier lines dropped] ...\nline 7\nline 8\nline 9"
+
+    result = run_coroutine(AsyncCommandExecutor(max_output_lines=5).run("seq 1 100", on_line=None))
+    assert result.ok
+    assert result.dropped_lines == 95
+    assert result.output.endswith("96\n97\n98\n99\n100")
+
+
+def test_inactivity_timeout_kills_command():
+    start = time.monotonic()
+    result = run_coroutine(AsyncCommandExecutor().run("sleep 30", timeout=0.5, on_line=None))
+
+    assert result.timed_out and not result.ok
+    assert time.monotonic() - start < 5
+
+    # Regular output keeps a command alive past the timeout
+    result = run_coroutine(AsyncCommandExecutor().run(
+        "for i in 1 2 3 4; do echo $i; sleep 0.3; done", timeout=0.6, on_line=None
+    ))
+    assert result.ok
+
+
+
+def test_max_runtime_kills_chatty_command():
+    start = time.monotonic()
+    result = run_coroutine(AsyncCommandExecutor().run(
+        "while true; do echo tick; sleep 0.1; done", timeout=5, max_runtime=0.8, on_line=None
+    ))
+
+    assert result.timed_out and result.exceeded_max_runtime and not result.ok
+    assert "tick" in result.output
+    assert time.monotonic() - start < 5
+
+
+def test_run_many_runs_commands_concurrently():
+    lines = []
+    start = time.monotonic()
+    results = run_coroutine(AsyncCommandExecutor(max_concurrency=3).run_many(
+        ["sleep 0.6; echo a", "sleep 0.6; echo b", "sleep 0.6; echo c"],
+        on_line=lambda stream, line: lines.append(line),
+    ))
+
+    assert time.monotonic() - start < 1.5
+    assert [result.output for result in results] == ["a", "b", "c"]
+    assert sorted(lines) == ["[1] a", "[2] b", "[3] c"]
+
+
+def test_cancelling_stops_the_command():
+    async def cancel_soon():
+        task = asyncio.ensure_future(AsyncCommandExecutor().run("sleep 30", on_line=None))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    start = time.monotonic()
+    assert run_coroutine(cancel_soon())
+    assert time.monotonic() - start < 5
@@ -1,5 +1,6 @@
 import pytest
 import os
+import threading
 from pathlib import Path
 from typing import Dict, Any
 from states.state import AgentGraphState, PlanStep, LLMDecision
@@ -569,3 +570,35 @@ def test_execute_terraform_command(monkeypatch, base_state):
     
 #     assert result_state["knowledge_sequence"][-1]["action_type"] == "validate_command_output"
 #     assert result_state["knowledge_sequence"][-1]["result"]["status"] == "success"
+
+
+def test_step_summaries_are_applied_inside_a_node(monkeypatch):
+    from agents import devops_agents
+
+    release = threading.Event()
+
+    def llm_summary(knowledge_sequence, step_description):
+        release.wait(5)
+        return {"summary": f"LLM summary of {step_description}"}
+
+    monkeypatch.setattr(devops_agents, "summarize_step_knowledge", llm_summary)
+    step = {"step_index": 0, "description": "s0", "status": "completed", "result": {}, "timestamp": "t0"}
+    devops_agents.summarize_step_in_background(step, [], "s0")
+    state = {"completed_steps": [step]}
+    template = step["summary"]
+
+    # The worker never touches the step it was given
+    release.set()
+    assert devops_agents.summary_worker.flush(timeout=5)
+    assert step["summary"] == template
+
+    devops_agents.apply_finished_summaries(state)
+    assert state["completed_steps"][0]["summary"] == {"summary": "LLM summary of s0"}
+    assert state["completed_steps"][0] is not step
+
+
+def test_parse_commands_takes_json_lists_or_lines():
+    from agents.devops_agents import _parse_commands
+
+    assert _parse_commands('["terraform fmt -check", " tflint "]') == ["terraform fmt -check", "tflint"]
+    assert _parse_commands("terraform fmt -check\n\ntflint\n") == ["terraform fmt -check", "tflint"]
@@ -0,0 +1,126 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from utils.github_client import GitHubClient, RateLimitError
+
+ISSUES = [{"number": i} for i in range(1, 8)]
+
+
+class StubGitHubHandler(BaseHTTPRequestHandler):
+    """Serves paginated issues with ETags, like api.github.com."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        with server.lock:
+            server.requests.append(self.path)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            limited = server.rate_limited > 0
+            server.rate_limited -= 1
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        if limited:
+            return self.reply(429, {"message": "rate limited"}, {"Retry-After": "0"})
+        if url.path == "/repos/o/r/issues":
+            per_page, page = int(query["per_page"][0]), int(query.get("page", ["1"])[0])
+            items = ISSUES[(page - 1) * per_page:page * per_page]
+            headers = {}
+            if page * per_page < len(ISSUES):
+                port = server.server_address[1]
+                headers["Link"] = (
+                    f'<http://127.0.0.1:{port}/repos/o/r/issues?per_page={per_page}&page={page + 1}>; rel="next"'
+                )
+            return self.reply(200, items, headers)
+        if url.path == "/repos/o/r/actions/runs":
+            return self.reply(200, {"total_count": 1, "workflow_runs": [{"id": 1}]})
+        self.reply(404, {"message": "Not Found"})
+
+    def reply(self, status, data, headers=None):
+        payload = json.dumps(data).encode()
+        etag = f'"{hash(payload)}"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            with self.server.lock:
+                self.server.not_modified += 1
+            status, payload = 304, b""
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHubHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.in_flight = server.max_in_flight = server.not_modified = server.rate_limited = 0
+    server.delay = 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, **kwargs):
+    return GitHubClient(base_url=f"http://127.0.0.1:{server.server_address[1]}", **kwargs)
+
+
+def test_follows_pagination_up_to_the_cap(stub_server):
+    client = make_client(stub_server, per_page=3)
+    assert client.get("repos/o/r/issues") == ISSUES
+    assert client.get("repos/o/r/issues", max_pages=2) == ISSUES[:6]
+
+
+def test_repeat_requests_are_answered_from_the_etag_cache(stub_server, tmp_path):
+    first = make_client(stub_server, per_page=3, cache_dir=str(tmp_path))
+    assert first.get("repos/o/r/issues") == ISSUES
+    first.close()
+    assert stub_server.not_modified == 0
+
+    second = make_client(stub_server, per_page=3, cache_dir=str(tmp_path))
+    assert second.get("repos/o/r/issues") == ISSUES
+    assert stub_server.not_modified == 3
+
+
+def test_waits_out_rate_limits(stub_server):
+    stub_server.rate_limited = 2
+    client = make_client(stub_server)
+    assert client.get("repos/o/r/actions/runs")["workflow_runs"] == [{"id": 1}]
+    assert len(stub_server.requests) == 3
+
+
+def test_rate_limit_too_far_off_raises(stub_server):
+    client = make_client(stub_server, max_rate_limit_wait=1)
+    client.rate_limit_reset = time.time() + 3600
+    with pytest.raises(RateLimitError):
+        client.get("repos/o/r/issues")
+
+
+def test_fetch_many_runs_concurrently(stub_server):
+    stub_server.delay = 0.2
+    client = make_client(stub_server, max_workers=4)
+    results = client.fetch_many({
+        "issues": (client.get, ("repos/o/r/issues",)),
+        "runs": (client.get, ("repos/o/r/actions/runs",)),
+        "missing": (client.get, ("repos/o/r/nothing",)),
+    })
+
+    assert results["issues"] == ISSUES
+    assert results["runs"]["total_count"] == 1
+    assert isinstance(results["missing"], Exception)
+    assert stub_server.max_in_flight == 3
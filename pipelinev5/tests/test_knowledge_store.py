@@ -0,0 +1,74 @@
+import os
+from utils.blob_store import BlobStore
+from utils.knowledge_store import SUMMARY_ACTION, KnowledgeStore
+
+
+def make_entry(i, output="ok", status="success", error=None):
+    return {
+        "action_type": "execute_command",
+        "action": f"{{'command': 'terraform apply -target={i}'}}",
+        "result": {"status": status, "output": output, "error": error},
+        "context": {"step_number": 1}
+    }
+
+
+def test_long_outputs_move_to_the_blob_store(tmp_path):
+    store = KnowledgeStore(BlobStore(str(tmp_path)), preview_chars=100)
+    output = "Plan: 3 to add\n" * 500
+    entry = make_entry(1, output=output)
+
+    sequence = store.append([], entry)
+    result = sequence[0]["result"]
+    assert len(result["output"]) < 200
+    assert result["output"].startswith("Plan: 3 to add")
+    assert result["output_bytes"] == len(output)
+    assert store.full_text(result, "output") == output
+    # Short fields and the caller's entry are left alone
+    assert sequence[0]["action"] == entry["action"]
+    assert entry["result"]["output"] == output
+
+
+def test_older_entries_are_folded_into_a_summary(tmp_path):
+    store = KnowledgeStore(BlobStore(str(tmp_path)), max_entries=5, keep_recent=2)
+    sequence = []
+    for i in range(12):
+        failed = i % 4 == 0
+        sequence = store.append(sequence, make_entry(
+            i, status="error" if failed else "success", error=f"error {i}" if failed else None
+        ))
+        assert len(sequence) <= 5
+
+    summary = sequence[0]
+    assert summary["action_type"] == SUMMARY_ACTION
+    assert summary["folded_actions"] + len(sequence) - 1 == 12
+    assert summary["action_counts"]["execute_command:error"] == 3
+    assert summary["recent_errors"][-1] == "error 8"
+    assert "terraform apply -target=11" in sequence[-1]["action"]
+
+
+def test_previews_keep_the_tail_of_long_errors(tmp_path):
+    store = KnowledgeStore(BlobStore(str(tmp_path)), preview_chars=100, max_entries=3, keep_recent=1)
+    error = "Initializing modules...\n" * 200 + "Error: Invalid reference in main.tf line 12"
+
+    sequence = store.append([], make_entry(1, status="error", error=error))
+    assert sequence[0]["result"]["error"].startswith("Initializing modules")
+    assert sequence[0]["result"]["error"].endswith("Error: Invalid reference in main.tf line 12")
+
+    for i in range(3):
+        sequence = store.append(sequence, make_entry(i))
+    assert sequence[0]["recent_errors"][-1].endswith("main.tf line 12")
+
+
+def test_blob_directory_is_created_lazily_and_pruned(tmp_path):
+    directory = tmp_path / "blobs"
+    old_blobs = BlobStore(str(directory))
+    stale = old_blobs.path(old_blobs.put("stale"))
+    os.utime(stale, (0, 0))
+
+    BlobStore(str(directory / "new"), max_age_days=7)
+    assert not (directory / "new").exists()
+
+    blobs = BlobStore(str(directory), max_age_days=7)
+    digest = blobs.put("fresh")
+    assert not os.path.exists(stale)
+    assert blobs.get(digest) == "fresh"
@@ -0,0 +1,193 @@
+import json
+import pytest
+from types import SimpleNamespace
+from agent_tools.memory_backends import LocalMemoryBackend, PineconeMemoryBackend
+
+
+def make_vector(id, values, type="file_analysis", repo_path="repo-a", file_path=""):
+    return {
+        "id": id,
+        "values": values,
+        "metadata": {"type": type, "repo_path": repo_path, "file_path": file_path, "content": id}
+    }
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = LocalMemoryBackend(tmp_path / "memory", dimensions=3)
+    backend.upsert([
+        make_vector("a", [1, 0, 0], file_path="main.tf"),
+        make_vector("b", [0, 1, 0], file_path="vars.tf"),
+        make_vector("c", [0, 0, 1], type="repo_overview"),
+        make_vector("d", [1, 1, 0], repo_path="repo-b"),
+    ])
+    return backend
+
+
+def test_query_ranks_by_similarity(backend):
+    matches = backend.query([1, 0.1, 0], top_k=2)
+    assert [m["id"] for m in matches] == ["a", "d"]
+    assert matches[0]["metadata"]["file_path"] == "main.tf"
+
+    matches = backend.query([1, 0.1, 0], top_k=5, filter={"repo_path": "repo-a"})
+    assert [m["id"] for m in matches][0] == "a"
+    assert "d" not in [m["id"] for m in matches]
+
+
+def test_find_filters_exactly(backend):
+    found = backend.find({"repo_path": "repo-a", "type": ["file_analysis", "repo_overview"]})
+    assert sorted(m["id"] for m in found) == ["a", "b", "c"]
+
+    found = backend.find({"repo_path": "repo-a", "type": "repo_overview"})
+    assert [m["id"] for m in found] == ["c"]
+
+    with pytest.raises(ValueError):
+        backend.find({"content": "a"})
+
+
+def test_upsert_overwrites_and_persists(backend, tmp_path):
+    backend.upsert([make_vector("b", [0, 0, 1], file_path="renamed.tf")])
+
+    reopened = LocalMemoryBackend(tmp_path / "memory", dimensions=3)
+    matches = reopened.query([0, 0, 1], top_k=1, filter={"type": "file_analysis"})
+    assert matches[0]["id"] == "b"
+    assert matches[0]["metadata"]["file_path"] == "renamed.tf"
+    assert len(reopened.find({})) == 4
+
+
+def test_fetch_and_find_by_id_prefix(backend):
+    backend.upsert([make_vector("repo-a#file_analysis#1", [0, 1, 1])])
+
+    assert set(backend.fetch(["a", "missing", "repo-a#file_analysis#1"])) == {"a", "repo-a#file_analysis#1"}
+    found = backend.find({"type": "file_analysis"}, id_prefix="repo-a#")
+    assert [m["id"] for m in found] == ["repo-a#file_analysis#1"]
+
+
+def test_delete(backend, tmp_path):
+    backend.delete(["a", "missing"])
+
+    assert sorted(m["id"] for m in backend.find({"repo_path": "repo-a"})) == ["b", "c"]
+    reopened = LocalMemoryBackend(tmp_path / "memory", dimensions=3)
+    assert "a" not in reopened.fetch(["a", "b"])
+    assert [m["id"] for m in reopened.query([1, 0, 0], top_k=1, filter={"repo_path": "repo-a"})] != ["a"]
+
+
+class FakePineconeIndex:
+    def __init__(self, count):
+        self.ids = [f"id{i}" for i in range(count)]
+        self.queries = []
+
+    def query(self, vector, top_k, include_metadata, filter=None):
+        if include_metadata and top_k > 1000:
+            raise ValueError("top_k must be at most 1000 when include_metadata is true")
+        self.queries.append((top_k, include_metadata))
+        matches = [SimpleNamespace(id=i, score=1.0, metadata={"n": i} if include_metadata else None)
+                   for i in self.ids[:top_k]]
+        return SimpleNamespace(matches=matches)
+
+    def fetch(self, ids):
+        assert len(ids) <= 100
+        return SimpleNamespace(vectors={i: SimpleNamespace(metadata={"n": i}) for i in ids if i in self.ids})
+
+
+def test_pinecone_find_pages_past_top_k_limit():
+    backend = PineconeMemoryBackend.__new__(PineconeMemoryBackend)
+    backend.dimensions = 3
+    backend.index = FakePineconeIndex(1500)
+
+    found = backend.find({"type": "file_analysis"})
+    assert len(found) == 1500
+    assert found[1200] == {"id": "id1200", "metadata": {"n": "id1200"}}
+    assert backend.index.queries == [(10000, False)]
+
+    assert len(backend.find({"type": "file_analysis"}, limit=10)) == 10
+    assert backend.index.queries[-1] == (10, True)
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[1.0, float(len(text)), 0.0] for text in texts]
+
+
+def test_memory_tools_skips_unchanged_memories(tmp_path, monkeypatch):
+    from agent_tools import memory_tools
+    from agent_tools.memory_tools import MemoryTools
+    from states.state import Memory
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(memory_tools, "EMBED_BATCH_SIZE", 2)
+    tools = MemoryTools(backend=LocalMemoryBackend(tmp_path / "memory", dimensions=3))
+    tools.embeddings = FakeEmbeddings()
+
+    def memories(overview):
+        analyses = [
+            Memory(type="file_analysis", content=json.dumps({"main_purpose": f"analysis {i}"}), timestamp="t", repo_path="repo",
+                   repo_type="mono", file_path=f"{i}.tf")
+            for i in range(5)
+        ]
+        return analyses + [Memory(type="repo_overview", content=overview, timestamp="t",
+                                  repo_path="repo", repo_type="mono")]
+
+    tools.store_memories(memories("overview"))
+    assert len(tools.embeddings.embedded) == 6
+
+    tools.store_memories(memories("overview"))
+    assert len(tools.embeddings.embedded) == 6
+
+    tools.store_memories(memories("new overview"))
+    assert len(tools.embeddings.embedded) == 7
+
+    context = tools.query_memories("repo")
+    assert len(context.past_analyses) == 5
+    assert context.past_overview == "new overview"
+
+    tools.delete_file_memories("repo", ["0.tf", "1.tf"])
+    context = tools.query_memories("repo")
+    assert sorted(context.past_analyses) == ["2.tf", "3.tf", "4.tf"]
+
+
+def test_query_memories_reads_legacy_ids(tmp_path, monkeypatch):
+    from agent_tools.memory_tools import MemoryTools
+    from states.state import Memory
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    backend = LocalMemoryBackend(tmp_path / "memory", dimensions=3)
+    tools = MemoryTools(backend=backend)
+    tools.embeddings = FakeEmbeddings()
+
+    def legacy(i, file_path, timestamp):
+        metadata = Memory(type="file_analysis", content=json.dumps({"main_purpose": f"old {file_path}"}),
+                          timestamp=timestamp, repo_path="repo", repo_type="mono", file_path=file_path).dict()
+        return {"id": f"repo_file_analysis_{timestamp}_{i}", "values": [1, 0, 0], "metadata": metadata}
+
+    backend.upsert([legacy(0, "old.tf", "t0"), legacy(1, "main.tf", "t0")])
+    tools.store_memories([Memory(type="file_analysis", content=json.dumps({"main_purpose": "new main"}),
+                                 timestamp="t1", repo_path="repo", repo_type="mono", file_path="main.tf")])
+
+    context = tools.query_memories("repo")
+    assert context.past_analyses == {"old.tf": {"main_purpose": "old old.tf"}, "main.tf": {"main_purpose": "new main"}}
+
+
+def test_query_memories_returns_blob_shas(tmp_path, monkeypatch):
+    from agent_tools.memory_tools import MemoryTools
+    from states.state import Memory
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    tools = MemoryTools(backend=LocalMemoryBackend(tmp_path / "memory", dimensions=3))
+    tools.embeddings = FakeEmbeddings()
+
+    def analysis(file_path, blob_sha):
+        return Memory(type="file_analysis", content=json.dumps({"main_purpose": file_path}), timestamp="t",
+                      repo_path="repo", repo_type="mono", file_path=file_path, blob_sha=blob_sha)
+
+    tools.store_memories([analysis("a.tf", "sha-a"), analysis("b.tf", "")])
+    assert tools.query_memories("repo").past_blob_shas == {"a.tf": "sha-a"}
+
+    # A new blob SHA alone is stored again
+    tools.store_memories([analysis("a.tf", "sha-a2")])
+    assert len(tools.embeddings.embedded) == 3
+    assert tools.query_memories("repo").past_blob_shas == {"a.tf": "sha-a2"}
@@ -0,0 +1,59 @@
+from utils.prompt_builder import PromptBuilder, format_file_tree
+
+TEMPLATE = "Overview:\n{overview}\n\nHistory:\n{history}\n"
+
+
+def test_sections_over_budget_are_truncated():
+    builder = PromptBuilder({"overview": 20, "history": 20}, keep={"history": "tail"})
+    overview = " ".join(f"first{i}" for i in range(200))
+    history = " ".join(f"action{i}" for i in range(200))
+
+    prompt = builder.build(TEMPLATE, {"overview": overview, "history": history})
+
+    assert "first0 " in prompt and "first199" not in prompt
+    assert "action199" in prompt and "action0 " not in prompt
+    assert "tokens omitted" in prompt
+    assert builder.last_stats["overview"]["truncated"]
+    assert builder.last_stats["overview"]["tokens"] < 40
+    assert builder.last_stats["total"]["tokens"] < builder.count(overview)
+
+
+def test_unchanged_sections_are_reused():
+    builder = PromptBuilder({"overview": 1000})
+    builder.build(TEMPLATE, {"overview": "the overview", "history": "action 1"})
+    builder.build(TEMPLATE, {"overview": "the overview", "history": "action 1\naction 2"})
+
+    assert builder.last_stats["overview"] == dict(tokens=builder.count("the overview"), reused=True, truncated=False)
+    assert not builder.last_stats["history"]["reused"]
+    assert "overview" in builder.describe() and "reused" in builder.describe()
+
+
+def test_token_counts_are_cached(monkeypatch):
+    calls = []
+
+    def fake_count(text):
+        calls.append(text)
+        return len(text.split())
+
+    monkeypatch.setattr("utils.prompt_builder.count_tokens", fake_count)
+    builder = PromptBuilder({}, max_cached_counts=2)
+
+    assert builder.count("a b c") == 3
+    assert builder.count("a b c") == 3
+    assert calls == ["a b c"]
+
+    builder.count("d")
+    builder.count("e")
+    builder.count("a b c")
+    assert calls == ["a b c", "d", "e", "a b c"]
+
+
+def test_format_file_tree():
+    tree = {
+        "/repo/main.tf": "file",
+        "/repo/modules": {"/repo/modules/vpc": {"/repo/modules/vpc/main.tf": "file"}},
+    }
+
+    assert format_file_tree(tree) == "main.tf\nmodules/\n  vpc/\n    main.tf"
+    assert format_file_tree({}) == "No file tree available"
+    assert format_file_tree("already formatted") == "already formatted"
@@ -0,0 +1,78 @@
+import pytest
+from utils.rate_limiter import TokenBucket, call_with_retries, get_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, message="rate limited", headers=None):
+        super().__init__(message)
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+
+def test_token_bucket_limits_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+
+    for _ in range(6):
+        bucket.acquire()
+
+    # Two requests go out immediately, the other four at 2 per second
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_pause_holds_back_callers():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, clock=clock, sleep=clock.sleep)
+
+    bucket.pause(5)
+    bucket.acquire()
+
+    assert clock.now >= 5
+
+
+def test_get_retry_after():
+    assert get_retry_after(RateLimitError(headers={"retry-after": "7"})) == 7
+    assert get_retry_after(RateLimitError(headers={"retry-after-ms": "250"})) == 0.25
+    assert get_retry_after(Exception("429 Please try again in 1.5s")) == 1.5
+    assert get_retry_after(Exception("429 retry-after: 3")) == 3
+    assert get_retry_after(Exception("429"), default=2) == 2
+
+
+def test_call_with_retries_honors_retry_after():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100, clock=clock, sleep=clock.sleep)
+    calls = []
+
+    def flaky():
+        calls.append(clock.now)
+        if len(calls) == 1:
+            raise RateLimitError(headers={"retry-after": "4"})
+        return "ok"
+
+    assert call_with_retries(flaky, limiter=bucket) == "ok"
+    assert len(calls) == 2
+    assert calls[1] >= 4
+
+
+def test_call_with_retries_gives_up():
+    sleeps = []
+
+    def broken():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        call_with_retries(broken, max_retries=2, backoff=1, sleep=sleeps.append)
+
+    assert sleeps == [1, 2]
@@ -0,0 +1,78 @@
+from utils.relevance import BM25, CachedEmbedder, rank_file_analyses
+
+
+def make_analysis(purpose, components=(), relevance=None):
+    return {
+        "main_purpose": purpose,
+        "key_components": list(components),
+        "patterns": [],
+        "devops_relevance": relevance or {"infrastructure": "None"},
+        "dependencies": []
+    }
+
+
+FILE_ANALYSES = {
+    "/repo/rds.tf": make_analysis("Provisions the Postgres RDS database", ["aws_db_instance.main"]),
+    "/repo/rds_vars.tf": make_analysis("Variables", ["var.instance_class"]),
+    "/repo/vpc.tf": make_analysis("Creates the VPC and subnets", ["aws_vpc.main"]),
+    "/repo/README.md": make_analysis("Project documentation"),
+    "/repo/ci.yml": make_analysis("CI pipeline", relevance={"pipeline": "Runs terraform plan"}),
+}
+
+
+def test_bm25_prefers_rare_matching_terms():
+    scores = BM25({
+        "a": "postgres database",
+        "b": "vpc subnets database",
+        "c": "readme",
+    }).score("resize the postgres database")
+
+    assert scores["a"] > scores["b"] > scores["c"] == 0
+
+
+def test_rank_selects_relevant_files_under_budget():
+    neighbors = {"/repo/rds.tf": ["/repo/rds_vars.tf"]}
+    ranking = rank_file_analyses(
+        "Upgrade the postgres database",
+        FILE_ANALYSES,
+        token_budget=100,
+        neighbors=lambda path: neighbors.get(path, []),
+    )
+
+    assert ranking.ranked[:2] == ["/repo/rds.tf", "/repo/rds_vars.tf"]
+    assert ranking.selected[0] == "/repo/rds.tf"
+    assert "/repo/rds_vars.tf" in ranking.selected
+    assert "/repo/README.md" not in ranking.selected
+    assert sum(ranking.tokens[path] for path in ranking.selected) <= 100
+    assert ranking.confidence > 0.5
+
+    # Same inputs, same selection
+    again = rank_file_analyses("Upgrade the postgres database", FILE_ANALYSES, token_budget=100)
+    assert again.selected[0] == ranking.selected[0]
+
+
+def test_rank_without_matches_has_no_confidence():
+    ranking = rank_file_analyses("kubernetes helm chart", FILE_ANALYSES, token_budget=1000)
+
+    assert ranking.selected == []
+    assert ranking.confidence == 0
+
+
+def test_cached_embedder_embeds_each_text_once():
+    class FakeEmbeddings:
+        def __init__(self):
+            self.embedded = []
+
+        def embed_documents(self, texts):
+            self.embedded.extend(texts)
+            return [[float(len(text)), 1.0] for text in texts]
+
+    embeddings = FakeEmbeddings()
+    embed = CachedEmbedder(embeddings)
+
+    ranking = rank_file_analyses("postgres", FILE_ANALYSES, token_budget=1000, embed=embed)
+    assert ranking.ranked[0] == "/repo/rds.tf"
+    assert len(embeddings.embedded) == len(FILE_ANALYSES) + 1
+
+    rank_file_analyses("postgres", FILE_ANALYSES, token_budget=1000, embed=embed)
+    assert len(embeddings.embedded) == len(FILE_ANALYSES) + 1
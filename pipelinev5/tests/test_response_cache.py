@@ -0,0 +1,48 @@
+import time
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from ai_models.response_cache import CacheMissError, LLMResponseCache
+
+
+def make_model(cache):
+    return FakeListChatModel(responses=["first", "second", "third"], cache=cache)
+
+
+def test_auto_mode_serves_repeated_requests_from_cache(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), mode="auto")
+    model = make_model(cache)
+
+    assert model.invoke("plan the rollout").content == "first"
+    assert model.invoke("plan the rollout").content == "first"
+    assert model.invoke("another question").content == "second"
+
+    # Survives a restart, without calling the model
+    reopened = make_model(LLMResponseCache(str(tmp_path), mode="auto"))
+    assert reopened.invoke("another question").content == "second"
+    assert reopened.i == 0
+
+
+def test_record_then_replay(tmp_path):
+    recorder = make_model(LLMResponseCache(str(tmp_path), mode="record"))
+    recorder.invoke("plan the rollout")
+    # Record mode always calls the model and keeps the latest response
+    assert recorder.invoke("plan the rollout").content == "second"
+
+    replayer = make_model(LLMResponseCache(str(tmp_path), mode="replay"))
+    assert replayer.invoke("plan the rollout").content == "second"
+    assert replayer.i == 0
+    with pytest.raises(CacheMissError):
+        replayer.invoke("never recorded")
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    model = make_model(LLMResponseCache(str(tmp_path), mode="auto", ttl=0.2))
+
+    assert model.invoke("plan the rollout").content == "first"
+    time.sleep(0.3)
+    assert model.invoke("plan the rollout").content == "second"
+
+
+def test_rejects_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        LLMResponseCache(str(tmp_path), mode="off")
@@ -0,0 +1,119 @@
+import os
+from types import SimpleNamespace
+from utils.step_scheduler import step_dependencies, ready_steps, parallel_batch
+from utils.step_workspace import StepWorkspace
+
+
+def make_step(depends_on=None, files=(), step_type="code"):
+    return SimpleNamespace(depends_on=depends_on, files=list(files), step_type=step_type)
+
+
+def test_steps_without_metadata_run_in_order():
+    dependencies = step_dependencies([make_step(), make_step(), make_step()])
+
+    assert dependencies == {0: set(), 1: {0}, 2: {1}}
+    assert ready_steps(dependencies, done=set()) == [0]
+    assert ready_steps(dependencies, done={0}) == [1]
+
+
+def test_independent_steps_share_a_wave():
+    steps = [
+        make_step(depends_on=[]),
+        make_step(depends_on=[]),
+        make_step(depends_on=[1, 2]),
+        # Forward and self references are ignored
+        make_step(depends_on=[4, 5]),
+    ]
+    dependencies = step_dependencies(steps)
+
+    assert ready_steps(dependencies, done=set()) == [0, 1, 3]
+    assert ready_steps(dependencies, done={0}, running={1}) == [3]
+    assert ready_steps(dependencies, done={0, 1, 3}) == [2]
+
+
+def test_steps_touching_the_same_file_are_ordered():
+    steps = [
+        make_step(depends_on=[], files=["main.tf"]),
+        make_step(depends_on=[], files=["vars.tf"]),
+        make_step(depends_on=[], files=["main.tf", "outputs.tf"]),
+    ]
+
+    dependencies = step_dependencies(steps)
+
+    assert ready_steps(dependencies, done=set()) == [0, 1]
+    assert ready_steps(dependencies, done={0, 1}) == [2]
+
+
+def test_only_code_steps_with_disjoint_files_fan_out():
+    steps = [
+        make_step(depends_on=[], files=["main.tf"]),
+        make_step(depends_on=[], step_type="command"),
+        make_step(depends_on=[]),
+        make_step(depends_on=[], files=["./main.tf", "vars.tf"]),
+        make_step(depends_on=[], files=["outputs.tf"]),
+        make_step(depends_on=[], files=["modules/vpc.tf"]),
+    ]
+    ready = ready_steps(step_dependencies(steps), done=set())
+
+    # The command step, the step without files and the one sharing main.tf are left out
+    assert ready == [0, 1, 2, 4, 5]
+    assert parallel_batch(steps, ready, limit=4) == [0, 4, 5]
+    assert parallel_batch(steps, ready, limit=2) == [0, 4]
+    assert parallel_batch(steps, [1, 2], limit=4) == []
+
+
+def make_repo(path):
+    (path / "modules").mkdir(parents=True)
+    (path / "main.tf").write_text("main")
+    (path / "old.tf").write_text("old")
+    (path / "modules" / "vpc.tf").write_text("vpc")
+    (path / ".terraform").mkdir()
+    (path / ".terraform" / "plugin").write_text("cache")
+    (path / ".git").mkdir()
+    (path / ".git" / "HEAD").write_text("ref: refs/heads/main")
+    return path
+
+
+def test_workspace_merges_changes_back(tmp_path):
+    repo = make_repo(tmp_path / "repo")
+
+    workspace = StepWorkspace(str(repo))
+    try:
+        assert not (workspace.path / ".terraform").exists()
+        assert not (workspace.path / ".git").exists()
+
+        (workspace.path / "main.tf").write_text("main, edited in the step")
+        (workspace.path / "new.tf").write_text("new")
+        os.remove(workspace.path / "old.tf")
+
+        changes = workspace.merge_back()
+    finally:
+        workspace.cleanup()
+
+    assert changes == {"merged": ["main.tf", "new.tf"], "removed": ["old.tf"], "conflicts": []}
+    assert (repo / "main.tf").read_text() == "main, edited in the step"
+    assert (repo / "new.tf").read_text() == "new"
+    assert not (repo / "old.tf").exists()
+    assert not workspace.path.exists()
+
+
+def test_workspace_conflicts_merge_nothing(tmp_path):
+    repo = make_repo(tmp_path / "repo")
+
+    workspace = StepWorkspace(str(repo))
+    try:
+        (workspace.path / "main.tf").write_text("main, edited in the step")
+        os.remove(workspace.path / "old.tf")
+        (workspace.path / "modules" / "vpc.tf").write_text("vpc, edited in the step")
+        # Meanwhile the same file changed in the repo
+        (repo / "modules" / "vpc.tf").write_text("vpc, edited elsewhere")
+
+        changes = workspace.merge_back()
+    finally:
+        workspace.cleanup()
+
+    assert changes == {"merged": [], "removed": [], "conflicts": ["modules/vpc.tf"]}
+    assert (repo / "main.tf").read_text() == "main"
+    assert (repo / "old.tf").exists()
+    assert (repo / "modules" / "vpc.tf").read_text() == "vpc, edited elsewhere"
+
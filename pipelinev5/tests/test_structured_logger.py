@@ -0,0 +1,54 @@
+import os
+import json
+from utils.blob_store import BLOB_KEY, BlobStore
+from utils.structured_logger import StructuredLogger, read_records
+
+
+def test_records_are_written_as_json_lines(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    log = StructuredLogger(path)
+    log.log("execute_tool_start", step=1, details={"tool_type": "execute_command"})
+    log.log("status_update", timestamp="2024-01-01T00:00:00", tagline="Done")
+    assert log.flush(timeout=5)
+
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    assert [record["event"] for record in records] == ["execute_tool_start", "status_update"]
+    assert records[0]["details"] == {"tool_type": "execute_command"}
+    assert records[1]["timestamp"] == "2024-01-01T00:00:00"
+    log.close()
+
+
+def test_large_payloads_are_stored_once_as_blobs(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    output = "terraform plan output\n" * 1000
+    log = StructuredLogger(path, blob_threshold=100)
+    log.log("execute_tool_result", result={"status": "success", "output": output})
+    log.log("execute_tool_result", result={"status": "success", "output": output})
+    log.close()
+
+    records = list(read_records(path))
+    blob = records[0]["result"]["output"]
+    assert blob == records[1]["result"]["output"]
+    assert blob["bytes"] == len(output)
+    assert len(os.listdir(tmp_path / "blobs")) == 1
+    assert BlobStore(str(tmp_path / "blobs")).get(blob[BLOB_KEY]) == output
+    assert os.path.getsize(path) < 1000
+
+    resolved = list(read_records(path, resolve_blobs=True))
+    assert resolved[0]["result"]["output"] == output
+
+
+def test_logs_rotate_by_size(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    log = StructuredLogger(path, max_bytes=500, backups=2, batch_size=1)
+    for i in range(30):
+        log.log("tick", i=i, padding="x" * 50)
+    log.close()
+
+    assert os.path.exists(f"{path}.1") and os.path.exists(f"{path}.2")
+    assert not os.path.exists(f"{path}.3")
+    assert all(os.path.getsize(p) <= 500 for p in (path, f"{path}.1", f"{path}.2"))
+    # The oldest records were rotated out, the rest are in order
+    ticks = [record["i"] for record in read_records(path)]
+    assert ticks == list(range(ticks[0], 30))
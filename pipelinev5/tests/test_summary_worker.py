@@ -0,0 +1,50 @@
+import threading
+from utils.summary_worker import SummaryWorker
+
+
+def test_jobs_run_in_the_background():
+    release = threading.Event()
+    results = []
+
+    def slow_summary(text):
+        release.wait(5)
+        return text.upper()
+
+    worker = SummaryWorker(workers=1)
+    future = worker.submit(slow_summary, "done", on_done=results.append)
+
+    # submit returns before the job runs
+    assert not future.done()
+    release.set()
+    assert worker.flush(timeout=5)
+    assert future.result() == "DONE"
+    assert results == ["DONE"]
+
+
+def test_failed_jobs_use_the_fallback():
+    def failing():
+        raise RuntimeError("LLM unavailable")
+
+    results = []
+    worker = SummaryWorker(workers=1)
+    worker.submit(failing, fallback=lambda: ("Tagline", "Summary"), on_done=results.append)
+
+    assert worker.flush(timeout=5)
+    assert results == [("Tagline", "Summary")]
+
+
+def test_full_queue_falls_back_immediately():
+    release = threading.Event()
+    worker = SummaryWorker(workers=1, max_pending=1)
+
+    worker.submit(release.wait, 5)
+    # Wait until the worker has taken the first job off the queue
+    while not worker.jobs.empty():
+        pass
+    worker.submit(release.wait, 5)
+
+    overflow = worker.submit(release.wait, 5, fallback=lambda: "template")
+    assert overflow.done() and overflow.result() == "template"
+
+    release.set()
+    assert worker.flush(timeout=5)
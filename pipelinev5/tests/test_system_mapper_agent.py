@@ -125,6 +125,30 @@ def test_existing_memory_context(base_state, mock_repo, monkeypatch, mocker):
     # Verify
     assert not mock_memory_tools.store_memories.called
 
+def test_deleted_files_are_pruned_from_memory(base_state, monkeypatch, mocker):
+    """Files gone from the repo have their stored analyses removed."""
+    test_state = base_state.copy()
+    test_state["memory_context"] = mocker.Mock(past_analyses={"a.tf": {}, "b.tf": {}}, past_overview="overview")
+    monkeypatch.setenv("REPO_URLS", "https://github.com/test/repo.git")
+
+    mock_mapper = mocker.Mock(spec=SystemMapper)
+    mock_mapper.generate_system_map.return_value = {
+        "repository_overview": "overview",
+        "file_tree": {},
+        "file_analyses": {"a.tf": {}},
+        "updated_files": [],
+        "deleted_files": ["b.tf"],
+        "overview_changed": False
+    }
+    mocker.patch('agents.system_mapper_agents.SystemMapper', return_value=mock_mapper)
+    mock_memory_tools = mocker.Mock(spec=MemoryTools)
+    mocker.patch('agents.system_mapper_agents.MemoryTools', return_value=mock_memory_tools)
+
+    system_mapper_agent(test_state)
+
+    mock_memory_tools.delete_file_memories.assert_called_once_with("https://github.com/test/repo.git", ["b.tf"])
+    assert not mock_memory_tools.store_memories.called
+
 def test_file_analysis_content(base_state, mock_repo, monkeypatch, mocker):
     """Test content of file analyses."""
     # Setup
@@ -188,4 +212,33 @@ def test_excluded_patterns(base_state, mock_repo, monkeypatch):
     file_tree_str = str(result_state["file_tree"])
     assert "__pycache__" not in file_tree_str
     assert ".git" not in file_tree_str
-    assert ".env" not in file_tree_str
\ No newline at end of file
+    assert ".env" not in file_tree_str
+def test_incremental_reuses_analyses_of_the_same_content(tmp_path, mocker):
+    """A past analysis is reused only for the blob it was made from, not because a commit diff skipped the file."""
+    from agent_tools.system_mapper_tools import AnalysisStore, git_blob_sha
+
+    (tmp_path / "a.tf").write_text("a")
+    (tmp_path / "b.tf").write_text("b, edited in the working tree")
+    files = [str(tmp_path / "a.tf"), str(tmp_path / "b.tf")]
+
+    mapper = SystemMapper.__new__(SystemMapper)
+    mapper.analysis_store = AnalysisStore(tmp_path / "analysis_store")
+    new_analysis = {"main_purpose": "new b"}
+    mapper.analyze_files = mocker.Mock(return_value=({files[1]: new_analysis}, []))
+
+    past_analyses = {files[0]: {"main_purpose": "a"}, files[1]: {"main_purpose": "old b"}}
+    past_blob_shas = {files[0]: git_blob_sha(b"a"), files[1]: git_blob_sha(b"b")}
+    analyses, updated_files, blob_shas, errors = mapper._incremental_analyses(files, past_analyses, past_blob_shas)
+
+    mapper.analyze_files.assert_called_once_with([files[1]])
+    assert analyses == {files[0]: {"main_purpose": "a"}, files[1]: new_analysis}
+    assert updated_files == [files[1]]
+    assert mapper.analysis_store.get(blob_shas[files[1]]) == new_analysis
+
+    # Without stored blob SHAs nothing is trusted, but the analysis store still answers
+    mapper.analyze_files.reset_mock()
+    mapper.analyze_files.return_value = ({files[0]: {"main_purpose": "a"}}, [])
+    analyses, updated_files, _, _ = mapper._incremental_analyses(files, past_analyses)
+    mapper.analyze_files.assert_called_once_with([files[0]])
+    assert analyses[files[1]] == new_analysis
+    assert updated_files == files
@@ -0,0 +1,77 @@
+import os
+import gzip
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional
+
+BLOB_KEY = "$blob"
+
+
+class BlobStore:
+    """
+    Content-addressed store for large strings: each is written once to
+    `directory` as a gzip file named by its SHA1.
+
+    The directory is only created on the first write. With `max_age_days`, blobs
+    not written (or written again) for that long are removed at that point.
+    """
+
+    def __init__(self, directory: str, max_age_days: Optional[float] = None):
+        self.directory = directory
+        self.max_age_days = max_age_days
+        self.opened = False
+
+    def _open(self):
+        if self.opened:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        if self.max_age_days is not None:
+            self.prune(self.max_age_days * 24 * 3600)
+        self.opened = True
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.gz")
+
+    def put(self, text: str) -> str:
+        self._open()
+        data = text.encode("utf-8")
+        digest = hashlib.sha1(data).hexdigest()
+        blob_path = self.path(digest)
+        # Repeated payloads are stored once, and kept from being pruned
+        if os.path.exists(blob_path):
+            os.utime(blob_path)
+        else:
+            tmp_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, blob_path)
+        return digest
+
+    def get(self, digest: str) -> str:
+        with gzip.open(self.path(digest), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Remove blobs last written more than max_age_seconds ago; returns how many."""
+        cutoff = time.time() - max_age_seconds
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        removed = 0
+        for name in names:
+            if not name.endswith((".gz", ".tmp")):
+                continue
+            blob_path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(blob_path) < cutoff:
+                    os.remove(blob_path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def reference(self, text: str, preview_chars: int = 200) -> Dict[str, Any]:
+        """Store text and return {"$blob": sha1, "bytes": n, "preview": ...} to keep in its place."""
+        return {BLOB_KEY: self.put(text), "bytes": len(text.encode("utf-8")), "preview": text[:preview_chars]}
@@ -0,0 +1,94 @@
+import sqlite3
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import CheckpointTuple
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.constants import START
+from langgraph.types import Send
+
+# State fields holding live objects (processes, clients, open repos) that can't
+# be serialized; they are reattached from the running process on resume
+RUNTIME_FIELDS = ("forge", "subprocess_handler", "tools", "pinecone_index", "embeddings_model")
+
+
+class RunCheckpointer(SqliteSaver):
+    """
+    SQLite checkpointer for workflow runs, keyed by run id (the thread_id).
+
+    The fields in `runtime_fields` are left out of every checkpoint and pending
+    write, including the state carried by Send packets. When a checkpoint is
+    loaded they are filled in from `runtime`, so a resumed run continues with the
+    current process's Forge and subprocess handler (fields missing from `runtime`
+    come back as None and are rebuilt by the nodes that use them).
+
+    State models saved in checkpoints (plan steps, validation results) are
+    listed in `state_types` so they load without unregistered-type warnings.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, runtime: Optional[Dict[str, Any]] = None,
+                 runtime_fields: Iterable[str] = RUNTIME_FIELDS, state_types: Iterable[type] = ()):
+        try:
+            serde = JsonPlusSerializer(
+                allowed_msgpack_modules=[(cls.__module__, cls.__name__) for cls in state_types] or True
+            )
+        except TypeError:
+            # Older langgraph-checkpoint releases load any type and take no allowlist
+            serde = None
+        super().__init__(conn, serde=serde)
+        self.runtime = dict(runtime or {})
+        self.runtime_fields = set(runtime_fields)
+
+    @classmethod
+    def open(cls, path: str, **kwargs) -> "RunCheckpointer":
+        # Parallel steps save checkpoints from worker threads; SqliteSaver serializes access
+        return cls(sqlite3.connect(path, check_same_thread=False), **kwargs)
+
+    def put(self, config: RunnableConfig, checkpoint, metadata, new_versions) -> RunnableConfig:
+        channel_values = {
+            channel: self._map_value(channel, value, self._strip)
+            for channel, value in checkpoint["channel_values"].items()
+            if channel not in self.runtime_fields
+        }
+        return super().put(config, {**checkpoint, "channel_values": channel_values}, metadata, new_versions)
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        writes = [
+            (channel, self._map_value(channel, value, self._strip))
+            for channel, value in writes
+            if channel not in self.runtime_fields
+        ]
+        super().put_writes(config, writes, task_id, task_path)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        saved = super().get_tuple(config)
+        if saved is None:
+            return None
+        channel_values = {
+            channel: self._map_value(channel, value, self._reattach)
+            for channel, value in saved.checkpoint["channel_values"].items()
+        }
+        checkpoint = {**saved.checkpoint, "channel_values": self._reattach(channel_values)}
+        pending_writes = [
+            (task_id, channel, self._map_value(channel, value, self._reattach))
+            for task_id, channel, value in saved.pending_writes or []
+        ]
+        return saved._replace(checkpoint=checkpoint, pending_writes=pending_writes)
+
+    def _strip(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in state.items() if key not in self.runtime_fields}
+
+    def _reattach(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {**state, **{field: self.runtime.get(field) for field in self.runtime_fields}}
+
+    @classmethod
+    def _map_value(cls, channel: str, value: Any, func) -> Any:
+        """Apply func to the values that are whole graph states: the run's input and fan-out packets."""
+        if channel == START and isinstance(value, dict):
+            return func(value)
+        if isinstance(value, Send) and isinstance(value.arg, dict):
+            return Send(value.node, func(value.arg))
+        if isinstance(value, list) and any(isinstance(item, Send) for item in value):
+            return [cls._map_value(channel, item, func) for item in value]
+        return value
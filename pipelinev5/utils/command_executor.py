@@ -0,0 +1,249 @@
+import os
+import sys
+import signal
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from termcolor import colored
+
+# How long a partial line (eg an "Enter a value:" prompt) waits for its newline
+# before it's passed on as is
+PARTIAL_LINE_DELAY = 0.2
+READ_CHUNK_SIZE = 4096
+READER_DRAIN_TIMEOUT = 2.0
+
+LineCallback = Callable[[str, str], None]
+
+
+class OutputBuffer:
+    """Keep the last max_lines lines of output, counting how many were dropped."""
+
+    def __init__(self, max_lines: int = 2000):
+        self.lines = deque(maxlen=max_lines)
+        self.dropped = 0
+
+    def append(self, line: str):
+        if len(self.lines) == self.lines.maxlen:
+            self.dropped += 1
+        self.lines.append(line)
+
+    def text(self) -> str:
+        text = "\n".join(self.lines)
+        if self.dropped:
+            text = f"... [{self.dropped} earlier lines dropped] ...\n" + text
+        return text
+
+
+@dataclass
+class CommandResult:
+    command: str
+    returncode: Optional[int]
+    output: str
+    timed_out: bool = False
+    # Set along with timed_out when max_runtime, not the inactivity timeout, ran out
+    exceeded_max_runtime: bool = False
+    cancelled: bool = False
+    dropped_lines: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out and not self.cancelled
+
+
+def print_line(stream: str, line: str):
+    """Default line callback: echo stdout as is and stderr in red."""
+    print(colored(line, 'red') if stream == "stderr" else line, flush=True)
+
+
+class AsyncCommandExecutor:
+    """
+    Run shell commands as asyncio subprocesses.
+
+    Output is streamed line by line to a callback as it arrives and kept in a
+    bounded buffer, so a chatty `terraform apply` can't grow memory without limit.
+    `timeout` is an inactivity timeout: the command is killed (with its whole
+    process group) after that many seconds with no output or input.
+    `max_runtime` is a wall-clock ceiling on top of it, so a command that never
+    stops printing is still killed eventually. With
+    `interactive`, lines typed on the terminal are forwarded to the command's
+    stdin, and typing `exit` stops it.
+    """
+
+    def __init__(self, max_output_lines: int = 2000, max_concurrency: int = 4):
+        self.max_output_lines = max_output_lines
+        self.max_concurrency = max_concurrency
+
+    async def run(
+        self,
+        command: str,
+        cwd: Optional[str] = None,
+        timeout: Optional[float] = None,
+        on_line: Optional[LineCallback] = print_line,
+        interactive: bool = False,
+        max_runtime: Optional[float] = None,
+        env: Optional[dict] = None,
+    ) -> CommandResult:
+        process = await asyncio.create_subprocess_shell(
+            command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            stdin=asyncio.subprocess.PIPE if interactive else asyncio.subprocess.DEVNULL,
+            cwd=cwd,
+            env=env,
+            start_new_session=True,
+        )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_runtime if max_runtime else None
+        buffer = OutputBuffer(self.max_output_lines)
+        last_activity = [loop.time()]
+        stopped_by_user = asyncio.Event()
+
+        def emit(stream, line):
+            last_activity[0] = loop.time()
+            buffer.append(line)
+            # Typed input is already echoed by the terminal
+            if on_line and stream != "stdin":
+                on_line(stream, line)
+
+        readers = [
+            asyncio.ensure_future(self._read_lines(process.stdout, "stdout", emit)),
+            asyncio.ensure_future(self._read_lines(process.stderr, "stderr", emit)),
+        ]
+        stdin_fd = self._bridge_stdin(loop, process, emit, stopped_by_user) if interactive else None
+
+        timed_out = exceeded_max_runtime = cancelled = False
+        try:
+            while True:
+                wake_at = [t for t in (timeout and last_activity[0] + timeout, deadline) if t]
+                wait_for = max(0.0, min(wake_at) - loop.time()) if wake_at else None
+                waiters = [asyncio.ensure_future(process.wait()), asyncio.ensure_future(stopped_by_user.wait())]
+                done, pending = await asyncio.wait(waiters, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in pending:
+                    waiter.cancel()
+
+                if process.returncode is not None:
+                    break
+                if stopped_by_user.is_set():
+                    cancelled = True
+                    self._kill(process)
+                    break
+                if deadline and loop.time() >= deadline:
+                    timed_out = exceeded_max_runtime = True
+                    self._kill(process)
+                    break
+                if timeout and loop.time() - last_activity[0] >= timeout:
+                    timed_out = True
+                    self._kill(process)
+                    break
+        except asyncio.CancelledError:
+            self._kill(process)
+            raise
+        finally:
+            if stdin_fd is not None:
+                loop.remove_reader(stdin_fd)
+            if process.returncode is None:
+                await process.wait()
+            # Background children can hold the pipes open after the shell exits
+            _, unfinished = await asyncio.wait(readers, timeout=READER_DRAIN_TIMEOUT)
+            for reader in unfinished:
+                reader.cancel()
+
+        return CommandResult(
+            command=command,
+            returncode=process.returncode,
+            output=buffer.text(),
+            timed_out=timed_out,
+            exceeded_max_runtime=exceeded_max_runtime,
+            cancelled=cancelled,
+            dropped_lines=buffer.dropped,
+        )
+
+    async def run_many(
+        self,
+        commands: List[str],
+        cwd: Optional[str] = None,
+        timeout: Optional[float] = None,
+        on_line: Optional[LineCallback] = print_line,
+        max_runtime: Optional[float] = None,
+    ) -> List[CommandResult]:
+        """Run independent commands concurrently, at most max_concurrency at a time."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_one(index, command):
+            def prefixed(stream, line):
+                if on_line:
+                    on_line(stream, f"[{index + 1}] {line}")
+
+            async with semaphore:
+                return await self.run(
+                    command, cwd=cwd, timeout=timeout, on_line=prefixed, max_runtime=max_runtime
+                )
+
+        return await asyncio.gather(*(run_one(i, command) for i, command in enumerate(commands)))
+
+    async def _read_lines(self, stream, name: str, emit: Callable[[str, str], None]):
+        pending = ""
+        while True:
+            try:
+                chunk = await asyncio.wait_for(stream.read(READ_CHUNK_SIZE), PARTIAL_LINE_DELAY if pending else None)
+            except asyncio.TimeoutError:
+                emit(name, pending)
+                pending = ""
+                continue
+            if not chunk:
+                break
+            pending += chunk.decode("utf-8", errors="replace")
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                emit(name, line.rstrip("\r"))
+        if pending:
+            emit(name, pending)
+
+    def _bridge_stdin(self, loop, process, emit, stopped_by_user):
+        """Forward terminal input lines to the process; returns the fd being watched."""
+        try:
+            fd = sys.stdin.fileno()
+        except (AttributeError, ValueError, OSError):
+            return None
+
+        def forward():
+            line = sys.stdin.readline()
+            if not line:
+                # stdin closed: stop forwarding but let the command run on
+                loop.remove_reader(fd)
+                return
+            if line.strip().lower() == "exit":
+                stopped_by_user.set()
+                return
+            emit("stdin", line.rstrip("\n"))
+            if process.stdin and not process.stdin.is_closing():
+                process.stdin.write(line.encode("utf-8"))
+
+        try:
+            loop.add_reader(fd, forward)
+        except (NotImplementedError, ValueError, OSError):
+            return None
+        return fd
+
+    @staticmethod
+    def _kill(process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, AttributeError):
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+
+
+def run_coroutine(coroutine):
+    """Run a coroutine to completion from sync code, even if a loop is already running here."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coroutine).result()
@@ -1,6 +1,7 @@
 import logging
 import yaml
 import os
+from pathlib import Path
 from typing import Optional
 from typing import Any, Dict, List
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
@@ -13,6 +14,16 @@ def load_config(file_path):
             os.environ[key] = value
 
 
+# pipelinev5 itself: relative cache and state paths are resolved against it, so
+# they end up in the same place whatever directory the pipeline is started from
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+def base_path(path) -> Path:
+    """path, resolved against BASE_DIR when it's relative."""
+    path = Path(path).expanduser()
+    return path if path.is_absolute() else BASE_DIR / path
+
+
 # for checking if an attribute of the state dict has content.
 def check_for_content(var):
     if var:
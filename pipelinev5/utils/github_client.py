@@ -0,0 +1,168 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from diskcache import Cache
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitError(requests.exceptions.RequestException):
+    """Raised when GitHub's rate limit resets later than the client is willing to wait."""
+
+
+class GitHubClient:
+    """
+    Pooled, caching client for the GitHub REST API.
+
+    All requests go through one requests.Session with `max_workers` pooled
+    connections. GET responses are stored with their ETag in a disk cache at
+    `cache_dir`; later requests for the same URL send If-None-Match and a 304
+    (which GitHub doesn't count against the rate limit) is answered from the
+    cache. List endpoints follow the Link header's rel="next" for up to
+    `max_pages` pages of `per_page` items.
+
+    When the rate limit is exhausted (X-RateLimit-Remaining: 0, or a 403/429
+    with Retry-After) requests wait for the reset, up to `max_rate_limit_wait`
+    seconds, and otherwise raise RateLimitError.
+    """
+
+    def __init__(self, token: Optional[str] = None, base_url: str = "https://api.github.com",
+                 cache_dir: Optional[str] = None, max_pages: int = 5, per_page: int = 100,
+                 max_workers: int = 6, timeout: float = 30, max_rate_limit_wait: float = 60):
+        self.base_url = base_url.rstrip("/")
+        self.max_pages = max_pages
+        self.per_page = per_page
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.cache = Cache(cache_dir) if cache_dir else None
+        self.rate_limit_reset: Optional[float] = None
+        self.lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28"
+        })
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def get(self, path: str, params: Optional[Dict] = None, max_pages: Optional[int] = None) -> Any:
+        """GET path, following pagination: list pages are concatenated, list fields of object pages extended."""
+        params = dict(params or {})
+        params.setdefault("per_page", self.per_page)
+        url = f"{self.base_url}/{path.lstrip('/')}"
+
+        data = None
+        for _ in range(max_pages or self.max_pages):
+            page, next_url = self._get_page(url, params)
+            data = page if data is None else _merge_pages(data, page)
+            if not next_url:
+                break
+            # The next link already carries the query string
+            url, params = next_url, None
+        return data
+
+    def request(self, method: str, path: str, **kwargs) -> Any:
+        """Uncached request for anything but paginated GETs."""
+        response = self._send(method, f"{self.base_url}/{path.lstrip('/')}", **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+    def fetch_many(self, calls: Dict[str, Tuple[Callable, tuple]]) -> Dict[str, Any]:
+        """
+        Run {name: (func, args)} concurrently on the client's pool and return
+        {name: result}; a call that raises has the exception as its result.
+        """
+        def run(func, args):
+            try:
+                return func(*args)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {name: executor.submit(run, func, args) for name, (func, args) in calls.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    def _get_page(self, url: str, params: Optional[Dict]) -> Tuple[Any, Optional[str]]:
+        key = requests.Request("GET", url, params=params).prepare().url
+        cached = self.cache.get(key) if self.cache is not None else None
+
+        headers = {"If-None-Match": cached["etag"]} if cached else {}
+        response = self._send("GET", url, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached["data"], cached["next"]
+
+        response.raise_for_status()
+        data = response.json()
+        next_url = response.links.get("next", {}).get("url")
+        if self.cache is not None and response.headers.get("ETag"):
+            self.cache.set(key, {"etag": response.headers["ETag"], "data": data, "next": next_url})
+        return data, next_url
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        for _ in range(3):
+            self._wait_for_reset()
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            wait = self._rate_limit_wait(response)
+            if wait is None:
+                return response
+            if wait > self.max_rate_limit_wait:
+                raise RateLimitError(f"GitHub rate limit exceeded, resets in {wait:.0f}s", response=response)
+            logger.warning(f"GitHub rate limit reached, waiting {wait:.0f}s")
+            time.sleep(wait)
+        return response
+
+    def _rate_limit_wait(self, response: requests.Response) -> Optional[float]:
+        """Seconds to wait before retrying response, or None if it wasn't rate limited."""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining == "0" and reset:
+            # Later requests hold off until the reset instead of failing
+            with self.lock:
+                self.rate_limit_reset = float(reset)
+
+        if response.status_code not in (403, 429):
+            return None
+        if response.headers.get("Retry-After"):
+            return float(response.headers["Retry-After"])
+        if remaining == "0" and reset:
+            return max(0.0, float(reset) - time.time())
+        return None
+
+    def _wait_for_reset(self):
+        with self.lock:
+            reset = self.rate_limit_reset
+            if reset is not None and reset <= time.time():
+                self.rate_limit_reset = reset = None
+        if reset is None:
+            return
+        wait = reset - time.time()
+        if wait > self.max_rate_limit_wait:
+            raise RateLimitError(f"GitHub rate limit exceeded, resets in {wait:.0f}s")
+        if wait > 0:
+            time.sleep(wait)
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def _merge_pages(data: Any, page: Any) -> Any:
+    if isinstance(data, list) and isinstance(page, list):
+        return data + page
+    if isinstance(data, dict) and isinstance(page, dict):
+        merged = dict(data)
+        for key, value in page.items():
+            if isinstance(value, list) and isinstance(merged.get(key), list):
+                merged[key] = merged[key] + value
+        return merged
+    return page
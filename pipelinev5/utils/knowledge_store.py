@@ -0,0 +1,105 @@
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from utils.blob_store import BlobStore
+
+SUMMARY_ACTION = "earlier_actions"
+MAX_SUMMARY_REFS = 50
+
+
+class KnowledgeStore:
+    """
+    Keeps knowledge_sequence small enough to copy on every graph step.
+
+    Entries keep the shape the prompt formatters expect, but a long `action`
+    or result `output`/`error` is moved to the blob store: the entry keeps a
+    `preview_chars` preview of its head and tail (where terraform puts the
+    actual error) plus `<field>_ref` (the blob's SHA1) and `<field>_bytes`, and
+    `full_text` reads it back. Once the sequence passes
+    `max_entries`, everything but the latest `keep_recent` entries is folded into
+    one summary entry at the front.
+    """
+
+    def __init__(self, blobs: BlobStore, preview_chars: int = 500, max_entries: int = 20,
+                 keep_recent: int = 10):
+        self.blobs = blobs
+        self.preview_chars = preview_chars
+        self.max_entries = max_entries
+        self.keep_recent = max(1, min(keep_recent, max_entries - 1))
+
+    def append(self, knowledge_sequence: List[Dict], entry: Dict) -> List[Dict]:
+        """Return a new sequence with entry compacted and added, within the budget."""
+        sequence = list(knowledge_sequence) + [self.compact(entry)]
+        if len(sequence) > self.max_entries:
+            sequence = self.fold(sequence)
+        return sequence
+
+    def compact(self, entry: Dict) -> Dict:
+        compacted = dict(self._externalize(entry, "action"))
+        result = compacted.get("result")
+        if isinstance(result, dict):
+            result = self._externalize(result, "output")
+            compacted["result"] = self._externalize(result, "error")
+        return compacted
+
+    def full_text(self, record: Dict, field: str) -> Optional[str]:
+        """The full value of a field of an entry (or of its result), reading it back if it was moved out."""
+        if record.get(f"{field}_ref"):
+            return self.blobs.get(record[f"{field}_ref"])
+        return record.get(field)
+
+    def fold(self, sequence: List[Dict]) -> List[Dict]:
+        """Replace all but the latest keep_recent entries with one summary entry."""
+        return [summarize_entries(sequence[:-self.keep_recent])] + sequence[-self.keep_recent:]
+
+    def _externalize(self, record: Dict, field: str) -> Dict:
+        value = record.get(field)
+        if not isinstance(value, str) or len(value) <= self.preview_chars:
+            return record
+        return {
+            **record,
+            field: clip(value, self.preview_chars),
+            f"{field}_ref": self.blobs.put(value),
+            f"{field}_bytes": len(value.encode("utf-8"))
+        }
+
+
+def clip(text: str, chars: int) -> str:
+    """Cut text to about chars characters, keeping its head and its tail."""
+    if len(text) <= chars:
+        return text
+    head = chars // 2
+    return text[:head] + f"\n... [{len(text) - chars} chars omitted] ...\n" + text[-(chars - head):]
+
+
+def summarize_entries(entries: List[Dict]) -> Dict[str, Any]:
+    """Fold entries (which may start with an earlier summary) into one summary entry."""
+    counts, errors, refs, folded = Counter(), [], [], 0
+    for entry in entries:
+        if entry.get("action_type") == SUMMARY_ACTION:
+            counts.update(entry["action_counts"])
+            errors.extend(entry["recent_errors"])
+            refs.extend(entry["output_refs"])
+            folded += entry["folded_actions"]
+            continue
+        result = entry.get("result") or {}
+        counts[f"{entry.get('action_type', 'unknown')}:{result.get('status', 'unknown')}"] += 1
+        if result.get("error"):
+            errors.append(clip(str(result["error"]), 200))
+        if result.get("output_ref"):
+            refs.append(result["output_ref"])
+        folded += 1
+
+    errors, refs = errors[-3:], refs[-MAX_SUMMARY_REFS:]
+    action = f"{folded} earlier action(s): " + ", ".join(f"{key} x{n}" for key, n in counts.items())
+    output = action
+    if errors:
+        output += "\nRecent errors:\n" + "\n".join(f"- {error}" for error in errors)
+    return {
+        "action_type": SUMMARY_ACTION,
+        "action": action,
+        "result": {"status": "summarized", "output": output, "error": None},
+        "folded_actions": folded,
+        "action_counts": dict(counts),
+        "recent_errors": errors,
+        "output_refs": refs
+    }
@@ -1,17 +1,40 @@
 import os
-import json
-import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from utils.structured_logger import StructuredLogger
 
 # Module-level global variables for log file paths
 EXECUTION_LOG_FILE = None
 STATUS_LOG_FILE = None
+_execution_logger: Optional[StructuredLogger] = None
+_status_logger: Optional[StructuredLogger] = None
+
+# JSON-lines logs roll over past DEVOPS_LOG_MAX_MB; strings over DEVOPS_LOG_BLOB_BYTES
+# are written once to logs/devops_agent/blobs and referenced by hash
+LOG_MAX_BYTES = int(os.getenv("DEVOPS_LOG_MAX_MB", "50")) * 1024 * 1024
+LOG_BACKUPS = int(os.getenv("DEVOPS_LOG_BACKUPS", "5"))
+LOG_BLOB_BYTES = int(os.getenv("DEVOPS_LOG_BLOB_BYTES", "4096"))
+
+def _open_logger(path: str, blob_dir: str) -> StructuredLogger:
+    return StructuredLogger(
+        path,
+        blob_dir=blob_dir,
+        max_bytes=LOG_MAX_BYTES,
+        backups=LOG_BACKUPS,
+        blob_threshold=LOG_BLOB_BYTES
+    )
+
+def _describe_step(step) -> Dict[str, Any]:
+    return {
+        "description": step.description,
+        "type": step.step_type,
+        "files": list(step.files)
+    }
 
 def initialize_logging(state: Dict[str, Any]) -> str:
     """Initialize logging for a new execution, creating both a full log and a separate status log."""
-    global EXECUTION_LOG_FILE, STATUS_LOG_FILE
+    global EXECUTION_LOG_FILE, STATUS_LOG_FILE, _execution_logger, _status_logger
     
     # Get the directory where test_repos is located
     test_repos_parent = Path(state["current_directory"]).parent / "test_repos"
@@ -27,89 +50,59 @@ def initialize_logging(state: Dict[str, Any]) -> str:
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     
     # Create more descriptive filenames
-    EXECUTION_LOG_FILE = os.path.join(log_dir, f"devops_execution_{timestamp}_full.log")
-    STATUS_LOG_FILE = os.path.join(log_dir, f"devops_status_{timestamp}.log")
-    
-    # Write initial execution header for the full log
-    with open(EXECUTION_LOG_FILE, 'w', encoding='utf-8') as f:
-        f.write(f"=== DevOps Agent Execution Log ===\n")
-        f.write(f"Started at: {datetime.now().isoformat()}\n")
-        f.write(f"Working Directory: {state['current_directory']}\n")
-        f.write(f"Total Steps: {len(state['plan_steps'])}\n\n")
-        
-        # Log initial plan
-        f.write("=== Execution Plan ===\n")
-        for i, step in enumerate(state['plan_steps'], 1):
-            f.write(f"\nStep {i}:\n")
-            f.write(f"Description: {step.description}\n")
-            f.write(f"Type: {step.step_type}\n")
-            f.write(f"Files: {', '.join(step.files)}\n")
-        f.write("\n" + "="*80 + "\n\n")
+    EXECUTION_LOG_FILE = os.path.join(log_dir, f"devops_execution_{timestamp}_full.jsonl")
+    STATUS_LOG_FILE = os.path.join(log_dir, f"devops_status_{timestamp}.jsonl")
+
+    for open_logger in (_execution_logger, _status_logger):
+        if open_logger:
+            open_logger.close()
+    blob_dir = os.path.join(log_dir, "blobs")
+    _execution_logger = _open_logger(EXECUTION_LOG_FILE, blob_dir)
+    _status_logger = _open_logger(STATUS_LOG_FILE, blob_dir)
 
-    # Write initial header for the status log
-    with open(STATUS_LOG_FILE, 'w', encoding='utf-8') as f:
-        f.write("=== DevOps Agent Status Log ===\n")
-        f.write(f"Started at: {datetime.now().isoformat()}\n\n")
+    # Initial record with the execution plan
+    _execution_logger.log(
+        "execution_started",
+        working_directory=state["current_directory"],
+        total_steps=len(state["plan_steps"]),
+        plan=[_describe_step(step) for step in state["plan_steps"]]
+    )
+    _status_logger.log("status_log_started")
     
     return EXECUTION_LOG_FILE
 
 def log_interaction(state: Dict[str, Any], node_name: str, details: Dict):
-    """Write logs to the global EXECUTION_LOG_FILE with better formatting."""
-    global EXECUTION_LOG_FILE
-    
-    # Initialize logging if not already done
-    if EXECUTION_LOG_FILE is None:
+    """Queue a JSON-lines record of node_name's details on the execution log."""
+    if _execution_logger is None:
         initialize_logging(state)
     
-    with open(EXECUTION_LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(f"\n{'='*80}\n")
-        f.write(f"Timestamp: {datetime.now().isoformat()}\n")
-        f.write(f"Node: {node_name}\n")
-        f.write(f"Step: {state['current_step_index'] + 1}/{len(state['plan_steps'])}\n")
-        f.write(f"Attempt: {state['current_step_attempts']}\n")
-        f.write(f"Total Attempts: {state['total_attempts']}\n\n")
-        
-        # Log step details
-        if state['current_step_index'] < len(state['plan_steps']):
-            current_step = state['plan_steps'][state['current_step_index']]
-            f.write("Current Step Details:\n")
-            f.write(f"Description: {current_step.description}\n")
-            f.write(f"Type: {current_step.step_type}\n")
-            f.write(f"Files: {', '.join(current_step.files)}\n\n")
-        
-        f.write("Action Details:\n")
-        for key, value in details.items():
-            f.write(f"{key}:\n")
-            if isinstance(value, dict):
-                f.write(json.dumps(value, indent=2) + "\n")
-            elif isinstance(value, list):
-                for item in value:
-                    f.write(f"- {item}\n")
-            else:
-                f.write(f"{str(value)}\n")
-            f.write("\n")
-        
-        # If we have knowledge_sequence, log a summary
-        if state.get('knowledge_sequence'):
-            f.write("\nKnowledge Sequence Summary:\n")
-            f.write(f"Total Actions: {len(state['knowledge_sequence'])}\n")
-            if state['knowledge_sequence']:
-                last_action = state['knowledge_sequence'][-1]
-                f.write("Last Action:\n")
-                f.write(f"Type: {last_action.get('action_type', 'unknown')}\n")
-                f.write(f"Status: {last_action.get('result', {}).get('status', 'unknown')}\n")
-                if last_action.get('result', {}).get('error'):
-                    f.write(f"Error: {last_action['result']['error']}\n")
-        
-        f.write("\n")
+    record = {
+        "step": state["current_step_index"] + 1,
+        "total_steps": len(state["plan_steps"]),
+        "attempt": state["current_step_attempts"],
+        "total_attempts": state["total_attempts"],
+        "details": details
+    }
+    if state["current_step_index"] < len(state["plan_steps"]):
+        record["current_step"] = _describe_step(state["plan_steps"][state["current_step_index"]])
+    
+    # If we have knowledge_sequence, log a summary
+    if state.get("knowledge_sequence"):
+        last_action = state["knowledge_sequence"][-1]
+        record["knowledge"] = {
+            "total_actions": len(state["knowledge_sequence"]),
+            "last_action_type": last_action.get("action_type", "unknown"),
+            "last_action_status": last_action.get("result", {}).get("status", "unknown"),
+            "last_action_error": last_action.get("result", {}).get("error")
+        }
+    
+    _execution_logger.log(node_name, **record)
 
-def log_status_update(tagline: str, summary: str):
-    """Log a short 'Tagline' and 'Summary' to STATUS_LOG_FILE for quick status tracking."""
-    global STATUS_LOG_FILE
-    if not STATUS_LOG_FILE:
+def log_status_update(tagline: str, summary: str, timestamp: Optional[str] = None):
+    """
+    Log a short 'Tagline' and 'Summary' to STATUS_LOG_FILE for quick status tracking.
+    `timestamp` is when the update happened, for updates written after the fact.
+    """
+    if _status_logger is None:
         return
-    
-    with open(STATUS_LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(f"Timestamp: {datetime.now().isoformat()}\n")
-        f.write(f"Tagline: {tagline}\n")
-        f.write(f"Summary: {summary}\n\n")
+    _status_logger.log("status_update", timestamp=timestamp, tagline=tagline, summary=summary)
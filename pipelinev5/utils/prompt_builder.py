@@ -0,0 +1,126 @@
+import os
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional
+from utils.relevance import count_tokens
+
+TRUNCATION_MARKER = "\n... [{omitted} tokens omitted to fit the prompt budget] ...\n"
+
+
+class PromptBuilder:
+    """
+    Fill a prompt template section by section, keeping each under a token budget.
+
+    Token counts are cached by content hash, and each section remembers the last
+    text it was given, so sections that didn't change between iterations (the
+    overview, the file tree) are reused as-is without re-counting or re-trimming.
+    Sections over budget are cut down to their head, their tail or both, per
+    `keep`.
+    """
+
+    def __init__(self, budgets: Dict[str, int], keep: Optional[Dict[str, str]] = None, max_cached_counts: int = 1024):
+        self.budgets = budgets
+        self.keep = keep or {}
+        self.max_cached_counts = max_cached_counts
+        self.token_counts = OrderedDict()
+        self.sections = {}
+        self.current_stats = {}
+        self.last_stats = {}
+
+    def count(self, text: str) -> int:
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        if key in self.token_counts:
+            self.token_counts.move_to_end(key)
+            return self.token_counts[key]
+
+        tokens = count_tokens(text)
+        self.token_counts[key] = tokens
+        while len(self.token_counts) > self.max_cached_counts:
+            self.token_counts.popitem(last=False)
+        return tokens
+
+    def truncate(self, text: str, budget: int, keep: str = 'head') -> str:
+        """Cut text to about budget tokens, keeping its head, tail or both ends."""
+        tokens = self.count(text)
+        if tokens <= budget:
+            return text
+
+        # Work in characters, scaled by this text's own chars-per-token ratio
+        chars = max(1, int(len(text) * budget / tokens))
+        marker = TRUNCATION_MARKER.format(omitted=tokens - budget)
+        if keep == 'tail':
+            return marker.lstrip('\n') + text[-chars:]
+        if keep == 'both':
+            return text[:chars // 2] + marker + text[-(chars - chars // 2):]
+        return text[:chars] + marker.rstrip('\n')
+
+    def fit(self, name: str, text: str, budget: Optional[int] = None, keep: Optional[str] = None) -> str:
+        """
+        Return text fitted to the section's budget (or `budget`, if given), reusing
+        the last result for this section if the text hasn't changed.
+        """
+        keep = keep or self.keep.get(name, 'head')
+        budget = budget if budget is not None else self.budgets.get(name)
+        key = hashlib.sha1(f"{budget}:{keep}:{text}".encode('utf-8')).hexdigest()
+        cached = self.sections.get(name)
+        if cached and cached[0] == key:
+            self.current_stats[name] = dict(tokens=cached[2], reused=True, truncated=cached[3])
+            return cached[1]
+
+        fitted = text
+        if budget is not None:
+            fitted = self.truncate(text, budget, keep)
+        tokens = self.count(fitted)
+        truncated = fitted is not text
+
+        self.sections[name] = (key, fitted, tokens, truncated)
+        self.current_stats[name] = dict(tokens=tokens, reused=False, truncated=truncated)
+        return fitted
+
+    def build(self, template: str, sections: Dict[str, str]) -> str:
+        """
+        Format template with the fitted sections. Stats cover these sections and
+        any fitted separately since the last build (eg parts of a composite section).
+        """
+        fitted = {name: self.fit(name, str(text)) for name, text in sections.items()}
+        prompt = template.format(**fitted)
+        self.current_stats['total'] = dict(tokens=self.count(prompt))
+        self.last_stats, self.current_stats = self.current_stats, {}
+        return prompt
+
+    def describe(self) -> str:
+        """One line summary of the last build, for logs."""
+        parts = []
+        for name, stats in self.last_stats.items():
+            if name == 'total':
+                continue
+            flags = ''.join([
+                ' truncated' if stats['truncated'] else '',
+                ' reused' if stats['reused'] else ''
+            ])
+            parts.append(f"{name} {stats['tokens']}{flags}")
+        total = self.last_stats.get('total', {}).get('tokens', 0)
+        return f"Prompt size: {total} tokens ({', '.join(parts)})"
+
+
+def format_file_tree(tree, indent: str = "") -> str:
+    """
+    Render a system mapper file tree ({abs_path: "file" | {...}}) as an indented
+    list of names, which is far smaller than the dict of absolute paths.
+    """
+    if isinstance(tree, str):
+        return tree
+    if not tree:
+        return "No file tree available"
+
+    lines = []
+    for path in sorted(tree):
+        value = tree[path]
+        name = os.path.basename(path.rstrip('/')) or path
+        if isinstance(value, dict):
+            lines.append(f"{indent}{name}/")
+            if value:
+                lines.append(format_file_tree(value, indent=indent + "  "))
+        else:
+            lines.append(f"{indent}{name}")
+    return "\n".join(lines)
@@ -0,0 +1,128 @@
+import re
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting how many requests start per second.
+
+    `pause()` holds every caller back until a given time, so one rate limit
+    response (and its retry-after) slows down all workers rather than each one
+    discovering the limit separately.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[int] = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self.lock:
+                now = self.clock()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all callers for `seconds`, e.g. after a 429 with retry-after."""
+        with self.lock:
+            now = self.clock()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0.0
+            self.updated = now
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an exception from an LLM client is an HTTP 429."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return "429" in str(error) or "rate limit" in str(error).lower()
+
+
+def get_retry_after(error: Exception, default: float = 2.0) -> float:
+    """
+    Read how long to back off from a rate limit error.
+
+    Uses the response's retry-after header when the client exposes it, then
+    falls back to a "retry-after: N" or "try again in Ns" hint in the message.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        for header in ("retry-after-ms", "retry-after"):
+            value = headers.get(header)
+            if value is None:
+                continue
+            try:
+                seconds = float(value)
+            except ValueError:
+                continue
+            return seconds / 1000 if header == "retry-after-ms" else seconds
+
+    message = str(error).lower()
+    match = re.search(r"retry-after:\s*([\d.]+)", message) or re.search(
+        r"try again in\s*([\d.]+)\s*(ms|s)", message
+    )
+    if match:
+        seconds = float(match.group(1))
+        if match.lastindex == 2 and match.group(2) == "ms":
+            seconds /= 1000
+        return seconds
+
+    return default
+
+
+def call_with_retries(
+    func: Callable[[], T],
+    limiter: Optional[TokenBucket] = None,
+    max_retries: int = 3,
+    backoff: float = 1.0,
+    sleep=time.sleep,
+) -> T:
+    """
+    Call `func` under `limiter`, retrying rate limits and transient errors.
+
+    Rate limit errors pause the shared limiter for the server's retry-after;
+    other errors back off exponentially. The last error is re-raised once
+    `max_retries` retries are used up.
+    """
+    attempt = 0
+    while True:
+        if limiter:
+            limiter.acquire()
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= max_retries:
+                raise
+            attempt += 1
+
+            if is_rate_limit_error(e):
+                retry_after = get_retry_after(e)
+                if limiter:
+                    limiter.pause(retry_after)
+                else:
+                    sleep(retry_after)
+            else:
+                sleep(backoff * 2 ** (attempt - 1))
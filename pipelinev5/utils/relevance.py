@@ -0,0 +1,187 @@
+import json
+import math
+import re
+import hashlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+STOPWORDS = set("""
+a an and are as at be by can for from how i in into is it me my of on or please that the
+this to up use using we with
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        word for word in re.split(r"[^a-z0-9]+", text.lower())
+        if len(word) > 1 and word not in STOPWORDS
+    ]
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the OpenAI tokenizer, or estimate them when it isn't available."""
+    if _encoding is None:
+        return len(text) // 4 + 1
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def analysis_text(file_path: str, analysis: Dict[str, Any]) -> str:
+    """Flatten a FileAnalysis dict and its path into one searchable string."""
+    parts = [file_path, str(analysis.get("main_purpose", ""))]
+    for key in ("key_components", "patterns", "dependencies"):
+        parts.extend(str(item) for item in analysis.get(key) or [])
+    for aspect, value in (analysis.get("devops_relevance") or {}).items():
+        if value and value != "None":
+            parts.append(f"{aspect} {value}")
+    return "\n".join(parts)
+
+
+class BM25:
+    """Okapi BM25 over a fixed set of documents."""
+
+    def __init__(self, documents: Dict[str, str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = {key: Counter(tokenize(text)) for key, text in documents.items()}
+        self.lengths = {key: sum(counts.values()) for key, counts in self.term_counts.items()}
+        self.avg_length = (sum(self.lengths.values()) / len(self.lengths)) if self.lengths else 0
+
+        document_frequency = Counter()
+        for counts in self.term_counts.values():
+            document_frequency.update(counts.keys())
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - freq + 0.5) / (freq + 0.5))
+            for term, freq in document_frequency.items()
+        }
+
+    def score(self, query: str) -> Dict[str, float]:
+        terms = set(tokenize(query))
+        scores = {}
+        for key, counts in self.term_counts.items():
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[key] / (self.avg_length or 1))
+            score = 0.0
+            for term in terms:
+                tf = counts.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores[key] = score
+        return scores
+
+
+def cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class CachedEmbedder:
+    """
+    Embed texts through `embed_documents`, caching vectors by content hash in any
+    dict-like store (e.g. a diskcache.Cache), so unchanged files are embedded once.
+    """
+
+    def __init__(self, embeddings, cache: Optional[Dict] = None):
+        self.embeddings = embeddings
+        self.cache = cache if cache is not None else {}
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        keys = [hashlib.sha1(text.encode("utf-8")).hexdigest() for text in texts]
+        missing = [(key, text) for key, text in zip(keys, texts) if key not in self.cache]
+        if missing:
+            vectors = self.embeddings.embed_documents([text for _, text in missing])
+            for (key, _), vector in zip(missing, vectors):
+                self.cache[key] = vector
+        return [self.cache[key] for key in keys]
+
+
+@dataclass
+class RankedFiles:
+    ranked: List[str]
+    scores: Dict[str, float]
+    tokens: Dict[str, int]
+    selected: List[str] = field(default_factory=list)
+    confidence: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.tokens.values())
+
+
+def rank_file_analyses(
+    query: str,
+    file_analyses: Dict[str, Dict[str, Any]],
+    token_budget: int,
+    embed: Optional[Callable[[List[str]], List[List[float]]]] = None,
+    neighbors: Optional[Callable[[str], List[str]]] = None,
+    embedding_weight: float = 0.4,
+    neighbor_weight: float = 0.5,
+) -> RankedFiles:
+    """
+    Score file analyses against query and pick the best ones under token_budget.
+
+    BM25 over each file's path and analysis fields is the base score, normalized
+    to [0, 1]. With `embed`, cosine similarity between the query and each file's
+    text is blended in. With `neighbors` (file -> related files, eg from the IaC
+    dependency graph), files lend part of their score to the files they're wired
+    to. Selection walks the ranking best first, skipping files that would overflow
+    the budget, so the result only depends on the inputs.
+
+    `confidence` is how far the top score stands out from the average: near 0
+    means the ranking can't tell the files apart.
+    """
+    paths = sorted(file_analyses)
+    texts = {path: analysis_text(path, file_analyses[path]) for path in paths}
+    tokens = {path: count_tokens(json.dumps(file_analyses[path])) for path in paths}
+    if not paths:
+        return RankedFiles(ranked=[], scores={}, tokens={})
+
+    bm25 = BM25(texts).score(query)
+    top_bm25 = max(bm25.values()) or 1.0
+    scores = {path: bm25[path] / top_bm25 for path in paths}
+
+    if embed:
+        vectors = embed([query] + [texts[path] for path in paths])
+        query_vector = vectors[0]
+        for path, vector in zip(paths, vectors[1:]):
+            similarity = max(0.0, cosine(query_vector, vector))
+            scores[path] = (1 - embedding_weight) * scores[path] + embedding_weight * similarity
+
+    if neighbors:
+        boosted = dict(scores)
+        for path in paths:
+            for neighbor in neighbors(path):
+                if neighbor in boosted:
+                    boosted[neighbor] = max(boosted[neighbor], neighbor_weight * scores[path])
+        scores = boosted
+
+    ranked = sorted(paths, key=lambda path: (-scores[path], path))
+
+    selected = []
+    used = 0
+    for path in ranked:
+        if scores[path] <= 0:
+            break
+        if used + tokens[path] > token_budget:
+            continue
+        selected.append(path)
+        used += tokens[path]
+
+    top = scores[ranked[0]]
+    mean = sum(scores.values()) / len(scores)
+    confidence = (top - mean) / top if top > 0 else 0.0
+
+    return RankedFiles(
+        ranked=ranked,
+        scores=scores,
+        tokens=tokens,
+        selected=selected,
+        confidence=confidence
+    )
@@ -0,0 +1,66 @@
+import os
+from typing import Dict, Iterable, List, Set
+
+
+def step_files(step) -> Set[str]:
+    return {os.path.normpath(path) for path in getattr(step, "files", None) or []}
+
+
+def step_dependencies(steps) -> Dict[int, Set[int]]:
+    """
+    Map each plan step index to the indexes of the steps it has to wait for.
+
+    `depends_on` holds 1-based step numbers. Steps that don't set it depend on the
+    step before them, so plans without dependency metadata still run in order.
+    References to the step itself or to later steps are dropped, which keeps the
+    graph acyclic. Steps that touch the same files are always ordered, so two
+    steps running at once never edit the same file.
+    """
+    dependencies = {}
+    for i, step in enumerate(steps):
+        declared = getattr(step, "depends_on", None)
+        if declared is None:
+            needs = {i - 1} if i else set()
+        else:
+            needs = {number - 1 for number in declared if 0 < number <= i}
+
+        files = step_files(step)
+        if files:
+            for j in range(i):
+                if files & step_files(steps[j]):
+                    needs.add(j)
+
+        dependencies[i] = needs
+    return dependencies
+
+
+def ready_steps(dependencies: Dict[int, Set[int]], done: Iterable[int], running: Iterable[int] = ()) -> List[int]:
+    """Steps that haven't run yet and whose dependencies are all done, in plan order."""
+    done = set(done)
+    running = set(running)
+    return sorted(
+        i for i, needs in dependencies.items()
+        if i not in done and i not in running and needs <= done
+    )
+
+
+def parallel_batch(steps, ready: Iterable[int], limit: int) -> List[int]:
+    """
+    The ready steps that can run side by side, each in its own copy of the repo:
+    code steps declaring the files they edit, with no file in common. Command
+    steps, and steps that don't say which files they touch, run one at a time in
+    the repository itself, where the terraform state and lock files live.
+    """
+    batch = []
+    claimed = set()
+    for i in ready:
+        step = steps[i]
+        files = step_files(step)
+        if getattr(step, "step_type", None) != "code" or not files or files & claimed:
+            continue
+        batch.append(i)
+        claimed |= files
+        if len(batch) >= limit:
+            break
+    return batch
+
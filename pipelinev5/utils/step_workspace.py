@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Left out of the copy: version control metadata, and caches that are large,
+# rebuilt on demand, or local to a checkout
+IGNORED_NAMES = {
+    '.git', '.hg', '.svn',
+    '.terraform', '.terragrunt-cache', 'node_modules', '__pycache__', '.venv', 'venv',
+    '.pytest_cache', '.mypy_cache', '.ruff_cache', '.tox',
+}
+
+
+def _snapshot(root: Path) -> Dict[str, Tuple[int, int]]:
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORED_NAMES]
+        for name in filenames:
+            path = Path(dirpath) / name
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files[path.relative_to(root).as_posix()] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+class StepWorkspace:
+    """
+    A private copy of the repository for one plan step to run in.
+
+    Files are copied with their timestamps, so a snapshot taken after the copy
+    describes both trees as they were. `merge_back` then copies files the step
+    created or changed into the repository and removes files it deleted. If the
+    repository changed any of those files meanwhile, nothing is merged and they
+    are reported as conflicts. The copy has no `.git`, so git commands in it
+    can't commit or otherwise touch the repository's history.
+    """
+
+    def __init__(self, repo_path: str, prefix: str = "devops_step_"):
+        self.repo_path = Path(repo_path)
+        self.path = Path(tempfile.mkdtemp(prefix=prefix))
+        shutil.copytree(
+            self.repo_path,
+            self.path,
+            symlinks=True,
+            dirs_exist_ok=True,
+            ignore=shutil.ignore_patterns(*IGNORED_NAMES)
+        )
+        self.snapshot = _snapshot(self.path)
+
+    def changes(self) -> Tuple[List[str], List[str]]:
+        """Return (created or modified, deleted) relative paths."""
+        current = _snapshot(self.path)
+        changed = sorted(rel for rel, stat in current.items() if self.snapshot.get(rel) != stat)
+        deleted = sorted(rel for rel in self.snapshot if rel not in current)
+        return changed, deleted
+
+    def merge_back(self) -> Dict[str, List[str]]:
+        changed, deleted = self.changes()
+
+        conflicts = []
+        for rel in changed + deleted:
+            try:
+                stat = (self.repo_path / rel).stat()
+                repo_state = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                repo_state = None
+            if repo_state != self.snapshot.get(rel):
+                conflicts.append(rel)
+        if conflicts:
+            return {"merged": [], "removed": [], "conflicts": conflicts}
+
+        for rel in deleted:
+            (self.repo_path / rel).unlink()
+        for rel in changed:
+            target = self.repo_path / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(self.path / rel, target)
+
+        return {"merged": changed, "removed": deleted, "conflicts": []}
+
+    def cleanup(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,166 @@
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+from utils.blob_store import BLOB_KEY, BlobStore
+
+logger = logging.getLogger(__name__)
+
+
+class StructuredLogger:
+    """
+    Append JSON-lines records to `path` from a background writer thread.
+
+    `log` only queues the record; the writer serializes queued records in batches
+    and appends them with one write. Strings longer than `blob_threshold` bytes
+    (command output, prompts, file contents) are stored once in a BlobStore at
+    `blob_dir` and replaced in the record by
+    {"$blob": sha1, "bytes": n, "preview": ...}. The log rolls over to
+    path.1 ... path.<backups> once it passes `max_bytes`.
+
+    Records are serialized on the writer thread, so logged values shouldn't be
+    mutated after they are passed to `log`.
+    """
+
+    def __init__(self, path: str, blob_dir: Optional[str] = None, max_bytes: int = 50 * 1024 * 1024,
+                 backups: int = 5, blob_threshold: int = 4096, max_pending: int = 10000,
+                 batch_size: int = 200):
+        self.path = path
+        self.blob_dir = blob_dir or os.path.join(os.path.dirname(path) or ".", "blobs")
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.blob_threshold = blob_threshold
+        self.batch_size = batch_size
+        self.records = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.closed = False
+
+        self.blobs = BlobStore(self.blob_dir)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+        self.thread = threading.Thread(target=self._run, name="structured-logger", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def log(self, event: str, timestamp: Optional[str] = None, **fields: Any):
+        """Queue a record; never blocks, drops the record if the writer is too far behind."""
+        if self.closed:
+            return
+        record = {"timestamp": timestamp or datetime.now().isoformat(), "event": event, **fields}
+        try:
+            self.records.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1:
+                logger.warning(f"Log queue for {self.path} is full, dropping records")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued records are written; returns False if timeout ran out first."""
+        done = threading.Event()
+
+        def wait():
+            self.records.join()
+            done.set()
+
+        threading.Thread(target=wait, daemon=True).start()
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5):
+        if self.closed:
+            return
+        self.closed = True
+        self.flush(timeout)
+        self.records.put(None)
+        self.thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while True:
+            batch = [self.records.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            for record in batch:
+                if record is None:
+                    continue
+                try:
+                    lines.append(json.dumps(self._externalize(record), default=str, ensure_ascii=False))
+                except Exception as e:
+                    logger.warning(f"Could not serialize log record {record.get('event')}: {e}")
+            try:
+                if lines:
+                    self._write("\n".join(lines) + "\n")
+            except Exception as e:
+                logger.warning(f"Could not write to {self.path}: {e}")
+            finally:
+                for _ in batch:
+                    self.records.task_done()
+
+            if None in batch:
+                self.file.close()
+                return
+
+    def _write(self, text: str):
+        if self.file.tell() and self.file.tell() + len(text) > self.max_bytes:
+            self._rotate()
+        self.file.write(text)
+        self.file.flush()
+
+    def _rotate(self):
+        self.file.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def _externalize(self, value: Any) -> Any:
+        if isinstance(value, str):
+            if len(value) > self.blob_threshold:
+                return self.blobs.reference(value)
+            return value
+        if isinstance(value, dict):
+            return {str(key): self._externalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._externalize(item) for item in value]
+        return value
+
+
+def read_records(path: str, blob_dir: Optional[str] = None, resolve_blobs: bool = False) -> Iterator[Dict]:
+    """Yield the records of a log, oldest rotated file first, optionally with blobs inlined."""
+    blobs = BlobStore(blob_dir or os.path.join(os.path.dirname(path) or ".", "blobs"))
+    backups = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        backups.append(f"{path}.{i}")
+        i += 1
+
+    def resolve(value):
+        if isinstance(value, dict):
+            if BLOB_KEY in value:
+                return blobs.get(value[BLOB_KEY])
+            return {key: resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [resolve(item) for item in value]
+        return value
+
+    for file_path in backups[::-1] + [path]:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield resolve(record) if resolve_blobs else record
@@ -0,0 +1,77 @@
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryWorker:
+    """
+    Run cosmetic work (status taglines, step summaries) on background threads.
+
+    Jobs go through a bounded queue served by daemon threads, so the agent never
+    waits on them. Each job has a fallback: its value is used when the job
+    fails, and returned straight away when the queue is full. `on_done` gets the
+    result either way.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 100):
+        self.jobs = queue.Queue(maxsize=max_pending)
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._run, name=f"summary-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args,
+        fallback: Optional[Callable[[], Any]] = None,
+        on_done: Optional[Callable[[Any], None]] = None,
+        **kwargs
+    ) -> Future:
+        future = Future()
+        if on_done:
+            future.add_done_callback(lambda done: self._deliver(on_done, done.result()))
+
+        try:
+            self.jobs.put_nowait((func, args, kwargs, fallback, future))
+        except queue.Full:
+            logger.warning(f"Summary queue is full, using the fallback for {getattr(func, '__name__', func)}")
+            future.set_result(fallback() if fallback else None)
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued jobs to finish; returns False if timeout ran out first."""
+        done = threading.Event()
+
+        def wait():
+            self.jobs.join()
+            done.set()
+
+        threading.Thread(target=wait, daemon=True).start()
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            func, args, kwargs, fallback, future = self.jobs.get()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                logger.warning(f"Background summary failed, using the fallback: {e}")
+                try:
+                    result = fallback() if fallback else None
+                except Exception:
+                    result = None
+            future.set_result(result)
+            self.jobs.task_done()
+
+    @staticmethod
+    def _deliver(on_done, result):
+        try:
+            on_done(result)
+        except Exception as e:
+            logger.warning(f"Summary callback failed: {e}")
@@ -2,6 +2,7 @@ import os
 import tempfile
 import unittest
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import git
@@ -918,6 +919,27 @@ This command will print 'Hello, World!' to the console."""
             self.assertIn("Output tokens:", error_message)
             self.assertIn("Total tokens:", error_message)
 
+    def test_response_cache_hits_are_free(self):
+        with GitTemporaryDirectory():
+            io = InputOutput(yes=True)
+            coder = Coder.create(self.GPT35, None, io)
+            coder.main_model.info["input_cost_per_token"] = 0.001
+            coder.main_model.info["output_cost_per_token"] = 0.002
+
+            completion = SimpleNamespace(
+                usage=SimpleNamespace(prompt_tokens=100, completion_tokens=10),
+                forge_cache_hit=False,
+            )
+            coder.calculate_and_show_tokens_and_cost([], completion)
+            self.assertGreater(coder.total_cost, 0)
+            self.assertNotIn("cache hits", coder.usage_report)
+
+            total_cost = coder.total_cost
+            completion.forge_cache_hit = True
+            coder.calculate_and_show_tokens_and_cost([], completion)
+            self.assertEqual(coder.total_cost, total_cost)
+            self.assertIn("Response cache hits: 1.", coder.usage_report)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,76 @@
+import os
+import unittest
+from pathlib import Path
+
+from forge.dump import dump  # noqa: F401
+from forge.file_walker import FileWalker, entries_to_tree, walk
+from forge.utils import IgnorantTemporaryDirectory
+
+
+class TestFileWalker(unittest.TestCase):
+    def make_tree(self, root, files):
+        for fname, content in files.items():
+            path = Path(root, fname)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+
+    def test_walk_applies_ignore_rules(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            self.make_tree(
+                temp_dir,
+                {
+                    ".gitignore": "*.tfstate\nbuild/\n",
+                    "main.tf": "x",
+                    "terraform.tfstate": "x",
+                    "build/out.json": "x",
+                    ".hidden/secret.tf": "x",
+                    "__pycache__/a.pyc": "x",
+                    "modules/vpc/.gitignore": "generated.tf\n",
+                    "modules/vpc/main.tf": "xyz",
+                    "modules/vpc/generated.tf": "x",
+                    "generated.tf": "x",
+                },
+            )
+
+            entries = list(walk(temp_dir))
+            rel_paths = sorted(entry.rel_path for entry in entries)
+
+            self.assertEqual(
+                rel_paths,
+                ["generated.tf", "main.tf", "modules", "modules/vpc", "modules/vpc/main.tf"],
+            )
+
+            by_path = {entry.rel_path: entry for entry in entries}
+            self.assertEqual(by_path["modules/vpc/main.tf"].size, 3)
+            self.assertTrue(by_path["modules"].is_dir)
+            self.assertEqual(by_path["main.tf"].path, os.path.join(temp_dir, "main.tf"))
+
+    def test_exclude_prunes_directories(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            self.make_tree(temp_dir, {"plan_iteration_1/plan.tf": "x", "keep/main.tf": "x"})
+
+            walker = FileWalker(temp_dir, exclude=lambda entry: "plan_iteration_" in entry.name)
+            rel_paths = sorted(entry.rel_path for entry in walker.walk())
+
+            self.assertEqual(rel_paths, ["keep", "keep/main.tf"])
+
+    def test_entries_to_tree(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            self.make_tree(temp_dir, {"main.tf": "x", "modules/vpc/main.tf": "x"})
+            root = os.path.realpath(temp_dir)
+
+            tree = entries_to_tree(walk(temp_dir), root)
+
+            modules = os.path.join(root, "modules")
+            vpc = os.path.join(modules, "vpc")
+            self.assertEqual(
+                tree,
+                {
+                    os.path.join(root, "main.tf"): "file",
+                    modules: {vpc: {os.path.join(vpc, "main.tf"): "file"}},
+                },
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import os
+import unittest
+from pathlib import Path
+
+import git
+
+from forge.dump import dump  # noqa: F401
+from forge.git_mirror import GitMirrorCache, GitMirrorError, strip_credentials
+from forge.utils import IgnorantTemporaryDirectory, make_repo
+
+
+class TestGitMirror(unittest.TestCase):
+    def make_origin(self, path, branch="trunk"):
+        repo = make_repo(path)
+        repo.git.checkout("-b", branch)
+        Path(path, "main.tf").write_text('resource "null_resource" "a" {}\n')
+        repo.git.add("main.tf")
+        repo.git.commit("-m", "initial")
+        return repo
+
+    def test_strip_credentials(self):
+        self.assertEqual(
+            strip_credentials("https://token@github.com/org/repo.git"),
+            "https://github.com/org/repo.git",
+        )
+        self.assertEqual(strip_credentials("/local/path"), "/local/path")
+
+    def test_clone_uses_mirror_and_default_branch(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            origin_path = os.path.join(temp_dir, "origin")
+            self.make_origin(origin_path)
+            cache = GitMirrorCache(os.path.join(temp_dir, "mirrors"))
+
+            dest = os.path.join(temp_dir, "checkout")
+            # An explicitly requested branch must exist on the remote
+            with self.assertRaises(GitMirrorError):
+                cache.clone(origin_path, dest, branch="main")
+            self.assertFalse(Path(dest).exists())
+
+            # A guessed branch falls back to the remote's default branch
+            repo = cache.clone(origin_path, dest, branch="main", fallback=True)
+
+            self.assertEqual(repo.active_branch.name, "trunk")
+            self.assertTrue(Path(dest, "main.tf").exists())
+            self.assertTrue(cache.mirror_path(origin_path).exists())
+            # Dissociated, so the checkout doesn't depend on the mirror
+            alternates = Path(dest, ".git", "objects", "info", "alternates")
+            self.assertFalse(alternates.exists() and alternates.read_text().strip())
+
+    def test_mirror_config_has_no_credentials(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            origin_path = os.path.join(temp_dir, "origin")
+            origin = self.make_origin(origin_path)
+            cache = GitMirrorCache(os.path.join(temp_dir, "mirrors"))
+            url = f"file://token@localhost{Path(origin_path).resolve().as_posix()}"
+
+            cache.clone(url, os.path.join(temp_dir, "checkout"))
+            origin.git.commit("--allow-empty", "-m", "next")
+            mirror = git.Repo(cache.update(url))
+
+            self.assertNotIn("token", mirror.git.config("remote.origin.url"))
+            self.assertEqual(mirror.commit("trunk").hexsha, origin.head.commit.hexsha)
+
+    def test_clone_existing_checkout_fetches_deltas(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            origin_path = os.path.join(temp_dir, "origin")
+            origin = self.make_origin(origin_path)
+            cache = GitMirrorCache(os.path.join(temp_dir, "mirrors"))
+
+            dest = os.path.join(temp_dir, "checkout")
+            first = cache.clone(origin_path, dest)
+            Path(dest, "scratch.txt").write_text("keep me")
+
+            Path(origin_path, "vars.tf").write_text('variable "x" {}\n')
+            origin.git.add("vars.tf")
+            origin.git.commit("-m", "add vars")
+
+            repo = cache.clone(origin_path, dest)
+
+            self.assertEqual(repo.working_dir, first.working_dir)
+            self.assertEqual(repo.head.commit.hexsha, origin.head.commit.hexsha)
+            self.assertTrue(Path(dest, "vars.tf").exists())
+            # Updated in place, not re-cloned
+            self.assertTrue(Path(dest, "scratch.txt").exists())
+
+    def test_clone_refuses_other_repo(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            origin_path = os.path.join(temp_dir, "origin")
+            self.make_origin(origin_path)
+            dest = os.path.join(temp_dir, "checkout")
+            make_repo(dest)
+            Path(dest, "notes.txt").write_text("mine")
+
+            with self.assertRaises(GitMirrorError):
+                GitMirrorCache(os.path.join(temp_dir, "mirrors")).clone(origin_path, dest)
+
+            self.assertEqual(Path(dest, "notes.txt").read_text(), "mine")
+
+    def test_sync_never_discards_local_work(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            origin_path = os.path.join(temp_dir, "origin")
+            origin = self.make_origin(origin_path)
+            cache = GitMirrorCache(os.path.join(temp_dir, "mirrors"))
+            dest = os.path.join(temp_dir, "checkout")
+            repo = cache.clone(origin_path, dest)
+
+            # Uncommitted edits
+            Path(dest, "main.tf").write_text("edited\n")
+            with self.assertRaises(GitMirrorError):
+                cache.clone(origin_path, dest)
+            self.assertEqual(Path(dest, "main.tf").read_text(), "edited\n")
+
+            # Local commits ahead of the remote are kept
+            with repo.config_writer() as config:
+                config.set_value("user", "name", "Test User")
+                config.set_value("user", "email", "testuser@example.com")
+            repo.git.commit("-am", "local edit")
+            local_head = repo.head.commit.hexsha
+            cache.clone(origin_path, dest)
+            self.assertEqual(repo.head.commit.hexsha, local_head)
+
+            # Diverged history
+            origin.git.commit("--allow-empty", "-m", "remote change")
+            with self.assertRaises(GitMirrorError):
+                cache.clone(origin_path, dest)
+            self.assertEqual(repo.head.commit.hexsha, local_head)
+
+    def test_reset_refreshes_local_work(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            origin_path = os.path.join(temp_dir, "origin")
+            origin = self.make_origin(origin_path)
+            cache = GitMirrorCache(os.path.join(temp_dir, "mirrors"))
+            dest = os.path.join(temp_dir, "checkout")
+            repo = cache.clone(origin_path, dest, reset=True)
+
+            # A local commit and an uncommitted edit, e.g. from an auto-committing run
+            with repo.config_writer() as config:
+                config.set_value("user", "name", "Test User")
+                config.set_value("user", "email", "testuser@example.com")
+            Path(dest, "main.tf").write_text("committed locally\n")
+            repo.git.commit("-am", "local edit")
+            Path(dest, "main.tf").write_text("edited\n")
+            origin.git.commit("--allow-empty", "-m", "remote change")
+
+            repo = cache.clone(origin_path, dest, reset=True)
+
+            self.assertEqual(repo.head.commit.hexsha, origin.head.commit.hexsha)
+            self.assertEqual(repo.active_branch.name, "trunk")
+            self.assertFalse(repo.is_dirty())
+            self.assertEqual(
+                Path(dest, "main.tf").read_text(), 'resource "null_resource" "a" {}\n'
+            )
+
+    def test_reset_replaces_other_repo(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            origin_path = os.path.join(temp_dir, "origin")
+            origin = self.make_origin(origin_path)
+            dest = os.path.join(temp_dir, "checkout")
+            make_repo(dest)
+            Path(dest, "notes.txt").write_text("stale")
+
+            cache = GitMirrorCache(os.path.join(temp_dir, "mirrors"))
+            repo = cache.clone(origin_path, dest, reset=True)
+
+            self.assertEqual(repo.head.commit.hexsha, origin.head.commit.hexsha)
+            self.assertFalse(Path(dest, "notes.txt").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
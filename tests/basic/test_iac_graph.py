@@ -0,0 +1,121 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from forge.dump import dump  # noqa: F401
+from forge.iac_graph import IacGraph, select_files
+from forge.utils import IgnorantTemporaryDirectory
+
+TEST_FILES = {
+    "main.tf": (
+        'module "vpc" {\n  source = "./modules/vpc"\n}\n'
+        'resource "aws_instance" "web" {\n'
+        "  subnet_id = module.vpc.subnet_id\n"
+        "  instance_type = var.instance_type\n"
+        "}\n"
+    ),
+    "variables.tf": 'variable "instance_type" {\n  default = "t3.micro"\n}\n',
+    "outputs.tf": 'output "ip" {\n  value = aws_instance.web.public_ip\n}\n',
+    "modules/vpc/main.tf": 'resource "aws_vpc" "main" {\n  cidr_block = var.cidr\n}\n',
+    "modules/vpc/variables.tf": 'variable "cidr" {}\n',
+    "other/variables.tf": 'variable "instance_type" {}\n',
+    "k8s/deploy.yaml": (
+        "kind: Deployment\n"
+        "metadata:\n"
+        "  name: api\n"
+        "spec:\n"
+        "  template:\n"
+        "    spec:\n"
+        "      serviceAccountName: api\n"
+    ),
+    "k8s/sa.yaml": "kind: ServiceAccount\nmetadata:\n  name: api\n",
+}
+
+
+class TestIacGraph(unittest.TestCase):
+    def write_files(self, root):
+        for fname, content in TEST_FILES.items():
+            path = os.path.join(root, fname)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+
+    def test_edges(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            self.write_files(temp_dir)
+            graph = IacGraph(temp_dir).build()
+
+            self.assertEqual(
+                graph.neighbors("main.tf"),
+                {
+                    "variables.tf",
+                    "outputs.tf",
+                    "modules/vpc/main.tf",
+                    "modules/vpc/variables.tf",
+                },
+            )
+            # var.instance_type in main.tf doesn't resolve to another module's variable
+            self.assertNotIn("other/variables.tf", graph.neighbors("main.tf"))
+            self.assertIn("modules/vpc/variables.tf", graph.neighbors("modules/vpc/main.tf"))
+            self.assertEqual(graph.neighbors("k8s/deploy.yaml"), {"k8s/sa.yaml"})
+
+    def test_candidate_files_pulls_in_neighbors(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            self.write_files(temp_dir)
+            graph = IacGraph(temp_dir)
+
+            candidates = graph.candidate_files("Resize the web server")
+            self.assertEqual(candidates[0], "main.tf")
+            self.assertEqual(
+                set(candidates[1:]),
+                {
+                    "variables.tf",
+                    "outputs.tf",
+                    "modules/vpc/main.tf",
+                    "modules/vpc/variables.tf",
+                },
+            )
+
+            documents = {"k8s/sa.yaml": "Service account used by the api deployment"}
+            candidates = graph.candidate_files("rotate the service account", documents)
+            self.assertEqual(candidates[0], "k8s/sa.yaml")
+            self.assertIn("k8s/deploy.yaml", candidates)
+
+            self.assertEqual(graph.candidate_files("please update the"), [])
+
+    def test_index_only_reparses_changed_files(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            self.write_files(temp_dir)
+            index_path = IacGraph(temp_dir).build().index_path
+            self.assertTrue(index_path.exists())
+            self.assertFalse(str(index_path).startswith(os.path.realpath(temp_dir)))
+            self.addCleanup(index_path.unlink, missing_ok=True)
+
+            with open(os.path.join(temp_dir, "outputs.tf"), "a") as f:
+                f.write('output "vpc" {\n  value = module.vpc.id\n}\n')
+
+            graph = IacGraph(temp_dir)
+            with patch.object(graph, "index_file", wraps=graph.index_file) as mock_index:
+                graph.build()
+
+            self.assertEqual(mock_index.call_count, 1)
+            self.assertTrue(mock_index.call_args[0][0].endswith("outputs.tf"))
+            self.assertIn("module.vpc", graph.files["outputs.tf"]["refs"])
+
+    def test_select_files_maps_absolute_fnames(self):
+        with IgnorantTemporaryDirectory() as temp_dir:
+            self.write_files(temp_dir)
+            documents = {os.path.join(temp_dir, fname): "" for fname in TEST_FILES}
+
+            selected = select_files(temp_dir, "scale the api deployment", documents, 2)
+            self.assertEqual(
+                set(selected),
+                {os.path.join(temp_dir, "k8s/sa.yaml"), os.path.join(temp_dir, "k8s/deploy.yaml")},
+            )
+
+            # Nothing to narrow
+            self.assertIsNone(select_files(temp_dir, "service account", documents, 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,7 @@
+import os
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from forge.dump import dump  # noqa
@@ -47,6 +50,69 @@ class TestLinter(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertIn("Error message", result.text)
 
+    def test_lint_many_runs_flake8_once(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            linter = Linter(encoding="utf-8", root=tmpdir)
+            good = Path(tmpdir) / "good.py"
+            good.write_text("x = 1\n")
+            bad = Path(tmpdir) / "bad.py"
+            bad.write_text("print(undefined_name)\n")
+
+            with patch.object(linter, "run_flake8", wraps=linter.run_flake8) as mock_flake8:
+                results = linter.lint_many([str(good), str(bad)])
+
+            self.assertEqual(mock_flake8.call_count, 1)
+            self.assertIsNone(results[str(good)])
+            self.assertIn("F821", results[str(bad)])
+            self.assertNotIn("good.py", results[str(bad)])
+
+    def test_lint_many_matches_lint(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fnames = []
+            for i in range(3):
+                fname = Path(tmpdir) / f"file{i}.py"
+                fname.write_text(f"def f{i}():\n    return missing{i}\n")
+                fnames.append(str(fname))
+
+            serial = [Linter(encoding="utf-8", root=tmpdir).lint(fname) for fname in fnames]
+            parallel = Linter(encoding="utf-8", root=tmpdir).lint_many(fnames)
+
+            self.assertEqual(serial, [parallel[fname] for fname in fnames])
+
+    def test_lint_cache_by_content(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            linter = Linter(encoding="utf-8", root=tmpdir)
+            fname = Path(tmpdir) / "file.py"
+            fname.write_text("print(undefined_name)\n")
+
+            with patch.object(linter, "run_flake8", wraps=linter.run_flake8) as mock_flake8:
+                first = linter.lint(str(fname))
+                second = linter.lint_many([str(fname)])[str(fname)]
+                self.assertEqual(mock_flake8.call_count, 1)
+                self.assertEqual(first, second)
+
+                fname.write_text("x = 1" + os.linesep)
+                self.assertIsNone(linter.lint(str(fname)))
+                self.assertEqual(mock_flake8.call_count, 2)
+
+    def test_lint_cache_bounded_and_skips_custom_commands(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            linter = Linter(encoding="utf-8", root=tmpdir)
+            linter.lint_cache_size = 2
+            fnames = []
+            for i in range(3):
+                fname = Path(tmpdir) / f"file{i}.py"
+                fname.write_text(f"x{i} = 1\n")
+                fnames.append(str(fname))
+
+            linter.lint_many(fnames)
+            self.assertEqual(len(linter.lint_cache), 2)
+
+            with patch.object(linter, "run_cmd", return_value=None) as mock_cmd:
+                linter.lint(fnames[0], cmd="checker")
+                linter.lint(fnames[0], cmd="checker")
+                self.assertEqual(mock_cmd.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from grep_ast import TreeContext
+
+from forge.dump import dump  # noqa: F401
+from forge.parse_cache import PARSE_CACHE, CachedTreeContext, ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def test_same_content_is_parsed_once(self):
+        cache = ParseCache()
+        code = "def foo():\n    return 1\n"
+
+        tree1 = cache.parse("python", code, "a.py")
+        tree2 = cache.parse("python", code, "b.py")
+
+        self.assertIs(tree1, tree2)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 1)
+
+    def test_incremental_reparse_matches_full_parse(self):
+        cache = ParseCache()
+        old_code = "def foo():\n    return 1\n\ndef bar():\n    pass\n"
+        new_code = "def foo():\n    x = 2\n    return x\n\ndef bar():\n    pass\n"
+
+        old_tree = cache.parse("python", old_code, "a.py")
+        old_ranges = [(n.start_byte, n.end_byte) for n in old_tree.root_node.children]
+        tree = cache.parse("python", new_code, "a.py")
+
+        self.assertEqual(cache.incremental, 1)
+
+        fresh = ParseCache().parse("python", new_code)
+        self.assertEqual(tree.root_node.sexp(), fresh.root_node.sexp())
+
+        # The cached tree for the old content may be shared, so it must not be edited
+        self.assertEqual(
+            [(n.start_byte, n.end_byte) for n in old_tree.root_node.children], old_ranges
+        )
+        self.assertIs(cache.parse("python", old_code), old_tree)
+
+    def test_lru_bound(self):
+        cache = ParseCache(max_trees=2)
+        for i in range(5):
+            cache.parse("python", f"x = {i}\n", f"file{i}.py")
+        self.assertEqual(len(cache.trees), 2)
+        self.assertEqual(list(cache.latest), ["file3.py", "file4.py"])
+
+    def test_tree_context_uses_shared_cache(self):
+        code = "class Unique:\n    def method_for_tree_context_test(self):\n        pass\n"
+        PARSE_CACHE.parse("python", code)
+        hits = PARSE_CACHE.hits
+
+        context = CachedTreeContext("foo.py", code)
+
+        self.assertEqual(PARSE_CACHE.hits, hits + 1)
+        self.assertEqual(context.header, TreeContext("foo.py", code).header)
+        self.assertEqual(PARSE_CACHE.hits, hits + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,7 @@ import tempfile
 import time
 import unittest
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import git
 
@@ -410,3 +410,45 @@ class TestRepo(unittest.TestCase):
             git_repo = GitRepo(InputOutput(), None, None)
 
             git_repo.commit(fnames=[str(fname)])
+
+    def test_commit_stages_all_files_at_once(self):
+        with GitTemporaryDirectory():
+            raw_repo = git.Repo()
+            fname = Path("file.txt")
+            fname.touch()
+            raw_repo.git.add(str(fname))
+            raw_repo.git.commit("-m", "initial")
+
+            fnames = [Path(f"new{i}.txt") for i in range(3)]
+            for new_fname in fnames:
+                new_fname.write_text("content\n")
+            fname.write_text("changed\n")
+            fnames.append(fname)
+
+            git_repo = GitRepo(InputOutput(), None, None)
+            git_repo.repo.git = MagicMock(wraps=git_repo.repo.git)
+            res = git_repo.commit(fnames=[str(f) for f in fnames], message="batch")
+
+            self.assertIsNotNone(res)
+            self.assertEqual(git_repo.repo.git.add.call_count, 1)
+            self.assertFalse(raw_repo.is_dirty(untracked_files=True))
+            self.assertEqual(set(git_repo.commit_timings), {"diff", "message", "stage", "commit"})
+
+    def test_commit_stage_falls_back_per_file(self):
+        with GitTemporaryDirectory():
+            raw_repo = git.Repo()
+            fname = Path("file.txt")
+            fname.touch()
+            raw_repo.git.add(str(fname))
+            raw_repo.git.commit("-m", "initial")
+
+            fname.write_text("changed\n")
+
+            io = InputOutput()
+            git_repo = GitRepo(io, None, None)
+            with patch.object(io, "tool_error") as mock_error:
+                git_repo.stage_files([str(fname), "missing.txt"])
+
+            mock_error.assert_called_once()
+            self.assertIn("missing.txt", mock_error.call_args[0][0])
+            self.assertIn("file.txt", raw_repo.git.diff("--cached", "--name-only"))
@@ -46,6 +46,55 @@ class TestRepoMap(unittest.TestCase):
             # close the open cache files, so Windows won't error
             del repo_map
 
+    def test_get_repo_map_iac(self):
+        test_files = {
+            "variables.tf": 'variable "region" {\n  default = "us-east-1"\n}\n',
+            "main.tf": (
+                'resource "aws_instance" "web" {\n'
+                "  ami    = data.aws_ami.ubuntu.id\n"
+                '  name   = "${var.region}-web"\n'
+                "  subnet = module.vpc.public_subnets[0]\n"
+                "}\n"
+            ),
+            "outputs.tf": 'output "ip" {\n  value = aws_instance.web.public_ip\n}\n',
+            "prod.tfvars": 'region = "us-west-2"\n',
+            "service.yml": "apiVersion: v1\nkind: Service\nmetadata:\n  name: web\n",
+            "ingress.yaml": (
+                "apiVersion: networking.k8s.io/v1\n"
+                "kind: Ingress\n"
+                "metadata:\n"
+                "  name: web\n"
+                "spec:\n"
+                "  defaultBackend:\n"
+                "    service:\n"
+                "      name: web\n"
+            ),
+        }
+
+        with IgnorantTemporaryDirectory() as temp_dir:
+            for fname, content in test_files.items():
+                with open(os.path.join(temp_dir, fname), "w") as f:
+                    f.write(content)
+
+            io = InputOutput()
+            repo_map = RepoMap(main_model=self.GPT35, root=temp_dir, io=io)
+
+            tags = list(repo_map.get_tags(os.path.join(temp_dir, "main.tf"), "main.tf"))
+            defs = set(tag.name for tag in tags if tag.kind == "def")
+            refs = set(tag.name for tag in tags if tag.kind == "ref")
+            self.assertEqual(defs, {"aws_instance.web"})
+            self.assertEqual(refs, {"data.aws_ami.ubuntu", "var.region", "module.vpc"})
+
+            other_files = [os.path.join(temp_dir, fname) for fname in test_files]
+            result = repo_map.get_repo_map([], other_files)
+
+            self.assertIn('variable "region" {', result)
+            self.assertIn('resource "aws_instance" "web" {', result)
+            self.assertIn("kind: Service", result)
+
+            # close the open cache files, so Windows won't error
+            del repo_map
+
     def test_repo_map_refresh_files(self):
         with GitTemporaryDirectory() as temp_dir:
             repo = git.Repo(temp_dir)
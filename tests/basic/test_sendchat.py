@@ -1,9 +1,11 @@
 import unittest
 from unittest.mock import MagicMock, patch
 
+from forge import sendchat
 from forge.exceptions import LiteLLMExceptions
 from forge.llm import litellm
 from forge.sendchat import send_completion, simple_send_with_retries
+from forge.utils import IgnorantTemporaryDirectory
 
 
 class PrintCalled(Exception):
@@ -91,3 +93,83 @@ class TestSendChat(unittest.TestCase):
         result = simple_send_with_retries(self.mock_model, self.mock_messages)
         assert result is None
         assert mock_print.call_count == 1
+
+
+class TestSendCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = IgnorantTemporaryDirectory()
+        sendchat.enable_cache(self.temp_dir.name)
+        self.messages = [{"role": "user", "content": "Hello"}]
+
+    def tearDown(self):
+        sendchat.disable_cache()
+        self.temp_dir.cleanup()
+
+    def make_response(self, content):
+        return litellm.ModelResponse(
+            choices=[
+                {
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                    "index": 0,
+                }
+            ],
+            usage={"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4},
+        )
+
+    @patch("litellm.completion")
+    def test_identical_requests_hit_the_cache(self, mock_completion):
+        mock_completion.return_value = self.make_response("hi")
+
+        _, first = send_completion("gpt-4", self.messages, None, False)
+        _, second = send_completion(
+            "gpt-4", self.messages, None, False, extra_params=dict(timeout=30)
+        )
+
+        mock_completion.assert_called_once()
+        self.assertFalse(getattr(first, "forge_cache_hit", False))
+        self.assertTrue(second.forge_cache_hit)
+        self.assertEqual(second.choices[0].message.content, "hi")
+
+        # A different temperature is a different request
+        send_completion("gpt-4", self.messages, None, False, temperature=0.5)
+        self.assertEqual(mock_completion.call_count, 2)
+
+    @patch("litellm.completion")
+    def test_streams_are_recorded_and_replayed(self, mock_completion):
+        chunks = [
+            litellm.ModelResponse(stream=True, choices=[{"delta": {"content": text}, "index": 0}])
+            for text in ["Hel", "lo"]
+        ]
+        mock_completion.return_value = iter(chunks)
+
+        _, stream = send_completion("gpt-4", self.messages, None, True)
+        text = "".join(chunk.choices[0].delta.content for chunk in stream)
+        self.assertEqual(text, "Hello")
+
+        _, replay = send_completion("gpt-4", self.messages, None, True)
+        self.assertTrue(replay.forge_cache_hit)
+        text = "".join(chunk.choices[0].delta.content for chunk in replay)
+        self.assertEqual(text, "Hello")
+        mock_completion.assert_called_once()
+
+    @patch("litellm.completion")
+    def test_unfinished_streams_are_not_cached(self, mock_completion):
+        mock_completion.return_value = iter(
+            [litellm.ModelResponse(stream=True, choices=[{"delta": {"content": "x"}, "index": 0}])]
+        )
+
+        _, stream = send_completion("gpt-4", self.messages, None, True)
+        next(iter(stream))
+        send_completion("gpt-4", self.messages, None, True)
+
+        self.assertEqual(mock_completion.call_count, 2)
+
+    @patch("litellm.completion")
+    def test_uncacheable_responses_are_still_returned(self, mock_completion):
+        mock_response = MagicMock()
+        mock_completion.return_value = mock_response
+
+        _, response = send_completion("gpt-4", self.messages, None, False)
+
+        self.assertIs(response, mock_response)